@@ -1,20 +1,93 @@
+import asyncio
+import json
 import os
-from io import BytesIO
+import resource
+import time
+import tracemalloc
+import zipfile
+from contextlib import asynccontextmanager
 
-from fastapi import Depends, FastAPI, Header, UploadFile, File, HTTPException
-from pptx import Presentation
+from fastapi import Depends, FastAPI, Header, UploadFile, File, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from dotenv import load_dotenv
 
 from utils.pptx_parser import (
-    generate_doc_id, group_slides_into_courses, strip_code_fences
+    DEFAULT_ENGINE, DEFAULT_TEXT_ONLY, ENGINES, generate_doc_id, iter_courses_background, parse_courses,
+    strip_code_fences,
+)
+from extract_curriculum_store_v2 import (
+    CURRICULUM_BATCH_MODE, agenerate_curriculum_store_batch, agenerate_curriculum_store_markdown,
+    generate_curriculum_store_draft, load_skill_catalog, pipeline_version, reload_skill_catalog
+)
+from job_queue import get_job_store
+from llm_client import cache_stats, connection_stats, scheduler_stats, usage_stats
+from result_cache import (
+    etag_for, etag_key, etag_matches, get_result_cache, hash_upload, make_result_key, result_cache_stats,
+)
+from utils import metrics, parse_pool
+from utils.single_flight import SingleFlight
+from utils.stage_timing import StageTimings, profile_call
+from utils.slide_dedup import dedup_stats
+from utils.token_budget import budget_stats, preload_encoder
+from utils.uploads import (
+    UploadSizeLimitMiddleware, check_deck_size, configure_spooling, detach_upload, iter_zip_decks, open_zip_member,
+    upload_source, upload_stats,
 )
-from extract_curriculum_store_v2 import generate_curriculum_store_markdown
 
 load_dotenv()
 
 API_AUTH_TOKEN = os.environ.get("API_AUTH_TOKEN", "").strip()
+# 요청 하나에서 동시에 진행할 과정별 LLM 생성 수 상한
+EXTRACT_LLM_CONCURRENCY = max(1, int(os.environ.get("EXTRACT_LLM_CONCURRENCY", "4")))
+# 1이면 요청마다 PPTX 파싱 구간의 Python 힙 최대 사용량을 tracemalloc으로 측정 (파싱이 느려짐)
+TRACE_PARSE_MEMORY = os.environ.get("TRACE_PARSE_MEMORY", "0") == "1"
+# 이 프로세스에서 실행할 작업 큐 워커 수 (0이면 작업 접수만 하고 처리는 다른 프로세스에 맡김)
+JOB_WORKERS = max(0, int(os.environ.get("JOB_WORKERS", "2")))
+JOB_POLL_INTERVAL = float(os.environ.get("JOB_POLL_INTERVAL", "2"))
+# 작업 큐(SQLite) 조회가 연달아 실패할 때 다시 시도하기 전 최대 대기(초). JOB_POLL_INTERVAL부터 두 배씩 늘립니다.
+JOB_ERROR_BACKOFF_MAX = float(os.environ.get("JOB_ERROR_BACKOFF_MAX", "60"))
+# /extract/batch 한 요청에서 받는 최대 제안서 수 (zip 안의 제안서 포함)
+EXTRACT_BATCH_MAX_FILES = max(1, int(os.environ.get("EXTRACT_BATCH_MAX_FILES", "50")))
+# /extract/batch에서 동시에 파싱/생성하는 제안서 수 (LLM 호출 수는 EXTRACT_LLM_CONCURRENCY를 함께 씀)
+EXTRACT_BATCH_CONCURRENCY = max(1, int(os.environ.get("EXTRACT_BATCH_CONCURRENCY", str(os.cpu_count() or 2))))
+
+_job_wake = None
+# 동일한 /extract 요청(업로드 해시 + 옵션)을 하나의 추출로 합칩니다.
+_extractions = SingleFlight()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """작업 큐 워커(JOB_WORKERS개)와 파싱 풀을 시작하고 종료 시 정리합니다."""
+    global _job_wake
+    _job_wake = asyncio.Event()
+    store = get_job_store()
+    purged = await asyncio.to_thread(store.purge)
+    if purged:
+        print(f"🧾 보관 기간이 지난 작업 {purged}개 삭제")
+    workers = [asyncio.create_task(_job_worker(store, _job_wake)) for _ in range(JOB_WORKERS)]
+    # 파싱 풀을 미리 띄워 첫 요청에서 워커 생성 비용을 내지 않게 합니다.
+    parse_pool.get_parse_pool()
+    # 토크나이저 인코딩 파일을 첫 요청 전에 불러옵니다 (LLM_TOKENIZER_LOAD_TIMEOUT까지만 기다림).
+    if not await asyncio.to_thread(preload_encoder):
+        print("⚠️ 토크나이저가 아직 준비되지 않아 준비될 때까지 토큰 추정치를 사용합니다")
+    try:
+        yield
+    finally:
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        parse_pool.shutdown_parse_pool()
 
-app = FastAPI(title="PPTX Markdown Converter API")
+
+app = FastAPI(title="PPTX Markdown Converter API", lifespan=lifespan)
+# 업로드는 UPLOAD_SPOOL_MAX_MB까지만 메모리에 두고 나머지는 임시 파일에 받으며,
+# MAX_UPLOAD_MB(/extract/batch는 MAX_BATCH_UPLOAD_MB)를 넘는 요청은 본문을 다 받기 전에 413으로 거절합니다.
+configure_spooling()
+app.add_middleware(UploadSizeLimitMiddleware)
+
+# 스킬 카탈로그를 import 시점에 미리 로드합니다 (gunicorn --preload 등 fork 전 로드 시 워커가 공유).
+load_skill_catalog()
 
 
 def verify_api_token(authorization: str | None = Header(default=None)):
@@ -26,6 +99,29 @@ def verify_api_token(authorization: str | None = Header(default=None)):
         raise HTTPException(status_code=401, detail="Invalid or missing API token")
 
 
+def process_peak_rss_kb():
+    """워커 프로세스가 시작된 뒤의 최대 RSS(KB). Linux의 ru_maxrss 단위는 KB입니다.
+
+    요청별 값이 아니라 프로세스 수명 전체의 최대치이므로 이전 요청의 피크가 그대로 남습니다.
+    요청 하나의 파싱 메모리는 TRACE_PARSE_MEMORY=1의 X-Parse-Peak-Memory-KB로 봅니다.
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def parse_with_memory_report(source, engine, text_only, timings=None):
+    """과정 목록과 파싱 구간의 Python 힙 최대 사용량(KB, 측정하지 않으면 None)을 반환합니다."""
+    if not TRACE_PARSE_MEMORY or tracemalloc.is_tracing():
+        return parse_courses(source, engine, text_only, timings), None
+
+    tracemalloc.start()
+    try:
+        courses = parse_courses(source, engine, text_only, timings)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return courses, peak // 1024
+
+
 @app.get("/")
 def root():
     return {
@@ -33,7 +129,14 @@ def root():
         "description": "Upload a PPTX file and receive curriculum-store Markdown JSON.",
         "endpoints": {
             "health": "GET /health",
-            "extract": "POST /extract multipart/form-data field=file",
+            "stats": "GET /stats",
+            "metrics": "GET /metrics (Prometheus)",
+            "reload_catalog": "POST /admin/reload-catalog",
+            "extract": "POST /extract multipart/form-data field=file (optional ?engine=python-pptx|xml, "
+                       "?profile=1|cpu)",
+            "extract_stream": "POST /extract/stream multipart/form-data field=file (NDJSON, ?format=sse)",
+            "extract_batch": "POST /extract/batch multipart/form-data field=files (.pptx or .zip, NDJSON)",
+            "jobs": "POST /jobs multipart/form-data field=file -> GET /jobs/{job_id}",
         },
         "auth_required": bool(API_AUTH_TOKEN),
     }
@@ -44,47 +147,629 @@ def health():
     return {"status": "ok"}
 
 
-@app.post("/extract", dependencies=[Depends(verify_api_token)])
-async def extract(file: UploadFile = File(...)):
+@app.get("/stats")
+def stats():
+    return {
+        "llm_connections": connection_stats(),
+        "llm_cache": cache_stats(),
+        "result_cache": result_cache_stats(),
+        "coalescing": _extractions.stats(),
+        "llm_scheduler": scheduler_stats(),
+        "llm_usage": usage_stats(),
+        "input_budget": budget_stats(),
+        "slide_dedup": dedup_stats(),
+        "jobs": get_job_store().stats(),
+        "parse_pool": parse_pool.pool_stats(),
+        "uploads": upload_stats(),
+    }
+
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """단계별 지연 시간 히스토그램 등 파이프라인 메트릭 (Prometheus 텍스트 형식)."""
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.post("/admin/reload-catalog", dependencies=[Depends(verify_api_token)])
+def reload_catalog():
+    return {"status": "reloaded", "skills": reload_skill_catalog()}
+
+
+def _validate_engine(engine):
+    if engine is not None and engine not in ENGINES:
+        raise HTTPException(400, f"Unknown engine: {engine} (choose from {', '.join(ENGINES)})")
+
+
+def _validate_upload(file, engine):
+    """업로드 파일명/엔진을 검사하고 파일명을 반환합니다."""
     filename = file.filename or ""
     if not filename.lower().endswith('.pptx'):
         raise HTTPException(400, "Only .pptx files are supported")
+    _validate_engine(engine)
+    return filename
 
-    content = await file.read()
-    try:
-        prs = Presentation(BytesIO(content))
-    except Exception as e:
-        raise HTTPException(400, f"Failed to parse PPTX: {e}")
-
-    courses = group_slides_into_courses(prs)
-    if not courses:
-        return {"source_file": filename, "courses": []}
-
-    results = []
-    for idx, course in enumerate(courses):
-        full_overview = "\n\n".join(course['overview'])
-        full_curriculum = "\n\n".join(course['curriculum'])
-        doc_id = generate_doc_id(filename, idx + 1)
-
-        course_result = {
-            "doc_id": doc_id,
-            "curriculum_store": None,
+
+async def _generate_course(filename, course_idx, course, semaphore, no_cache, draft, on_token=None, timings=None):
+    """과정 하나의 커리큘럼 스토어 결과({"doc_id", "curriculum_store"})를 만듭니다."""
+    course_result = {
+        "doc_id": generate_doc_id(filename, course_idx),
+        "curriculum_store": None,
+    }
+
+    # Curriculum store
+    if draft:
+        # 초안도 중복 제거/규칙 추출(CPU 작업)이라 이벤트 루프를 막지 않도록 스레드에서 만듭니다.
+        md_content, metadata = await asyncio.to_thread(
+            generate_curriculum_store_draft,
+            filename, course_idx, course['overview'], course['curriculum'], timings=timings,
+        )
+    else:
+        async with semaphore:
+            md_content, metadata = await agenerate_curriculum_store_markdown(
+                filename, course_idx, course['overview'], course['curriculum'], use_cache=not no_cache,
+                on_token=on_token, timings=timings,
+            )
+    if md_content and metadata:
+        course_result["curriculum_store"] = {
+            "content": md_content,
+            "metadata": metadata,
         }
+    return course_result
+
+
+def _parse_error(e):
+    metrics.PIPELINE_ERRORS.inc(stage="parse")
+    return HTTPException(400, f"Failed to parse PPTX: {e}")
+
+
+async def run_extraction(filename, source, engine=None, text_only=None, no_cache=False, batch=None, draft=False,
+                         semaphore=None, timings=None, cpu_profile=False):
+    """업로드 하나를 파싱하고 과정별 커리큘럼 스토어 결과를 만듭니다.
+
+    semaphore를 넘기면 여러 업로드가 LLM 동시 호출 예산을 공유합니다 (기본은 요청마다 새로 만듦).
+    파싱/생성 단계별 시간과 슬라이드/과정 수는 timings(StageTimings)에 쌓고 메트릭으로도 기록합니다.
+    cpu_profile이면 파싱(CPU 구간)을 cProfile로 재고 요약을 timings.cpu_profile에 넣습니다.
+
+    Returns:
+        (과정 결과 목록, 파싱 구간 Python 힙 최대치 KB 또는 None)
+    Raises:
+        HTTPException(400): PPTX 파싱 실패
+    """
+    parse_peak_kb = None
+    if timings is None:
+        timings = StageTimings()
+    if cpu_profile:
+        # cProfile은 실행한 스레드만 재므로 파싱을 한 스레드에서 끝낸 뒤 생성을 시작합니다.
+        try:
+            courses, timings.cpu_profile = await asyncio.to_thread(
+                profile_call, parse_courses, source, engine, text_only, timings
+            )
+        except Exception as e:
+            raise _parse_error(e)
+        course_iter = iter(courses)
+    elif TRACE_PARSE_MEMORY:
+        # 메모리 측정 모드에서는 파싱을 먼저 끝내고 측정값을 얻습니다.
+        try:
+            courses, parse_peak_kb = parse_with_memory_report(source, engine, text_only, timings)
+        except Exception as e:
+            raise _parse_error(e)
+        course_iter = iter(courses)
+    elif parse_pool.pool_enabled():
+        # 파싱 프로세스 풀에서 과정 목록 전체를 파싱합니다 (이벤트 루프/GIL과 분리).
+        try:
+            course_iter = iter(await parse_pool.parse_courses_in_pool(source, engine, text_only, timings))
+        except Exception as e:
+            raise _parse_error(e)
+    else:
+        # 파싱은 백그라운드 스레드에서 계속되고, 완성된 과정부터 LLM 생성을 시작합니다.
+        course_iter = iter_courses_background(source, engine, text_only, timings)
+
+    # 과정이 완성되는 대로 LLM 생성을 동시에 시작하되, 요청당 동시 호출 수는 제한합니다.
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(EXTRACT_LLM_CONCURRENCY)
+
+    if (CURRICULUM_BATCH_MODE if batch is None else batch) and not draft:
+        # 배치 모드는 과정을 모두 모은 뒤 JSON 모드 호출로 묶어 생성합니다.
+        try:
+            courses = await asyncio.to_thread(list, course_iter)
+        except Exception as e:
+            raise _parse_error(e)
+        metrics.observe_deck(timings)
+        course_inputs = [
+            (idx + 1, course['overview'], course['curriculum'])
+            for idx, course in enumerate(courses)
+        ]
+        generated = await agenerate_curriculum_store_batch(
+            filename, course_inputs, use_cache=not no_cache, semaphore=semaphore, timings=timings
+        )
+        results = []
+        for course_idx in range(1, len(courses) + 1):
+            md_content, metadata = generated[course_idx]
+            results.append({
+                "doc_id": generate_doc_id(filename, course_idx),
+                "curriculum_store": {"content": md_content, "metadata": metadata}
+                if md_content and metadata else None,
+            })
+        return results, parse_peak_kb
+
+    tasks = []
+    try:
+        while True:
+            try:
+                course = await asyncio.to_thread(next, course_iter, None)
+            except Exception as e:
+                raise _parse_error(e)
+            if course is None:
+                break
+            tasks.append(asyncio.create_task(
+                _generate_course(filename, len(tasks) + 1, course, semaphore, no_cache, draft, timings=timings)
+            ))
+        metrics.observe_deck(timings)
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+    return list(results), parse_peak_kb
+
+
+def _result_options(engine, text_only, batch, draft):
+    """결과에 영향을 주는 요청 옵션을 기본값까지 풀어 결과 캐시 키에 씁니다."""
+    return {
+        "engine": engine or DEFAULT_ENGINE,
+        "text_only": DEFAULT_TEXT_ONLY if text_only is None else text_only,
+        "batch": False if draft else (CURRICULUM_BATCH_MODE if batch is None else batch),
+        "draft": draft,
+    }
+
+
+# ?profile= / X-Profile 값 → 프로파일 모드 (None: 끔, "timings": 단계 시간, "cpu": 단계 시간 + cProfile)
+PROFILE_MODES = {"0": None, "false": None, "1": "timings", "true": "timings", "timings": "timings", "cpu": "cpu"}
 
-        # Curriculum store
-        md_content, metadata = generate_curriculum_store_markdown(
-            filename, idx + 1, full_overview, full_curriculum
+
+def _profile_mode(profile, x_profile):
+    value = (profile if profile is not None else x_profile or "0").strip().lower()
+    if value not in PROFILE_MODES:
+        raise HTTPException(400, f"Unknown profile: {value} (choose from 1, timings, cpu)")
+    return PROFILE_MODES[value]
+
+
+def _cached_response(body, key, if_none_match):
+    """캐시된 결과를 304(ETag 일치) 또는 200 응답으로 만듭니다."""
+    headers = {"ETag": etag_for(key), "X-Result-Cache": "hit"}
+    if etag_matches(if_none_match, key):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(body, headers=headers)
+
+
+@app.post("/extract", dependencies=[Depends(verify_api_token)])
+async def extract(
+    response: Response,
+    file: UploadFile | None = File(default=None),
+    engine: str | None = Query(default=None),
+    text_only: bool | None = Query(default=None),
+    no_cache: bool = Query(default=False),
+    batch: bool | None = Query(default=None),
+    draft: bool = Query(default=False),
+    filename: str | None = Query(default=None),
+    profile: str | None = Query(default=None),
+    if_none_match: str | None = Header(default=None),
+    x_content_sha256: str | None = Header(default=None),
+    x_profile: str | None = Header(default=None),
+):
+    """PPTX를 변환합니다. 같은 업로드/옵션의 결과는 결과 캐시에서 ETag와 함께 돌려줍니다.
+
+    파일 없이 If-None-Match(이전 ETag) 또는 X-Content-SHA256 + filename으로 조회할 수도 있습니다.
+    ?profile=1(또는 X-Profile: 1)이면 응답에 단계/슬라이드/과정별 소요 시간(timings)을 붙이고,
+    profile=cpu이면 파싱 구간의 cProfile 요약도 함께 넣습니다.
+    """
+    profile_mode = _profile_mode(profile, x_profile)
+    cache = get_result_cache()
+    options = _result_options(engine, text_only, batch, draft)
+    version = pipeline_version()
+
+    if file is None:
+        _validate_engine(engine)
+        # 재업로드 없이 캐시만 조회합니다. 캐시에 없으면 파일을 올려야 합니다.
+        if x_content_sha256:
+            if not filename:
+                raise HTTPException(400, "filename query parameter is required with X-Content-SHA256")
+            key = make_result_key(x_content_sha256, filename, options, version)
+        else:
+            key = etag_key(if_none_match)
+        if key is None:
+            raise HTTPException(400, "file is required")
+        body = await asyncio.to_thread(cache.get, key, options, version) if cache is not None else None
+        if body is None:
+            raise HTTPException(404, "No cached result for this upload; send the file")
+        return _cached_response(body, key, if_none_match)
+
+    filename = _validate_upload(file, engine)
+    source = upload_source(file)
+
+    upload_sha256 = await asyncio.to_thread(hash_upload, source)
+    response.headers["X-Content-SHA256"] = upload_sha256
+    key = make_result_key(upload_sha256, filename, options, version)
+    if profile_mode is not None:
+        # 이 요청의 소요 시간을 재야 하므로 결과 캐시와 진행 중인 동일 요청을 쓰지 않습니다.
+        timings = StageTimings(detail=True)
+        started = time.perf_counter()
+        results, parse_peak_kb = await run_extraction(
+            filename, source, engine, text_only, no_cache, batch, draft,
+            timings=timings, cpu_profile=profile_mode == "cpu",
         )
-        if md_content and metadata:
-            course_result["curriculum_store"] = {
-                "content": md_content,
-                "metadata": metadata,
-            }
+        timings.add("total", time.perf_counter() - started)
+        body = _finish_extract(response, filename, results, parse_peak_kb)
+        body["timings"] = timings.to_dict()
+        response.headers["X-Result-Cache"] = "bypass"
+        return body
+
+    if cache is not None and not no_cache:
+        body = await asyncio.to_thread(cache.get, key, options, version)
+        if body is not None:
+            print(f"📦 {filename}: 결과 캐시 적중")
+            return _cached_response(body, key, if_none_match)
+
+    async def compute(owned_source):
+        try:
+            extracted = await run_extraction(filename, owned_source, engine, text_only, no_cache, batch, draft)
+        finally:
+            owned_source.close()
+        if cache is not None:
+            await asyncio.to_thread(
+                cache.put, key, options, version, {"source_file": filename, "courses": extracted[0]}
+            )
+        return extracted
+
+    def start_compute():
+        # 대표 요청에서만 호출됩니다. 공유 작업은 대표 요청이 끝나거나 끊겨 UploadFile이 닫혀도
+        # 계속 읽을 수 있도록 업로드 파일을 떼어 내 직접 소유하고, 끝나면 닫습니다.
+        return compute(detach_upload(file))
+
+    # 같은 업로드/옵션으로 동시에 진행 중인 추출이 있으면 새로 시작하지 않고 그 결과를 함께 받습니다.
+    (results, parse_peak_kb), coalesced = await _extractions.run(f"{key}:{int(no_cache)}", start_compute)
+    if coalesced:
+        print(f"📦 {filename}: 진행 중인 동일 요청에 합류")
+    body = _finish_extract(response, filename, results, parse_peak_kb)
+    response.headers["ETag"] = etag_for(key)
+    response.headers["X-Result-Cache"] = "coalesced" if coalesced else "miss"
+    return body
+
+
+def _finish_extract(response, filename, results, parse_peak_kb):
+    """메모리 헤더/로그를 남기고 /extract 응답 본문을 만듭니다."""
+    rss_kb = process_peak_rss_kb()
+    response.headers["X-Process-Peak-RSS-KB"] = str(rss_kb)
+    if parse_peak_kb is not None:
+        response.headers["X-Parse-Peak-Memory-KB"] = str(parse_peak_kb)
+    print(f"📦 {filename}: parse peak={parse_peak_kb if parse_peak_kb is not None else '-'}KB, "
+          f"process lifetime peak RSS={rss_kb}KB")
+
+    return {"source_file": filename, "courses": list(results)}
+
+
+def _format_event(event, data, sse):
+    if sse:
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    return json.dumps({"event": event, **data}, ensure_ascii=False) + "\n"
+
+
+@app.post("/extract/stream", dependencies=[Depends(verify_api_token)])
+async def extract_stream(
+    request: Request,
+    file: UploadFile = File(...),
+    engine: str | None = Query(default=None),
+    text_only: bool | None = Query(default=None),
+    no_cache: bool = Query(default=False),
+    draft: bool = Query(default=False),
+    tokens: bool = Query(default=False),
+    format: str | None = Query(default=None),
+):
+    """과정이 완성되는 순서대로 결과를 NDJSON(기본) 또는 SSE로 내보냅니다.
+
+    이벤트: course(doc_id, course_index, curriculum_store, timing), tokens=true이면 token(doc_id, delta),
+    파싱 실패 시 error, 마지막에 done.
+    """
+    filename = _validate_upload(file, engine)
+    if format not in (None, "ndjson", "sse"):
+        raise HTTPException(400, f"Unknown format: {format} (choose from ndjson, sse)")
+    sse = format == "sse" or (format is None and "text/event-stream" in request.headers.get("accept", ""))
+
+    source = upload_source(file)
+
+    started = time.perf_counter()
+    semaphore = asyncio.Semaphore(EXTRACT_LLM_CONCURRENCY)
+    events = asyncio.Queue()
+
+    def elapsed_ms():
+        return round((time.perf_counter() - started) * 1000, 1)
+
+    async def run_course(course_idx, course, parsed_ms):
+        doc_id = generate_doc_id(filename, course_idx)
+        on_token = None
+        if tokens and not draft:
+            def on_token(delta):
+                events.put_nowait(("token", {"doc_id": doc_id, "delta": delta}))
+        generation_started = time.perf_counter()
+        result = await _generate_course(filename, course_idx, course, semaphore, no_cache, draft, on_token)
+        events.put_nowait(("course", {
+            "course_index": course_idx,
+            **result,
+            "timing": {
+                "parsed_ms": parsed_ms,
+                "generate_ms": round((time.perf_counter() - generation_started) * 1000, 1),
+                "completed_ms": elapsed_ms(),
+            },
+        }))
+
+    async def produce():
+        tasks = []
+        timings = StageTimings()
+        try:
+            if parse_pool.pool_enabled():
+                try:
+                    course_iter = iter(await parse_pool.parse_courses_in_pool(source, engine, text_only, timings))
+                except Exception as e:
+                    events.put_nowait(("error", {"detail": _parse_error(e).detail}))
+                    course_iter = None
+            else:
+                course_iter = iter_courses_background(source, engine, text_only, timings)
+            while course_iter is not None:
+                try:
+                    course = await asyncio.to_thread(next, course_iter, None)
+                except Exception as e:
+                    events.put_nowait(("error", {"detail": _parse_error(e).detail}))
+                    break
+                if course is None:
+                    metrics.observe_deck(timings)
+                    break
+                tasks.append(asyncio.create_task(run_course(len(tasks) + 1, course, elapsed_ms())))
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            events.put_nowait(("done", {
+                "source_file": filename, "courses": len(tasks), "elapsed_ms": elapsed_ms(),
+            }))
+            events.put_nowait(None)
+
+    async def body():
+        producer = asyncio.create_task(produce())
+        try:
+            while (item := await events.get()) is not None:
+                yield _format_event(*item, sse)
+        finally:
+            # 클라이언트가 연결을 끊으면 진행 중인 LLM 호출도 취소합니다.
+            producer.cancel()
+
+    media_type = "text/event-stream" if sse else "application/x-ndjson"
+    return StreamingResponse(body(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+
+def _collect_batch_decks(files, archives):
+    """업로드 목록을 제안서 단위 [(파일명, 소스를 여는 함수 | None, 오류 | None)]로 펼칩니다.
+
+    .zip은 안의 .pptx 멤버마다 한 항목이 되고, 열린 ZipFile은 archives에 넣어 호출 측이 닫습니다.
+    """
+    decks = []
+    for file in files:
+        filename = file.filename or ""
+        lower = filename.lower()
+        if lower.endswith(".pptx"):
+            # 요청 본문 전체는 MAX_BATCH_UPLOAD_MB로 받으므로 제안서 하나의 한도는 여기서 확인합니다.
+            try:
+                check_deck_size(file.size)
+            except ValueError as e:
+                decks.append((filename, None, str(e)))
+                continue
+            decks.append((filename, lambda file=file: upload_source(file), None))
+        elif lower.endswith(".zip"):
+            try:
+                zf = zipfile.ZipFile(upload_source(file))
+            except zipfile.BadZipFile as e:
+                decks.append((filename, None, f"Failed to open zip: {e}"))
+                continue
+            archives.append(zf)
+            members = list(iter_zip_decks(zf))
+            if not members:
+                decks.append((filename, None, "No .pptx files in zip"))
+            for name, info in members:
+                decks.append((name, lambda zf=zf, info=info: open_zip_member(zf, info), None))
+        else:
+            decks.append((filename, None, "Only .pptx and .zip files are supported"))
+    return decks
+
+
+@app.post("/extract/batch", dependencies=[Depends(verify_api_token)])
+async def extract_batch(
+    request: Request,
+    files: list[UploadFile] = File(...),
+    engine: str | None = Query(default=None),
+    text_only: bool | None = Query(default=None),
+    no_cache: bool = Query(default=False),
+    draft: bool = Query(default=False),
+    format: str | None = Query(default=None),
+):
+    """여러 PPTX(또는 PPTX를 묶은 zip)를 한 번에 받아 제안서별 결과를 끝나는 순서대로 내보냅니다.
+
+    제안서는 EXTRACT_BATCH_CONCURRENCY개씩 동시에 처리하고, LLM 호출은 요청 전체가
+    EXTRACT_LLM_CONCURRENCY 예산을 공유합니다. 한 제안서의 실패는 error 이벤트로만 알리고
+    나머지 제안서 처리는 계속합니다.
+
+    이벤트: file(file_index, source_file, courses, elapsed_ms), error(file_index, source_file, detail),
+    마지막에 done.
+    """
+    _validate_engine(engine)
+    if format not in (None, "ndjson", "sse"):
+        raise HTTPException(400, f"Unknown format: {format} (choose from ndjson, sse)")
+    sse = format == "sse" or (format is None and "text/event-stream" in request.headers.get("accept", ""))
+
+    archives = []
+    decks = await asyncio.to_thread(_collect_batch_decks, files, archives)
+    if len(decks) > EXTRACT_BATCH_MAX_FILES:
+        for zf in archives:
+            zf.close()
+        raise HTTPException(400, f"Too many files: {len(decks)} (max {EXTRACT_BATCH_MAX_FILES})")
+
+    started = time.perf_counter()
+    deck_semaphore = asyncio.Semaphore(EXTRACT_BATCH_CONCURRENCY)
+    llm_semaphore = asyncio.Semaphore(EXTRACT_LLM_CONCURRENCY)
+    events = asyncio.Queue()
+
+    def elapsed_ms():
+        return round((time.perf_counter() - started) * 1000, 1)
+
+    async def run_deck(file_index, filename, open_source, error):
+        if error is not None:
+            events.put_nowait(("error", {"file_index": file_index, "source_file": filename, "detail": error}))
+            return False
+        async with deck_semaphore:
+            source = None
+            try:
+                source = await asyncio.to_thread(open_source)
+                results, _ = await run_extraction(
+                    filename, source, engine, text_only, no_cache, draft=draft, semaphore=llm_semaphore
+                )
+            except Exception as e:
+                detail = e.detail if isinstance(e, HTTPException) else f"{type(e).__name__}: {e}"
+                print(f"❌ {filename}: {detail}")
+                events.put_nowait(("error", {"file_index": file_index, "source_file": filename, "detail": detail}))
+                return False
+            finally:
+                # 소스(업로드 또는 zip에서 푼 임시 파일)는 이 제안서만 쓰므로 바로 닫아 디스크를 비웁니다.
+                if source is not None:
+                    source.close()
+        events.put_nowait(("file", {
+            "file_index": file_index, "source_file": filename, "courses": results, "elapsed_ms": elapsed_ms(),
+        }))
+        return True
+
+    async def produce():
+        tasks = [
+            asyncio.create_task(run_deck(i, filename, open_source, error))
+            for i, (filename, open_source, error) in enumerate(decks, 1)
+        ]
+        try:
+            succeeded = await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            for zf in archives:
+                zf.close()
+        events.put_nowait(("done", {
+            "files": len(decks), "succeeded": sum(succeeded), "failed": len(decks) - sum(succeeded),
+            "elapsed_ms": elapsed_ms(),
+        }))
+        events.put_nowait(None)
+
+    async def body():
+        producer = asyncio.create_task(produce())
+        try:
+            while (item := await events.get()) is not None:
+                yield _format_event(*item, sse)
+        finally:
+            producer.cancel()
+
+    media_type = "text/event-stream" if sse else "application/x-ndjson"
+    return StreamingResponse(body(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+
+# =========================================================
+# 비동기 작업 API (POST /jobs → GET /jobs/{job_id})
+# =========================================================
+async def _job_worker(store, wake):
+    """작업 큐에서 작업을 가져와 /extract와 같은 파이프라인으로 처리합니다.
+
+    여러 워커 프로세스가 같은 SQLite 파일을 쓰면 "database is locked" 같은 일시적 오류가 날 수 있으므로
+    작업 큐 호출(claim/renew/finish)이 실패해도 워커는 멈추지 않고 기록한 뒤 다시 시도합니다.
+    """
+    failures = 0
+    while True:
+        try:
+            job = await asyncio.to_thread(store.claim)
+            failures = 0
+        except Exception as e:
+            failures += 1
+            delay = min(JOB_POLL_INTERVAL * 2 ** (failures - 1), JOB_ERROR_BACKOFF_MAX)
+            print(f"🧾 작업 큐 조회 실패 ({type(e).__name__}: {e}), {delay:g}초 뒤 다시 시도")
+            await asyncio.sleep(delay)
+            continue
+        if job is None:
+            try:
+                await asyncio.wait_for(wake.wait(), JOB_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            wake.clear()
+            continue
+
+        async def keep_lease():
+            while True:
+                await asyncio.sleep(store.lease_seconds / 3)
+                try:
+                    renewed = await asyncio.to_thread(store.renew, job["id"], job["attempt"])
+                except Exception as e:
+                    # 임대 시간의 1/3마다 갱신하므로 한 번 실패해도 다음 주기에 다시 갱신할 수 있습니다.
+                    print(f"🧾 작업 임대 갱신 실패: {job['id']} ({type(e).__name__}: {e})")
+                    continue
+                if not renewed:
+                    print(f"🧾 작업 임대 상실: {job['id']} (시도 {job['attempt']})")
+                    return
+
+        print(f"🧾 작업 시작: {job['id']} ({job['filename']}, 시도 {job['attempt']})")
+        renewer = asyncio.create_task(keep_lease())
+        result = error = None
+        try:
+            # 저장된 업로드 경로를 그대로 넘겨 파서(zipfile)가 필요한 멤버만 읽게 합니다.
+            results, _ = await run_extraction(job["filename"], job["upload_path"], **job["params"])
+            result = {"source_file": job["filename"], "courses": results}
+        except asyncio.CancelledError:
+            # 서버 종료. 임대가 만료되면 다른 워커(또는 재시작한 이 워커)가 다시 처리합니다.
+            raise
+        except Exception as e:
+            error = e.detail if isinstance(e, HTTPException) else f"{type(e).__name__}: {e}"
+        finally:
+            renewer.cancel()
+
+        try:
+            finished = await asyncio.to_thread(store.finish, job["id"], job["attempt"], result, error)
+        except Exception as e:
+            # 기록하지 못한 작업은 임대가 만료되면 다시 처리됩니다.
+            print(f"🧾 작업 결과 기록 실패: {job['id']} ({type(e).__name__}: {e})")
+            continue
+        if not finished:
+            # 임대가 만료되어 다른 워커가 다시 가져간 작업이면 그쪽 결과를 남깁니다.
+            print(f"🧾 작업 결과 버림 (임대 상실): {job['id']} (시도 {job['attempt']})")
+        elif error is None:
+            print(f"🧾 작업 완료: {job['id']} (과정 {len(result['courses'])}개)")
+        else:
+            print(f"🧾 작업 실패: {job['id']} -> {error}")
+
 
-        results.append(course_result)
+@app.post("/jobs", status_code=202, dependencies=[Depends(verify_api_token)])
+async def submit_job(
+    file: UploadFile = File(...),
+    engine: str | None = Query(default=None),
+    text_only: bool | None = Query(default=None),
+    no_cache: bool = Query(default=False),
+    batch: bool | None = Query(default=None),
+    draft: bool = Query(default=False),
+):
+    """업로드를 작업 큐에 넣고 바로 작업 ID를 반환합니다. 결과는 GET /jobs/{job_id}로 조회합니다."""
+    filename = _validate_upload(file, engine)
+    params = {"engine": engine, "text_only": text_only, "no_cache": no_cache, "batch": batch, "draft": draft}
+    job_id = await asyncio.to_thread(get_job_store().submit, filename, file.file, params)
+    if _job_wake is not None:
+        _job_wake.set()
+    return {"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}"}
 
-    return {"source_file": filename, "courses": results}
 
+@app.get("/jobs/{job_id}", dependencies=[Depends(verify_api_token)])
+async def get_job(job_id: str):
+    job = await asyncio.to_thread(get_job_store().get, job_id)
+    if job is None:
+        raise HTTPException(404, f"Unknown job: {job_id}")
+    return job
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,11 +1,10 @@
 import os
 import re
 import json
-from pptx import Presentation
 from openai import OpenAI
 from dotenv import load_dotenv
 from utils.pptx_parser import (
-    generate_doc_id, group_slides_into_courses, strip_code_fences
+    generate_doc_id, parse_courses, strip_code_fences
 )
 
 load_dotenv()
@@ -145,8 +144,11 @@ def save_curriculum_store(filename, course_idx, md_content, metadata):
     print(f"    ✅ curriculum.md + metadata.json 저장 완료 ({safe_id}/)")
 
 
-def process_curriculum_store(source_dir=None):
-    """커리큘럼 스토어 메인 파이프라인."""
+def process_curriculum_store(source_dir=None, engine=None):
+    """커리큘럼 스토어 메인 파이프라인.
+
+    engine: PPTX 파싱 엔진 ("python-pptx" 또는 "xml"). None이면 PPTX_ENGINE 환경변수 값.
+    """
     src = source_dir or SOURCE_DIR
     if not os.path.exists(src):
         print(f"❌ 원본 폴더를 찾을 수 없습니다: {src}")
@@ -162,8 +164,7 @@ def process_curriculum_store(source_dir=None):
         print(f"📄 분석 중: {file}")
 
         try:
-            prs = Presentation(file_path)
-            courses = group_slides_into_courses(prs)
+            courses = parse_courses(file_path, engine)
             print(f"  └─ 잠재 과정 수: {len(courses)}개")
 
             for idx, course in enumerate(courses):
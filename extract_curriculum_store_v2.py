@@ -1,22 +1,45 @@
+import asyncio
+import hashlib
 import os
 import re
 import json
-from pptx import Presentation
+import threading
 from dotenv import load_dotenv
 from utils.pptx_parser import (
-    generate_doc_id, group_slides_into_courses, strip_code_fences
+    generate_doc_id, iter_courses_background, strip_code_fences
 )
-from llm_client import generate as llm_generate
+import prompt_templates
+from utils import curriculum_rules, metrics, slide_dedup, token_budget
+from utils.skill_index import SkillIndex
+from utils.stage_timing import StageTimings
+from llm_client import agenerate as llm_agenerate, astream as llm_astream, generate as llm_generate, model_label
 
 load_dotenv()
 
 SOURCE_DIR = './input'
 OUTPUT_DIR = './output/curriculum_store'
 SKILL_CATALOG_PATH = os.path.join(os.path.dirname(__file__), 'skills_catalog_v3.jsonl')
+# 0보다 크면 과정 텍스트로 카탈로그를 검색하여 상위 K개 스킬만 프롬프트에 넣습니다 (0 = 전체 카탈로그).
+SKILL_TOP_K = int(os.environ.get("SKILL_TOP_K", "0"))
+# 1이면 한 제안서의 과정들을 JSON 모드 호출 한 번(묶음 단위)으로 생성합니다.
+CURRICULUM_BATCH_MODE = os.environ.get("CURRICULUM_BATCH_MODE", "0") == "1"
+LLM_BATCH_INPUT_TOKEN_BUDGET = int(os.environ.get("LLM_BATCH_INPUT_TOKEN_BUDGET", "24000"))
+LLM_BATCH_MAX_COURSES = int(os.environ.get("LLM_BATCH_MAX_COURSES", "6"))
+# 규칙 추출 필드(duration, tools_used) 중 이 신뢰도 이상인 값은 LLM 출력 포맷에서 빼고 결과 헤더에 규칙 값을 씁니다.
+RULE_MIN_CONFIDENCE = float(os.environ.get("RULE_MIN_CONFIDENCE", "0.8"))
 
 
-def load_skill_catalog():
-    """스킬 카탈로그 JSONL을 읽어 프롬프트용 텍스트로 변환합니다."""
+# 스킬 카탈로그는 프로세스당 한 번만 읽고 렌더링합니다. 파일이 바뀌면(mtime/size) 다시 읽습니다.
+_catalog_lock = threading.Lock()
+_catalog_cache = {"signature": None, "entries": None, "rendered": None, "index": None, "digest": None}
+
+
+def _catalog_signature():
+    stat = os.stat(SKILL_CATALOG_PATH)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _read_skill_entries():
     entries = []
     with open(SKILL_CATALOG_PATH, 'r', encoding='utf-8') as f:
         for line in f:
@@ -25,7 +48,11 @@ def load_skill_catalog():
                 continue
             obj = json.loads(line)
             entries.append(obj)
+    return entries
+
 
+def _render_skill_catalog(entries):
+    """스킬 카탈로그 항목을 프롬프트용 Markdown 표로 변환합니다."""
     # 도메인별로 그룹핑
     domains = {}
     for e in entries:
@@ -44,120 +71,482 @@ def load_skill_catalog():
     return '\n'.join(lines)
 
 
-def generate_curriculum_store_markdown(filename, course_idx, overview_text, curriculum_text):
-    """GPT-4o로 테이블 포맷 보존 Markdown을 생성합니다."""
-    if len(curriculum_text) < 50:
-        return None, None
+def _cached_catalog(force=False):
+    signature = _catalog_signature()
+    with _catalog_lock:
+        if force or _catalog_cache["signature"] != signature:
+            entries = _read_skill_entries()
+            rendered = _render_skill_catalog(entries)
+            _catalog_cache.update(
+                signature=signature, entries=entries, rendered=rendered, index=SkillIndex(entries),
+                digest=hashlib.sha256(rendered.encode("utf-8")).hexdigest(),
+            )
+        return _catalog_cache
 
-    skill_catalog = load_skill_catalog()
 
-    prompt = f"""당신은 B2B 교육 제안서에서 커리큘럼을 추출하여 RAG 검색에 최적화된 Markdown으로 변환하는 전문가입니다.
+def load_skill_entries():
+    """스킬 카탈로그 항목(dict) 목록을 반환합니다 (프로세스 캐시)."""
+    return _cached_catalog()["entries"]
 
-[Input]
-- File: {filename}
-- Course Index: {course_idx}
-- Overview: {overview_text[:5000]}
-- Curriculum: {curriculum_text[:25000]}
 
-[스킬 카탈로그 - SKILL_ID 매칭 참조용]
-{skill_catalog}
+def load_skill_catalog():
+    """스킬 카탈로그 JSONL을 읽어 프롬프트용 텍스트로 변환합니다.
+
+    결과는 프로세스 단위로 캐시되며 파일의 mtime/size가 바뀔 때만 다시 읽습니다.
+    """
+    return _cached_catalog()["rendered"]
+
+
+def select_skill_catalog(course_text, top_k=None):
+    """과정 텍스트와 관련도가 높은 상위 K개 스킬만 렌더링한 카탈로그를 반환합니다.
+
+    top_k가 0이거나 검색 결과가 없으면 전체 카탈로그를 반환합니다.
+    """
+    top_k = SKILL_TOP_K if top_k is None else top_k
+    catalog = _cached_catalog()
+    if top_k <= 0:
+        return catalog["rendered"]
+    candidates = catalog["index"].search(course_text, top_k)
+    if not candidates:
+        return catalog["rendered"]
+    return _render_skill_catalog(candidates)
 
-[SKILL_ID 매칭 지침]
-- 위 스킬 카탈로그에서 이 과정의 핵심 스킬 1~3개를 선택하십시오.
-- skill_id 필드에 하이픈을 제거한 형식으로 기입하십시오 (예: G-T001 → GT001, DA-A003 → DAA003).
-- 복수 스킬은 공백 없이 쉼표로 구분하십시오 (예: GT001,GM002).
-- skill_category는 선택한 skill_id의 카테고리 접두사입니다 (예: GT, GM, DA, DAA 등). 하이픈 제거.
-- domain은 G(GenAI), D(MLDL), DA(Data Analytics & BI) 코드로 기입하십시오.
 
-[Task]
-위 Raw Text를 분석하여 아래 포맷에 정확히 맞는 Markdown을 출력하십시오.
+def reload_skill_catalog():
+    """스킬 카탈로그를 강제로 다시 읽고 항목 수를 반환합니다."""
+    return len(_cached_catalog(force=True)["entries"])
 
-[Critical Rules]
-1. 절대로 ```markdown 코드 블록으로 감싸지 마십시오. 순수 Markdown 텍스트만 출력하십시오.
-2. 없는 정보를 지어내지 마십시오. 추출할 수 없는 필드는 "정보 없음"으로 적으십시오.
-3. 강사 약력, 회사 홍보, 레퍼런스(유사 사례) 등 커리큘럼과 무관한 내용은 제거하십시오.
-4. 유효한 커리큘럼 정보가 없으면 오직 NO_DATA 라고만 출력하십시오.
-5. **가장 중요: 커리큘럼 테이블 구조를 원본 그대로 보존하십시오. 모듈별 개조식 bullet list로 변환하지 마십시오.**
-6. 원본에 Markdown 테이블(| | |)이 있으면 그대로 유지하고, 원본이 표 형태가 아니더라도 시수/모듈/내용이 구조화되어 있으면 Markdown 테이블로 정리하십시오.
 
-[Output Format - 반드시 이 구조를 따르십시오]
+def pipeline_version():
+    """생성 결과에 영향을 주는 입력(프롬프트 템플릿, 스킬 카탈로그, 모델, 전처리 설정)의 해시.
 
-# [COURSE] {{과정명}}
-domain: {{G / D / DA 중 택 1 — G=GenAI, D=MLDL, DA=Data Analytics & BI}}
-skill_category: {{하이픈 제거 형식. GT, GM, GR, GA, GC, DT, DM, DA, DC, DAT, DAM, DAA, DAC 중 택 1}}
-skill_id: {{스킬 카탈로그에서 핵심 스킬 1~3개, 하이픈 제거, 쉼표 구분. 예: GT001,GM002}}
-level: {{basic / intermediate / advanced 중 택 1}}
-industry: {{제조 / 금융 / IT / 유통 / 의료 / 교육 / 공공 / 에너지 / 건설 / 미디어 / 기타 중 택 1}}
-target_role: {{임원 / 중간관리자 / 실무자 / 신입사원 / 개발자 / 데이터분석가 / 전사 중 택 1}}
-duration: {{총 교육 시수 - 숫자만. 예: 8, 16, 24}}
-education_format: {{강의형 / 실습형 / 프로젝트형 / 혼합형 / 워크숍형 중 택 1}}
-tools_used: {{주요 도구 3개 이내, 공백 없이 쉼표 구분. 예: ChatGPT,Python,LangChain}}
+    이 값이 바뀌면 같은 PPTX라도 결과가 달라질 수 있으므로 결과 캐시 키에 포함합니다.
+    """
+    parts = [
+        prompt_templates.ROLE, prompt_templates.CATALOG_SECTION, prompt_templates.INSTRUCTIONS,
+        prompt_templates.KNOWN_FIELDS, prompt_templates.COURSE_INPUT, prompt_templates.BATCH_OUTPUT,
+        _cached_catalog()["digest"], model_label(),
+        f"top_k={SKILL_TOP_K}", f"rule={RULE_MIN_CONFIDENCE}",
+        f"budget={token_budget.LLM_INPUT_TOKEN_BUDGET}/{token_budget.LLM_OVERVIEW_TOKEN_BUDGET}"
+        f"/{token_budget.LLM_CURRICULUM_MIN_SHARE}",
+        f"batch={LLM_BATCH_INPUT_TOKEN_BUDGET}/{LLM_BATCH_MAX_COURSES}",
+        f"dedup={slide_dedup.SLIDE_DEDUP}/{slide_dedup.SLIDE_DEDUP_THRESHOLD}",
+    ]
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()[:16]
 
-## 교육 개요
-{{교육의 배경, 목적, 학습 목표를 2~4문장으로 요약}}
 
-## 커리큘럼
+def _join_slides(slides):
+    return token_budget.SLIDE_SEPARATOR.join(slides)
 
-{{커리큘럼 테이블을 원본 구조 그대로 보존하여 출력. 아래는 예시 형태:}}
 
-| 회차 | 모듈 | 시수 | 주요 내용 |
-|------|------|------|-----------|
-| 1일차 | 모듈명 | 2H | 핵심 학습 내용 요약 |
+def _prepare_course_input(course_idx, overview, curriculum):
+    """중복 슬라이드를 제거하고 입력 토큰 예산을 적용합니다.
 
-{{회차가 여러 개이면 회차별로 테이블을 분리하거나, 하나의 테이블에 회차 컬럼으로 구분}}
+    overview/curriculum은 파서가 만든 슬라이드 텍스트 목록입니다 (이어 붙이기 전).
+    Returns:
+        (InputBudget, 규칙으로 확정한 필드 dict)
+    """
+    overview, ov_chars, ov_tokens = slide_dedup.dedupe_course_slides(overview)
+    curriculum, cur_chars, cur_tokens = slide_dedup.dedupe_course_slides(curriculum)
+    if ov_chars or cur_chars:
+        print(f"    ♻️ 과정 {course_idx} 중복 슬라이드 제거: {ov_chars + cur_chars}자 / "
+              f"{ov_tokens + cur_tokens}토큰 절감")
+    # 규칙 추출은 예산으로 자르기 전(중복 제거 후) 전체 텍스트에서 합니다.
+    fields, confidence = curriculum_rules.extract_rule_metadata(_join_slides(overview), _join_slides(curriculum))
+    known_fields = curriculum_rules.confident_fields(fields, confidence, RULE_MIN_CONFIDENCE)
+    budget = token_budget.allocate(overview, curriculum)
+    note = ""
+    if budget.truncated:
+        note = f", 예산 초과로 {budget.original_tokens - budget.input_tokens}토큰 제외"
+    print(f"    🧮 과정 {course_idx} 입력 토큰: {budget.input_tokens} "
+          f"(개요 {budget.overview_tokens} + 커리큘럼 {budget.curriculum_tokens}{note})")
+    return budget, known_fields
 
-## DAY_FLOW
-{{각 회차별 학습 흐름을 1줄로 요약. 예:}}
-- 1일차: 기초 개념 이해 → 도구 실습
-- 2일차: 심화 응용 → 팀 프로젝트
-- 3일차: 실전 프로젝트 → 발표 및 피드백
 
-## PROGRESSION
-{{과정 전체의 난이도 흐름을 1~2문장으로 설명. 예: "기초 개념에서 시작하여 점진적으로 실전 프로젝트까지 진행하는 상향식 구조"}}
+def _course_prompt(filename, course_idx, budget, known_fields, skill_query):
+    return prompt_templates.build_curriculum_store_prompt(
+        filename, course_idx, budget.overview_text, budget.curriculum_text,
+        select_skill_catalog(skill_query), catalog_in_prefix=SKILL_TOP_K <= 0,
+        known_fields=known_fields,
+    )
 
-## DESIGN_RATIONALE
-{{이 커리큘럼이 왜 이렇게 설계되었는지, 교육 설계 의도를 2~3문장으로 설명. 예: "LLM 기초를 먼저 다루어 전사 공통 역량을 확보한 뒤, 부서별 맞춤 실습으로 즉시 업무 적용이 가능하도록 설계"}}
-"""
 
-    try:
-        result = llm_generate(prompt)
+def skill_query(overview, curriculum):
+    """select_skill_catalog에 넘기는 검색 질의 (개요 + 커리큘럼 슬라이드 원문)."""
+    return f"{_join_slides(overview)}\n{_join_slides(curriculum)}"
+
+
+def _course_request(filename, course_idx, overview, curriculum):
+    """(프롬프트, 규칙 확정 필드)를 반환합니다."""
+    budget, known_fields = _prepare_course_input(course_idx, overview, curriculum)
+    prompt = _course_prompt(filename, course_idx, budget, known_fields, skill_query(overview, curriculum))
+    return prompt, known_fields
+
+
+def _apply_known_fields(result, known_fields):
+    """LLM 결과의 필드를 규칙으로 확정한 값으로 맞춥니다."""
+    md_content, metadata = result
+    if not (md_content and metadata and known_fields):
+        return result
+    return curriculum_rules.apply_fields(md_content, metadata, known_fields)
+
 
-        if "NO_DATA" in result:
+def build_curriculum_store_prompt(filename, course_idx, overview, curriculum):
+    """커리큘럼 스토어 Markdown 생성 프롬프트를 만듭니다 (고정 prefix + 과정별 suffix).
+
+    개요/커리큘럼(슬라이드 텍스트 목록)은 중복 슬라이드를 제거한 뒤 입력 토큰 예산(LLM_INPUT_TOKEN_BUDGET) 안에서
+    슬라이드/표 행 경계로 자르고, 규칙으로 확정한 필드(RULE_MIN_CONFIDENCE 이상)는 확정값으로 넘깁니다.
+    """
+    return _course_request(filename, course_idx, overview, curriculum)[0]
+
+
+def _skip_short_input(curriculum):
+    """커리큘럼 텍스트가 너무 짧아 생성하지 않을 과정이면 True (메트릭에 skipped로 기록)."""
+    if len(_join_slides(curriculum)) < 50:
+        metrics.COURSE_RESULTS.inc(outcome="skipped")
+        return True
+    return False
+
+
+def _record_llm_error(e):
+    metrics.PIPELINE_ERRORS.inc(stage="generate")
+    print(f"  ❌ LLM Error: {e}")
+
+
+def parse_curriculum_store_result(result):
+    """LLM 응답에서 (Markdown, metadata)를 추출합니다. 유효하지 않으면 (None, None)."""
+    if "NO_DATA" in result:
+        metrics.COURSE_RESULTS.inc(outcome="no_data")
+        return None, None
+    if len(result) < 50:
+        metrics.COURSE_RESULTS.inc(outcome="short")
+        return None, None
+    metrics.COURSE_RESULTS.inc(outcome="ok")
+
+    result = strip_code_fences(result)
+
+    # metadata 추출 (헤더 필드에서 파싱)
+    metadata = {}
+    field_patterns = {
+        "domain": r'^domain:[ \t]*(.+)$',
+        "skill_category": r'^skill_category:[ \t]*(.+)$',
+        "skill_id": r'^skill_id:[ \t]*(.+)$',
+        "level": r'^level:[ \t]*(.+)$',
+        "industry": r'^industry:[ \t]*(.+)$',
+        "target_role": r'^target_role:[ \t]*(.+)$',
+        "duration": r'^duration:[ \t]*(.+)$',
+        "education_format": r'^education_format:[ \t]*(.+)$',
+        "tools_used": r'^tools_used:[ \t]*(.+)$',
+    }
+    for key, pattern in field_patterns.items():
+        match = re.search(pattern, result, re.MULTILINE)
+        if match:
+            metadata[key] = match.group(1).strip()
+
+    return result, metadata
+
+
+def _record_course(timings, course_idx, outcome, prompt=None, prepare=None, llm=None):
+    """과정별 기록(courses: 결과, 프롬프트 글자 수, 입력 준비/LLM 호출 ms)을 timings에 남깁니다."""
+    if timings is None:
+        return
+    fields = {"course": course_idx, "outcome": outcome}
+    if prompt is not None:
+        fields.update(prompt_chars=len(prompt), prepare_ms=prepare.ms, llm_ms=llm.ms)
+    timings.record("courses", **fields)
+
+
+def generate_curriculum_store_markdown(filename, course_idx, overview, curriculum, use_cache=True, timings=None):
+    """GPT-4o로 테이블 포맷 보존 Markdown을 생성합니다.
+
+    overview/curriculum: 과정의 개요/커리큘럼 슬라이드 텍스트 목록 (parse_courses 결과의 각 과정)
+
+    use_cache=False이면 LLM 응답 캐시를 거치지 않고 provider를 직접 호출합니다.
+    timings(StageTimings)를 넘기면 입력 준비(prepare)/LLM 호출(llm) 시간과 과정별 기록을 남깁니다.
+    """
+    if _skip_short_input(curriculum):
+        _record_course(timings, course_idx, "skipped")
+        return None, None
+    if timings is None:
+        timings = StageTimings()
+
+    with metrics.STAGE_SECONDS.time(stage="generate"):
+        with timings.stage("prepare") as prepare:
+            prompt, known_fields = _course_request(filename, course_idx, overview, curriculum)
+
+        outcome = "cancelled"
+        try:
+            with timings.stage("llm") as llm:
+                text = llm_generate(prompt, use_cache=use_cache)
+            result = parse_curriculum_store_result(text)
+            outcome = "ok" if result[0] else "empty"
+            return _apply_known_fields(result, known_fields)
+        except Exception as e:
+            outcome = "error"
+            _record_llm_error(e)
             return None, None
-        if len(result) < 50:
+        finally:
+            _record_course(timings, course_idx, outcome, prompt, prepare, llm)
+
+
+async def agenerate_curriculum_store_markdown(filename, course_idx, overview, curriculum,
+                                              use_cache=True, on_token=None, timings=None):
+    """generate_curriculum_store_markdown의 비동기 버전 (API 동시 생성용).
+
+    on_token(delta)을 주면 provider 응답을 스트리밍으로 받으며 조각마다 호출합니다.
+    입력 준비(중복 제거, 토큰 계산, 스킬 후보 검색)는 CPU 작업이라 스레드에서 실행합니다.
+    """
+    if _skip_short_input(curriculum):
+        _record_course(timings, course_idx, "skipped")
+        return None, None
+    if timings is None:
+        timings = StageTimings()
+
+    with metrics.STAGE_SECONDS.time(stage="generate"):
+        with timings.stage("prepare") as prepare:
+            prompt, known_fields = await asyncio.to_thread(_course_request, filename, course_idx, overview, curriculum)
+
+        outcome = "cancelled"
+        try:
+            with timings.stage("llm") as llm:
+                if on_token is None:
+                    text = await llm_agenerate(prompt, use_cache=use_cache)
+                else:
+                    chunks = []
+                    async for delta in llm_astream(prompt, use_cache=use_cache):
+                        chunks.append(delta)
+                        on_token(delta)
+                    text = "".join(chunks).strip()
+            result = parse_curriculum_store_result(text)
+            outcome = "ok" if result[0] else "empty"
+            return _apply_known_fields(result, known_fields)
+        except Exception as e:
+            outcome = "error"
+            _record_llm_error(e)
             return None, None
+        finally:
+            _record_course(timings, course_idx, outcome, prompt, prepare, llm)
+
 
-        result = strip_code_fences(result)
-
-        # metadata 추출 (헤더 필드에서 파싱)
-        metadata = {}
-        field_patterns = {
-            "domain": r'^domain:[ \t]*(.+)$',
-            "skill_category": r'^skill_category:[ \t]*(.+)$',
-            "skill_id": r'^skill_id:[ \t]*(.+)$',
-            "level": r'^level:[ \t]*(.+)$',
-            "industry": r'^industry:[ \t]*(.+)$',
-            "target_role": r'^target_role:[ \t]*(.+)$',
-            "duration": r'^duration:[ \t]*(.+)$',
-            "education_format": r'^education_format:[ \t]*(.+)$',
-            "tools_used": r'^tools_used:[ \t]*(.+)$',
+def generate_curriculum_store_draft(filename, course_idx, overview, curriculum, timings=None):
+    """LLM 없이 규칙 추출만으로 초안 Markdown과 metadata를 만듭니다 (빠른 분류/검토용).
+
+    metadata에는 "draft": True와 필드별 규칙 신뢰도(rule_confidence)가 들어갑니다.
+    """
+    if _skip_short_input(curriculum):
+        _record_course(timings, course_idx, "skipped")
+        return None, None
+    if timings is None:
+        timings = StageTimings()
+    with timings.stage("draft") as draft:
+        overview = slide_dedup.dedupe_course_slides(overview)[0]
+        curriculum = slide_dedup.dedupe_course_slides(curriculum)[0]
+        result = curriculum_rules.build_draft_document(_join_slides(overview), _join_slides(curriculum))
+    metrics.COURSE_RESULTS.inc(outcome="draft")
+    timings.record("courses", course=course_idx, outcome="draft", draft_ms=draft.ms)
+    return result
+
+
+# =========================================================
+# 배치 모드: 한 제안서의 여러 과정을 JSON 모드 호출 한 번으로 생성
+# =========================================================
+def plan_curriculum_store_batches(filename, courses):
+    """과정들을 배치 호출 계획으로 묶습니다.
+
+    courses: [(course_idx, 개요 슬라이드 목록, 커리큘럼 슬라이드 목록), ...]
+    입력 토큰 합이 LLM_BATCH_INPUT_TOKEN_BUDGET, 과정 수가 LLM_BATCH_MAX_COURSES를 넘지 않도록
+    앞에서부터 묶고, 과정 하나만 남는 묶음은 기존 과정별 프롬프트를 씁니다.
+    Returns:
+        [(course_idx 목록, 프롬프트, json_mode, {course_idx: (과정별 프롬프트, 규칙 확정 필드)}), ...]
+        (과정별 프롬프트는 배치 응답에서 빠진 과정을 다시 생성할 때 씁니다.)
+    """
+    groups = []
+    current, current_tokens = [], 0
+    for course_idx, overview, curriculum in courses:
+        if _skip_short_input(curriculum):
+            continue
+        budget, known_fields = _prepare_course_input(course_idx, overview, curriculum)
+        item = (course_idx, budget, known_fields, skill_query(overview, curriculum))
+        if current and (current_tokens + budget.input_tokens > LLM_BATCH_INPUT_TOKEN_BUDGET
+                        or len(current) >= LLM_BATCH_MAX_COURSES):
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(item)
+        current_tokens += budget.input_tokens
+    if current:
+        groups.append(current)
+
+    calls = []
+    for group in groups:
+        singles = {
+            course_idx: (_course_prompt(filename, course_idx, budget, known_fields, skill_query), known_fields)
+            for course_idx, budget, known_fields, skill_query in group
         }
-        for key, pattern in field_patterns.items():
-            match = re.search(pattern, result, re.MULTILINE)
-            if match:
-                metadata[key] = match.group(1).strip()
+        if len(group) == 1:
+            course_idx = group[0][0]
+            calls.append(([course_idx], singles[course_idx][0], False, singles))
+            continue
+        # 과정마다 후보 카탈로그가 다르면 prefix를 공유할 수 없으므로 배치는 전체 카탈로그를 씁니다.
+        prompt = prompt_templates.build_curriculum_store_batch_prompt(
+            filename,
+            [(course_idx, budget.overview_text, budget.curriculum_text, known_fields)
+             for course_idx, budget, known_fields, _ in group],
+            load_skill_catalog(),
+        )
+        calls.append(([course_idx for course_idx, *_ in group], prompt, True, singles))
+    return calls
+
+
+def parse_curriculum_store_batch_result(result, course_idxs):
+    """배치 JSON 응답을 {course_idx: (Markdown, metadata)}로 변환합니다.
+
+    응답에 빠진 과정은 결과에 넣지 않으므로 호출 측에서 과정별로 다시 생성할 수 있습니다.
+    JSON이 아니면 ValueError.
+    """
+    data = json.loads(strip_code_fences(result))
+    items = data.get("courses", []) if isinstance(data, dict) else data
+    results = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        try:
+            course_idx = int(item.get("course_index"))
+        except (TypeError, ValueError):
+            continue
+        if course_idx in course_idxs:
+            results[course_idx] = parse_curriculum_store_result(str(item.get("markdown") or "NO_DATA"))
+    return results
 
-        return result, metadata
 
+def _record_llm_call(timings, course_idxs, json_mode, prompt, llm, outcome):
+    """배치 모드의 LLM 호출별 기록(llm_calls: 과정 번호들, JSON 모드 여부, 결과, 프롬프트 글자 수, ms)."""
+    timings.record("llm_calls", courses=list(course_idxs), json_mode=json_mode, outcome=outcome,
+                   prompt_chars=len(prompt), llm_ms=llm.ms)
+
+
+def _run_single(prompt, use_cache, timings, course_idx):
+    outcome = "error"
+    try:
+        with timings.stage("llm") as llm:
+            text = llm_generate(prompt, use_cache=use_cache)
+        result = parse_curriculum_store_result(text)
+        outcome = "ok" if result[0] else "empty"
+        return result
     except Exception as e:
-        print(f"  ❌ LLM Error: {e}")
+        _record_llm_error(e)
         return None, None
+    finally:
+        _record_llm_call(timings, [course_idx], False, prompt, llm, outcome)
+
+
+def generate_curriculum_store_batch(filename, courses, use_cache=True, timings=None):
+    """한 제안서의 과정들을 배치 JSON 호출로 생성합니다.
+
+    courses: [(course_idx, 개요 슬라이드 목록, 커리큘럼 슬라이드 목록), ...]
+    배치 응답이 JSON이 아니거나 일부 과정이 빠지면 해당 과정만 과정별 호출로 다시 생성합니다.
+    timings(StageTimings)를 넘기면 배치 계획(prepare)/LLM 호출(llm) 시간과 호출별 기록을 남깁니다.
+    Returns:
+        {course_idx: (Markdown, metadata)}  (정보 부족 과정은 (None, None))
+    """
+    if timings is None:
+        timings = StageTimings()
+    results = {course_idx: (None, None) for course_idx, _, _ in courses}
+    with timings.stage("prepare"):
+        calls = plan_curriculum_store_batches(filename, courses)
+    for course_idxs, prompt, json_mode, singles in calls:
+        if not json_mode:
+            course_idx = course_idxs[0]
+            results[course_idx] = _apply_known_fields(
+                _run_single(prompt, use_cache, timings, course_idx), singles[course_idx][1]
+            )
+            continue
+        print(f"  📦 배치 호출: 과정 {course_idxs}")
+        outcome = "ok"
+        try:
+            with timings.stage("llm") as llm:
+                response = llm_generate(prompt, json_mode=True, use_cache=use_cache)
+            batch = parse_curriculum_store_batch_result(response, course_idxs)
+        except Exception as e:
+            outcome = "error"
+            metrics.PIPELINE_ERRORS.inc(stage="batch")
+            print(f"  ⚠️ 배치 응답 처리 실패, 과정별 호출로 대체: {e}")
+            batch = {}
+        _record_llm_call(timings, course_idxs, True, prompt, llm, outcome)
+        for course_idx in course_idxs:
+            single_prompt, known_fields = singles[course_idx]
+            if course_idx in batch:
+                result = batch[course_idx]
+            else:
+                result = _run_single(single_prompt, use_cache, timings, course_idx)
+            results[course_idx] = _apply_known_fields(result, known_fields)
+    return results
+
+
+async def agenerate_curriculum_store_batch(filename, courses, use_cache=True, semaphore=None, timings=None):
+    """generate_curriculum_store_batch의 비동기 버전. 배치 호출들은 동시에 실행합니다.
+
+    semaphore를 주면 각 LLM 호출을 그 안에서 실행합니다 (요청 단위 동시성 제한).
+    """
+    if timings is None:
+        timings = StageTimings()
+    results = {course_idx: (None, None) for course_idx, _, _ in courses}
+    semaphore = semaphore or asyncio.Semaphore(len(results) or 1)
+
+    async def run_single(course_idx, prompt):
+        async with semaphore:
+            outcome = "error"
+            try:
+                with timings.stage("llm") as llm:
+                    text = await llm_agenerate(prompt, use_cache=use_cache)
+                result = parse_curriculum_store_result(text)
+                outcome = "ok" if result[0] else "empty"
+                return result
+            except Exception as e:
+                _record_llm_error(e)
+                return None, None
+            finally:
+                _record_llm_call(timings, [course_idx], False, prompt, llm, outcome)
+
+    async def run(course_idxs, prompt, json_mode, singles):
+        if not json_mode:
+            course_idx = course_idxs[0]
+            results[course_idx] = _apply_known_fields(await run_single(course_idx, prompt), singles[course_idx][1])
+            return
+        print(f"  📦 배치 호출: 과정 {course_idxs}")
+        outcome = "ok"
+        try:
+            async with semaphore:
+                with timings.stage("llm") as llm:
+                    response = await llm_agenerate(prompt, json_mode=True, use_cache=use_cache)
+            batch = parse_curriculum_store_batch_result(response, course_idxs)
+        except Exception as e:
+            outcome = "error"
+            metrics.PIPELINE_ERRORS.inc(stage="batch")
+            print(f"  ⚠️ 배치 응답 처리 실패, 과정별 호출로 대체: {e}")
+            batch = {}
+        _record_llm_call(timings, course_idxs, True, prompt, llm, outcome)
+        missing = [course_idx for course_idx in course_idxs if course_idx not in batch]
+        batch.update(zip(missing, await asyncio.gather(
+            *(run_single(course_idx, singles[course_idx][0]) for course_idx in missing)
+        )))
+        for course_idx in course_idxs:
+            results[course_idx] = _apply_known_fields(batch[course_idx], singles[course_idx][1])
+
+    with timings.stage("prepare"):
+        calls = await asyncio.to_thread(plan_curriculum_store_batches, filename, courses)
+    await asyncio.gather(*(run(*call) for call in calls))
+    return results
+
+
+def store_dir_name(filename, course_idx):
+    """과정의 커리큘럼 스토어 출력 폴더 이름 (doc_id에서 파일 시스템에 안전한 문자만 남김)."""
+    doc_id = generate_doc_id(filename, course_idx)
+    return re.sub(r'[^a-zA-Z0-9가-힣_]', '_', doc_id.replace('CURR::', ''))
 
 
 def save_curriculum_store(filename, course_idx, md_content, metadata):
     """curriculum.md + metadata.json을 저장합니다."""
-    doc_id = generate_doc_id(filename, course_idx)
-    safe_id = re.sub(r'[^a-zA-Z0-9가-힣_]', '_', doc_id.replace('CURR::', ''))
+    safe_id = store_dir_name(filename, course_idx)
     course_dir = os.path.join(OUTPUT_DIR, safe_id)
     os.makedirs(course_dir, exist_ok=True)
 
@@ -172,45 +561,96 @@ def save_curriculum_store(filename, course_idx, md_content, metadata):
     print(f"    ✅ curriculum.md + metadata.json 저장 완료 ({safe_id}/)")
 
 
-def process_curriculum_store(source_dir=None):
-    """커리큘럼 스토어 메인 파이프라인."""
+def process_curriculum_store(source_dir=None, engine=None, use_cache=True, batch=None, draft=False,
+                             timings_path=None):
+    """커리큘럼 스토어 메인 파이프라인.
+
+    engine: PPTX 파싱 엔진 ("python-pptx" 또는 "xml"). None이면 PPTX_ENGINE 환경변수 값.
+    use_cache: False이면 LLM 응답 캐시를 우회합니다.
+    batch: True이면 제안서의 과정들을 배치 JSON 호출로 생성합니다. None이면 CURRICULUM_BATCH_MODE.
+    draft: True이면 LLM을 호출하지 않고 규칙 기반 초안만 만듭니다.
+    timings_path: 주면 제안서별 단계 시간과 슬라이드/과정별 기록({파일명: timings})을 이 JSON 파일로 저장합니다.
+    """
+    batch = CURRICULUM_BATCH_MODE if batch is None else batch
     src = source_dir or SOURCE_DIR
     if not os.path.exists(src):
         print(f"❌ 원본 폴더를 찾을 수 없습니다: {src}")
         return
 
     os.makedirs(OUTPUT_DIR, exist_ok=True)
+    token_budget.preload_encoder()
 
     files = [f for f in os.listdir(src) if f.endswith('.pptx')]
     print(f"🚀 총 {len(files)}개의 제안서 -> [커리큘럼 스토어] 변환 시작...\n")
 
+    report = {}
     for file in files:
         file_path = os.path.join(src, file)
         print(f"📄 분석 중: {file}")
+        timings = StageTimings(detail=True) if timings_path else None
+        if timings is not None:
+            report[file] = timings
 
         try:
-            prs = Presentation(file_path)
-            courses = group_slides_into_courses(prs)
-            print(f"  └─ 잠재 과정 수: {len(courses)}개")
-
-            for idx, course in enumerate(courses):
-                full_overview = "\n\n".join(course['overview'])
-                full_curriculum = "\n\n".join(course['curriculum'])
+            if batch and not draft:
+                courses = [
+                    (idx + 1, course['overview'], course['curriculum'])
+                    for idx, course in enumerate(iter_courses_background(file_path, engine, timings=timings))
+                ]
+                results = generate_curriculum_store_batch(file, courses, use_cache=use_cache, timings=timings)
+                for course_idx, (md_content, metadata) in sorted(results.items()):
+                    if md_content and metadata:
+                        save_curriculum_store(file, course_idx, md_content, metadata)
+                    else:
+                        print(f"    🚫 [Drop] 과정 {course_idx}: 정보 부족")
+                print(f"  └─ 잠재 과정 수: {len(courses)}개")
+                continue
 
-                md_content, metadata = generate_curriculum_store_markdown(
-                    file, idx + 1, full_overview, full_curriculum
-                )
+            # 파싱은 백그라운드에서 계속되고, 완성된 과정부터 바로 LLM 생성을 시작합니다.
+            course_count = 0
+            for idx, course in enumerate(iter_courses_background(file_path, engine, timings=timings)):
+                course_count += 1
+                if draft:
+                    md_content, metadata = generate_curriculum_store_draft(
+                        file, idx + 1, course['overview'], course['curriculum'], timings=timings
+                    )
+                else:
+                    md_content, metadata = generate_curriculum_store_markdown(
+                        file, idx + 1, course['overview'], course['curriculum'], use_cache=use_cache,
+                        timings=timings,
+                    )
 
                 if md_content and metadata:
                     save_curriculum_store(file, idx + 1, md_content, metadata)
                 else:
                     print(f"    🚫 [Drop] 과정 {idx+1}: 정보 부족")
 
+            print(f"  └─ 잠재 과정 수: {course_count}개")
+
         except Exception as e:
             print(f"  ❌ 파일 처리 중 에러 발생: {file} -> {e}")
 
+    if timings_path:
+        with open(timings_path, 'w', encoding='utf-8') as f:
+            json.dump({file: timings.to_dict() for file, timings in report.items()}, f, ensure_ascii=False, indent=2)
+        print(f"⏱️ 단계별 소요 시간 저장: {timings_path}")
     print(f"\n🎉 [커리큘럼 스토어] 변환 완료! '{OUTPUT_DIR}' 폴더를 확인하세요.")
 
 
 if __name__ == "__main__":
-    process_curriculum_store()
+    import argparse
+    from utils.pptx_parser import ENGINES
+
+    parser = argparse.ArgumentParser(description="PPTX 제안서 -> 커리큘럼 스토어 변환")
+    parser.add_argument("--source", default=SOURCE_DIR, help="원본 PPTX 폴더")
+    parser.add_argument("--engine", choices=ENGINES, default=None,
+                        help="PPTX 파싱 엔진 (기본값: PPTX_ENGINE 환경변수 또는 python-pptx)")
+    parser.add_argument("--no-cache", action="store_true", help="LLM 응답 캐시를 사용하지 않음")
+    parser.add_argument("--batch", action="store_true", default=None,
+                        help="제안서의 과정들을 JSON 모드 호출 한 번으로 묶어 생성 (기본값: CURRICULUM_BATCH_MODE)")
+    parser.add_argument("--draft", action="store_true", help="LLM 없이 규칙 기반 초안만 생성 (빠른 분류용)")
+    parser.add_argument("--timings", metavar="PATH", default=None,
+                        help="제안서별 단계 시간과 슬라이드/과정별 기록을 JSON 파일로 저장")
+    args = parser.parse_args()
+    process_curriculum_store(args.source, engine=args.engine, use_cache=not args.no_cache, batch=args.batch,
+                             draft=args.draft, timings_path=args.timings)
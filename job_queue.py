@@ -0,0 +1,214 @@
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 비동기 추출 작업 큐. 업로드 파일은 디렉터리에, 작업 상태/결과는 SQLite에 보관하므로
+# 서버가 재시작되어도 대기/실행 중이던 작업이 다시 처리됩니다.
+JOBS_DIR = os.environ.get(
+    "JOBS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "jobs")
+)
+JOBS_DB_PATH = os.environ.get("JOBS_DB_PATH", os.path.join(JOBS_DIR, "jobs.sqlite3"))
+# 실행 중 작업의 임대 시간. 이 시간 동안 갱신되지 않으면(워커 종료) 다른 워커가 다시 가져갑니다.
+JOB_LEASE_SECONDS = float(os.environ.get("JOB_LEASE_SECONDS", "120"))
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "3"))
+# 완료/실패 작업 보관 기간
+JOB_TTL = float(os.environ.get("JOB_TTL", str(7 * 24 * 3600)))
+
+STATUSES = ("queued", "running", "done", "failed")
+
+
+def _remove_upload(path):
+    if path and os.path.exists(path):
+        os.remove(path)
+
+
+class JobStore:
+    """SQLite 기반 영속 작업 큐.
+
+    claim()은 대기 중이거나 임대가 만료된 작업 하나를 원자적으로 가져오므로 여러 uvicorn
+    워커 프로세스가 같은 파일을 공유해도 한 작업을 두 번 실행하지 않습니다.
+    """
+
+    def __init__(self, path=JOBS_DB_PATH, files_dir=JOBS_DIR, lease_seconds=JOB_LEASE_SECONDS,
+                 max_attempts=JOB_MAX_ATTEMPTS, ttl=JOB_TTL):
+        self.path = path
+        self.files_dir = files_dir
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            os.makedirs(self.files_dir, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY, status TEXT NOT NULL, filename TEXT NOT NULL,"
+                " params TEXT NOT NULL, upload_path TEXT, result TEXT, error TEXT,"
+                " attempts INTEGER NOT NULL DEFAULT 0, lease_until REAL,"
+                " created_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at)")
+            self._conn = conn
+        return self._conn
+
+    def submit(self, filename, source, params):
+        """업로드(파일 객체)를 저장하고 작업을 대기열에 넣은 뒤 작업 ID를 반환합니다."""
+        job_id = uuid.uuid4().hex
+        self._connect()
+        upload_path = os.path.join(self.files_dir, f"{job_id}.pptx")
+        with open(upload_path, "wb") as f:
+            shutil.copyfileobj(source, f)
+        with self._lock:
+            self._connect().execute(
+                "INSERT INTO jobs (id, status, filename, params, upload_path, created_at)"
+                " VALUES (?, 'queued', ?, ?, ?, ?)",
+                (job_id, filename, json.dumps(params), upload_path, time.time()),
+            )
+        return job_id
+
+    def claim(self):
+        """실행할 작업 하나를 임대하여 dict로 반환합니다. 없으면 None.
+
+        반환값의 attempt는 이 임대의 토큰입니다. renew()/finish()에 그대로 넘기면 임대를 잃은
+        (만료 후 다른 워커가 다시 가져간) 워커의 갱신/결과는 무시됩니다.
+        재시도 한도(max_attempts)를 넘긴 작업은 실패로 처리하고 업로드 파일을 지웁니다.
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                exhausted = conn.execute(
+                    "SELECT upload_path FROM jobs"
+                    " WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                    (now, self.max_attempts),
+                ).fetchall()
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', finished_at = ?, lease_until = NULL, upload_path = NULL,"
+                    " error = COALESCE(error, 'worker lease expired too many times')"
+                    " WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                    (now, now, self.max_attempts),
+                )
+                row = conn.execute(
+                    "SELECT id, filename, params, upload_path, attempts FROM jobs"
+                    " WHERE status = 'queued' OR (status = 'running' AND lease_until < ?)"
+                    " ORDER BY created_at LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'running', attempts = attempts + 1,"
+                        " lease_until = ?, started_at = ? WHERE id = ?",
+                        (now + self.lease_seconds, now, row[0]),
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        for (upload_path,) in exhausted:
+            _remove_upload(upload_path)
+        if row is None:
+            return None
+        return {
+            "id": row[0], "filename": row[1], "params": json.loads(row[2]),
+            "upload_path": row[3], "attempt": row[4] + 1,
+        }
+
+    def renew(self, job_id, attempt):
+        """실행 중 작업의 임대를 연장합니다. 이 임대(attempt)를 잃었으면 False."""
+        with self._lock:
+            cur = self._connect().execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND attempts = ? AND status = 'running'",
+                (time.time() + self.lease_seconds, job_id, attempt),
+            )
+        return cur.rowcount > 0
+
+    def finish(self, job_id, attempt, result=None, error=None):
+        """작업을 완료(result) 또는 실패(error)로 기록하고 업로드 파일을 지웁니다.
+
+        임대(attempt)를 잃은 워커의 호출이면 아무것도 바꾸지 않고 False를 반환합니다.
+        """
+        status = "failed" if error is not None else "done"
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT upload_path FROM jobs WHERE id = ? AND attempts = ? AND status = 'running'",
+                    (job_id, attempt),
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, lease_until = NULL,"
+                        " upload_path = NULL WHERE id = ?",
+                        (status, json.dumps(result, ensure_ascii=False) if result is not None else None,
+                         error, time.time(), job_id),
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return False
+        _remove_upload(row[0])
+        return True
+
+    def get(self, job_id):
+        """작업 상태를 dict로 반환합니다. 없으면 None."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT id, status, filename, result, error, attempts, created_at, started_at, finished_at"
+                " FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row[0], "status": row[1], "source_file": row[2],
+            "result": json.loads(row[3]) if row[3] else None, "error": row[4], "attempts": row[5],
+            "created_at": row[6], "started_at": row[7], "finished_at": row[8],
+        }
+
+    def purge(self):
+        """보관 기간이 지난 완료/실패 작업을 지우고 지운 수를 반환합니다."""
+        with self._lock:
+            cur = self._connect().execute(
+                "DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?",
+                (time.time() - self.ttl,),
+            )
+        return cur.rowcount
+
+    def stats(self):
+        """상태별 작업 수를 반환합니다."""
+        with self._lock:
+            rows = self._connect().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        stats = {status: 0 for status in STATUSES}
+        stats.update(dict(rows))
+        return stats
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_job_store():
+    """프로세스 전역 작업 저장소를 반환합니다."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = JobStore()
+    return _store
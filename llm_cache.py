@@ -0,0 +1,138 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 프롬프트는 결정적(temperature 0)이므로 같은 입력의 응답을 디스크에 보관해 재사용합니다.
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "1") != "0"
+LLM_CACHE_PATH = os.environ.get(
+    "LLM_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "llm_cache.sqlite3")
+)
+LLM_CACHE_TTL = float(os.environ.get("LLM_CACHE_TTL", str(30 * 24 * 3600)))
+LLM_CACHE_MAX_MB = float(os.environ.get("LLM_CACHE_MAX_MB", "256"))
+
+
+def make_cache_key(provider, model, json_mode, prompt):
+    """provider/model/json_mode/프롬프트 해시로 캐시 키를 만듭니다."""
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    raw = f"{provider}\0{model}\0{int(bool(json_mode))}\0{prompt_hash}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite 기반 LLM 응답 캐시. TTL 만료와 용량 초과 시 LRU(최근 접근 순) 제거를 합니다.
+
+    WAL 모드로 열어 여러 uvicorn 워커 프로세스가 같은 파일을 공유할 수 있습니다.
+    """
+
+    def __init__(self, path, ttl=LLM_CACHE_TTL, max_bytes=int(LLM_CACHE_MAX_MB * 1024 * 1024)):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = None
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+            self._conn = conn
+        return self._conn
+
+    def get(self, key, count=True):
+        """캐시된 응답을 반환합니다. 없거나 만료되었으면 None.
+
+        count=False이면 hit/miss를 세지 않습니다. 꺼낸 값을 더 검사하는 호출 측이 검사 후
+        record_lookup()으로 직접 셉니다.
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[1] > self.ttl:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._stats["evictions"] += 1
+                row = None
+            if row is None:
+                if count:
+                    self._stats["misses"] += 1
+                return None
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            if count:
+                self._stats["hits"] += 1
+            return row[0]
+
+    def record_lookup(self, hit):
+        """get(count=False)로 꺼낸 조회의 결과를 hit/miss 통계에 더합니다."""
+        with self._lock:
+            self._stats["hits" if hit else "misses"] += 1
+
+    def put(self, key, response):
+        """응답을 저장하고 용량 한도를 넘으면 오래 접근하지 않은 항목부터 제거합니다."""
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, response, size, now, now),
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn, now):
+        cur = conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+        self._stats["evictions"] += cur.rowcount
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            self._stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._connect().execute("DELETE FROM responses")
+
+    def stats(self):
+        """hit/miss/eviction 수(이 프로세스 기준)와 현재 항목 수/용량을 반환합니다."""
+        with self._lock:
+            entries, total = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            stats = dict(self._stats)
+        stats["entries"] = entries
+        stats["bytes"] = total
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """프로세스 전역 캐시를 반환합니다. 비활성화되어 있으면 None."""
+    global _cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(LLM_CACHE_PATH)
+    return _cache
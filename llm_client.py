@@ -1,42 +1,389 @@
+import asyncio
 import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+import httpx
 from dotenv import load_dotenv
 
+from llm_cache import get_cache, make_cache_key
+from llm_scheduler import LLM_OUTPUT_TOKEN_RESERVE, get_scheduler
+from utils import metrics
+from utils.token_budget import count_tokens
+
 load_dotenv()
 
 LLM_PROVIDER = os.environ.get("LLM_PROVIDER", "openai")
 
+# provider HTTP 연결 풀 설정 (프로세스 전역 클라이언트에 적용)
+LLM_MAX_CONNECTIONS = int(os.environ.get("LLM_MAX_CONNECTIONS", "20"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("LLM_MAX_KEEPALIVE_CONNECTIONS", "10"))
+LLM_KEEPALIVE_EXPIRY = float(os.environ.get("LLM_KEEPALIVE_EXPIRY", "60"))
+LLM_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", "180"))
+LLM_CONNECT_TIMEOUT = float(os.environ.get("LLM_CONNECT_TIMEOUT", "10"))
 
-def generate(prompt, json_mode=False):
-    """LLM_PROVIDER 환경변수에 따라 OpenAI 또는 Gemini를 호출합니다."""
-    if LLM_PROVIDER == "gemini":
-        return _generate_gemini(prompt, json_mode)
-    return _generate_openai(prompt, json_mode)
 
+# =========================================================
+# 클라이언트 풀
+# =========================================================
+_pool_lock = threading.Lock()
+_sync_clients = {}
+# AsyncClient의 연결은 생성된 이벤트 루프에 묶이므로 루프별로 따로 보관합니다.
+_async_clients = weakref.WeakKeyDictionary()
 
-def _generate_openai(prompt, json_mode):
+_stats_lock = threading.Lock()
+_connection_stats = {"requests": 0, "opened": 0}
+# provider/model별 토큰 사용량 (응답의 usage 필드 기준, prefix 캐시 적중 토큰 포함)
+_usage_stats = {}
+
+
+def _count(key):
+    with _stats_lock:
+        _connection_stats[key] += 1
+
+
+def _trace(name, info):
+    # httpcore trace: 새 TCP 연결을 맺을 때만 발생 (keep-alive 재사용 시에는 없음)
+    if name == "connection.connect_tcp.complete":
+        _count("opened")
+
+
+async def _atrace(name, info):
+    _trace(name, info)
+
+
+def _on_request(request):
+    _count("requests")
+    request.extensions["trace"] = _trace
+
+
+async def _aon_request(request):
+    _count("requests")
+    request.extensions["trace"] = _atrace
+
+
+def _httpx_client_args(is_async):
+    return {
+        "limits": httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+        ),
+        "timeout": httpx.Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT),
+        "event_hooks": {"request": [_aon_request if is_async else _on_request]},
+    }
+
+
+def _create_client(provider, is_async):
+    if provider == "gemini":
+        from google import genai
+        from google.genai import types
+        args_key = "async_client_args" if is_async else "client_args"
+        return genai.Client(
+            api_key=os.environ.get("GEMINI_API_KEY"),
+            http_options=types.HttpOptions(
+                timeout=int(LLM_TIMEOUT * 1000),
+                **{args_key: _httpx_client_args(is_async)},
+            ),
+        )
+
+    if is_async:
+        from openai import AsyncOpenAI
+        return AsyncOpenAI(
+            api_key=os.environ.get("OPENAI_API_KEY"),
+            max_retries=0,
+            http_client=httpx.AsyncClient(**_httpx_client_args(True)),
+        )
     from openai import OpenAI
-    client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+    return OpenAI(
+        api_key=os.environ.get("OPENAI_API_KEY"),
+        max_retries=0,
+        http_client=httpx.Client(**_httpx_client_args(False)),
+    )
+
+
+def get_client(provider, is_async=False):
+    """provider별 프로세스 전역 클라이언트를 반환합니다.
+
+    처음 호출될 때 한 번만 생성되며, 이후 요청과 배치 실행이 keep-alive 연결을 재사용합니다.
+    """
+    with _pool_lock:
+        if is_async:
+            clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+        else:
+            clients = _sync_clients
+        client = clients.get(provider)
+        if client is None:
+            client = clients[provider] = _create_client(provider, is_async)
+    return client
+
+
+def scheduler_stats():
+    """LLM 스케줄러의 대기열 깊이/대기 시간/재시도 통계를 반환합니다."""
+    return get_scheduler().stats()
+
+
+def cache_stats():
+    """LLM 응답 캐시 통계를 반환합니다. 캐시가 꺼져 있으면 {"enabled": False}."""
+    cache = get_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+def connection_stats():
+    """provider HTTP 요청 수와 새로 연 연결 수/재사용 수를 반환합니다."""
+    with _stats_lock:
+        stats = dict(_connection_stats)
+    stats["reused"] = max(0, stats["requests"] - stats["opened"])
+    return stats
+
+
+def usage_stats():
+    """provider/model별 호출 수와 입력(캐시 적중/미적중)/출력 토큰 수를 반환합니다."""
+    with _stats_lock:
+        stats = {key: dict(value) for key, value in _usage_stats.items()}
+    for value in stats.values():
+        value["uncached_input_tokens"] = value["input_tokens"] - value["cached_input_tokens"]
+        value["cached_ratio"] = (
+            value["cached_input_tokens"] / value["input_tokens"] if value["input_tokens"] else 0.0
+        )
+    return stats
+
+
+def _record_usage(input_tokens, cached_input_tokens, output_tokens):
+    key = model_label()
+    if input_tokens:
+        metrics.PROMPT_TOKENS.observe(input_tokens, provider=LLM_PROVIDER, model=_model_name())
+    with _stats_lock:
+        usage = _usage_stats.setdefault(
+            key, {"calls": 0, "input_tokens": 0, "cached_input_tokens": 0, "output_tokens": 0}
+        )
+        usage["calls"] += 1
+        usage["input_tokens"] += input_tokens or 0
+        usage["cached_input_tokens"] += cached_input_tokens or 0
+        usage["output_tokens"] += output_tokens or 0
+
+
+def _record_openai_usage(response):
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    _record_usage(
+        usage.prompt_tokens, getattr(details, "cached_tokens", 0), usage.completion_tokens
+    )
+
+
+def _record_gemini_usage(response):
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    _record_usage(
+        usage.prompt_token_count, usage.cached_content_token_count, usage.candidates_token_count
+    )
+
+
+def _model_name():
+    if LLM_PROVIDER == "gemini":
+        return os.environ.get("GEMINI_MODEL", "gemini-2.5-flash")
+    return os.environ.get("OPENAI_MODEL", "gpt-4o")
+
+
+def model_label():
+    """현재 provider/model 이름 (예: "openai/gpt-4o")."""
+    return f"{LLM_PROVIDER}/{_model_name()}"
+
+
+def _cache_key(prompt, json_mode, use_cache):
+    """캐시를 쓸 수 있으면 (cache, key), 아니면 (None, None)을 반환합니다."""
+    cache = get_cache() if use_cache else None
+    if cache is None:
+        return None, None
+    return cache, make_cache_key(LLM_PROVIDER, _model_name(), json_mode, prompt)
+
+
+def _count_cache_hit():
+    metrics.LLM_REQUESTS.inc(provider=LLM_PROVIDER, model=_model_name(), outcome="cache_hit")
+
+
+@contextmanager
+def _observe_call(prompt):
+    """provider 호출의 지연 시간, 결과(ok/error/cancelled), 프롬프트 크기를 메트릭에 기록합니다."""
+    labels = {"provider": LLM_PROVIDER, "model": _model_name()}
+    metrics.PROMPT_CHARS.observe(len(prompt))
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    except (asyncio.CancelledError, GeneratorExit):
+        outcome = "cancelled"
+        raise
+    finally:
+        metrics.LLM_SECONDS.observe(time.perf_counter() - started, **labels)
+        metrics.LLM_REQUESTS.inc(outcome=outcome, **labels)
+
+
+def _reserved_tokens(prompt):
+    """TPM 예산에서 예약할 토큰 수 (입력 예산과 같은 토큰 수 + 응답 예비분)."""
+    return count_tokens(prompt) + LLM_OUTPUT_TOKEN_RESERVE
+
+
+def generate(prompt, json_mode=False, use_cache=True):
+    """LLM_PROVIDER 환경변수에 따라 OpenAI 또는 Gemini를 호출합니다.
+
+    호출은 스케줄러(llm_scheduler)를 거쳐 RPM/TPM 예산과 429/5xx 재시도가 적용됩니다.
+    같은 provider/model/json_mode/프롬프트의 응답은 로컬 캐시에서 반환합니다.
+    use_cache=False이면 캐시를 조회/저장하지 않습니다.
+    """
+    cache, key = _cache_key(prompt, json_mode, use_cache)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            _count_cache_hit()
+            return cached
+
+    provider_call = _generate_gemini if LLM_PROVIDER == "gemini" else _generate_openai
+    with _observe_call(prompt):
+        result = get_scheduler().call(
+            lambda: provider_call(prompt, json_mode), tokens=_reserved_tokens(prompt)
+        )
+
+    if cache is not None:
+        cache.put(key, result)
+    return result
+
+
+async def agenerate(prompt, json_mode=False, use_cache=True):
+    """generate의 비동기 버전. 이벤트 루프를 막지 않고 provider를 호출합니다."""
+    cache, key = _cache_key(prompt, json_mode, use_cache)
+    if cache is not None:
+        cached = await asyncio.to_thread(cache.get, key)
+        if cached is not None:
+            _count_cache_hit()
+            return cached
+
+    provider_call = _agenerate_gemini if LLM_PROVIDER == "gemini" else _agenerate_openai
+    with _observe_call(prompt):
+        result = await get_scheduler().acall(
+            lambda: provider_call(prompt, json_mode), tokens=_reserved_tokens(prompt)
+        )
+
+    if cache is not None:
+        await asyncio.to_thread(cache.put, key, result)
+    return result
+
+
+async def astream(prompt, json_mode=False, use_cache=True):
+    """agenerate의 스트리밍 버전. provider 응답 텍스트 조각을 도착하는 대로 생성합니다.
+
+    캐시에 있으면 전체 응답을 한 조각으로 내보냅니다. 재시도는 스트림을 여는 단계(429 등)에만
+    적용되며, 스트림이 끝나면 전체 응답을 캐시에 저장합니다.
+    """
+    cache, key = _cache_key(prompt, json_mode, use_cache)
+    if cache is not None:
+        cached = await asyncio.to_thread(cache.get, key)
+        if cached is not None:
+            _count_cache_hit()
+            yield cached
+            return
+
+    provider_stream = _astream_gemini if LLM_PROVIDER == "gemini" else _astream_openai
+    chunks = []
+    # 지연 시간은 스트림을 연 시점부터 마지막 조각까지입니다.
+    with _observe_call(prompt):
+        stream = await get_scheduler().acall(
+            lambda: provider_stream(prompt, json_mode), tokens=_reserved_tokens(prompt)
+        )
+        async for delta in stream:
+            chunks.append(delta)
+            yield delta
+
+    if cache is not None:
+        await asyncio.to_thread(cache.put, key, "".join(chunks).strip())
+
+
+def _openai_kwargs(prompt, json_mode):
     kwargs = {
-        "model": os.environ.get("OPENAI_MODEL", "gpt-4o"),
+        "model": _model_name(),
         "messages": [{"role": "user", "content": prompt}],
         "temperature": 0,
     }
     if json_mode:
         kwargs["response_format"] = {"type": "json_object"}
-    response = client.chat.completions.create(**kwargs)
-    return response.choices[0].message.content.strip()
+    return kwargs
 
 
-def _generate_gemini(prompt, json_mode):
-    from google import genai
+def _gemini_kwargs(prompt, json_mode):
     from google.genai import types
-    client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
     config_kwargs = {"temperature": 0}
     if json_mode:
         config_kwargs["response_mime_type"] = "application/json"
-    response = client.models.generate_content(
-        model=os.environ.get("GEMINI_MODEL", "gemini-2.5-flash"),
-        contents=prompt,
-        config=types.GenerateContentConfig(**config_kwargs),
-    )
+    return {
+        "model": _model_name(),
+        "contents": prompt,
+        "config": types.GenerateContentConfig(**config_kwargs),
+    }
+
+
+def _generate_openai(prompt, json_mode):
+    client = get_client("openai")
+    response = client.chat.completions.create(**_openai_kwargs(prompt, json_mode))
+    _record_openai_usage(response)
+    return response.choices[0].message.content.strip()
+
+
+def _generate_gemini(prompt, json_mode):
+    client = get_client("gemini")
+    response = client.models.generate_content(**_gemini_kwargs(prompt, json_mode))
+    _record_gemini_usage(response)
     return response.text.strip()
+
+
+async def _agenerate_openai(prompt, json_mode):
+    client = get_client("openai", is_async=True)
+    response = await client.chat.completions.create(**_openai_kwargs(prompt, json_mode))
+    _record_openai_usage(response)
+    return response.choices[0].message.content.strip()
+
+
+async def _agenerate_gemini(prompt, json_mode):
+    client = get_client("gemini", is_async=True)
+    response = await client.aio.models.generate_content(**_gemini_kwargs(prompt, json_mode))
+    _record_gemini_usage(response)
+    return response.text.strip()
+
+
+async def _astream_openai(prompt, json_mode):
+    client = get_client("openai", is_async=True)
+    stream = await client.chat.completions.create(
+        **_openai_kwargs(prompt, json_mode), stream=True, stream_options={"include_usage": True}
+    )
+
+    async def deltas():
+        async for chunk in stream:
+            if getattr(chunk, "usage", None) is not None:
+                _record_openai_usage(chunk)
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    return deltas()
+
+
+async def _astream_gemini(prompt, json_mode):
+    client = get_client("gemini", is_async=True)
+    stream = await client.aio.models.generate_content_stream(**_gemini_kwargs(prompt, json_mode))
+
+    async def deltas():
+        last = None
+        async for chunk in stream:
+            last = chunk
+            if chunk.text:
+                yield chunk.text
+        if last is not None:
+            _record_gemini_usage(last)
+
+    return deltas()
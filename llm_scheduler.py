@@ -0,0 +1,247 @@
+import asyncio
+import email.utils
+import os
+import random
+import threading
+import time
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 분당 요청/토큰 예산. 0이면 해당 예산을 적용하지 않습니다.
+LLM_RPM = float(os.environ.get("LLM_RPM", "0"))
+LLM_TPM = float(os.environ.get("LLM_TPM", "0"))
+# 응답 토큰 예산 추정치 (요청 토큰 예약 시 프롬프트 토큰에 더함)
+LLM_OUTPUT_TOKEN_RESERVE = int(os.environ.get("LLM_OUTPUT_TOKEN_RESERVE", "1500"))
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", "5"))
+LLM_BACKOFF_BASE = float(os.environ.get("LLM_BACKOFF_BASE", "1"))
+LLM_BACKOFF_MAX = float(os.environ.get("LLM_BACKOFF_MAX", "60"))
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """분당 rate만큼 연속적으로 채워지는 토큰 버킷.
+
+    reserve()는 토큰을 즉시 차감(부족하면 음수 = 대기열)하고 기다려야 할 시간을 돌려주므로,
+    동기/비동기 호출 모두 락 밖에서 잠들 수 있고 요청 순서대로 처리됩니다.
+    """
+
+    def __init__(self, rate_per_minute):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = rate_per_minute
+        self.tokens = rate_per_minute
+        self.updated = time.monotonic()
+
+    def reserve(self, amount, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= amount
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+
+def _status_code(exc):
+    for attr in ("status_code", "code", "status"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def _retry_after(exc):
+    """예외에 담긴 응답의 Retry-After(초)를 반환합니다. 없으면 None."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, parsed.timestamp() - time.time())
+
+
+def is_retryable(exc):
+    """429/5xx/타임아웃/연결 오류이면 True."""
+    if isinstance(exc, httpx.TransportError):
+        return True
+    try:
+        import openai
+        if isinstance(exc, (openai.APIConnectionError, openai.APITimeoutError)):
+            return True
+    except ImportError:
+        pass
+    return _status_code(exc) in RETRYABLE_STATUS
+
+
+class LLMScheduler:
+    """LLM 호출 앞단의 스케줄러. RPM/TPM 토큰 버킷으로 호출을 늦추고,
+    재시도 가능한 오류는 Retry-After 또는 지터가 섞인 지수 백오프로 다시 시도합니다.
+
+    429를 받으면 Retry-After 동안 모든 호출을 멈춰 같은 한도에 계속 부딪히지 않게 합니다.
+    """
+
+    def __init__(self, rpm=LLM_RPM, tpm=LLM_TPM, max_retries=LLM_MAX_RETRIES,
+                 backoff_base=LLM_BACKOFF_BASE, backoff_max=LLM_BACKOFF_MAX):
+        self.requests_bucket = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens_bucket = TokenBucket(tpm) if tpm > 0 else None
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self._stats = {
+            "queue_depth": 0, "in_flight": 0, "calls": 0, "retries": 0,
+            "rate_limited": 0, "failed": 0, "wait_seconds_total": 0.0, "wait_seconds_max": 0.0,
+        }
+
+    # -----------------------------------------------------
+    # 예산/백오프 계산
+    # -----------------------------------------------------
+    def _reserve(self, tokens):
+        """예산을 예약하고 대기할 시간(초)을 반환합니다."""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self._paused_until - now)
+            if self.requests_bucket:
+                wait = max(wait, self.requests_bucket.reserve(1, now))
+            if self.tokens_bucket:
+                wait = max(wait, self.tokens_bucket.reserve(tokens, now))
+            return wait
+
+    def _backoff(self, exc, attempt):
+        """재시도 전 대기 시간(초)을 계산하고 429이면 전체 호출을 잠시 멈춥니다."""
+        retry_after = _retry_after(exc)
+        if retry_after is not None:
+            delay = retry_after + random.uniform(0, self.backoff_base)
+        else:
+            cap = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+            delay = random.uniform(cap / 2, cap)
+        with self._lock:
+            self._stats["retries"] += 1
+            if _status_code(exc) == 429:
+                self._stats["rate_limited"] += 1
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        return delay
+
+    def _record_wait(self, seconds):
+        with self._lock:
+            self._stats["wait_seconds_total"] += seconds
+            self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], seconds)
+
+    def _adjust(self, key, delta):
+        with self._lock:
+            self._stats[key] += delta
+
+    # -----------------------------------------------------
+    # 호출
+    # -----------------------------------------------------
+    def call(self, fn, tokens=0):
+        """fn()을 예산 안에서 호출하고 재시도 가능한 오류는 다시 시도합니다."""
+        self._adjust("calls", 1)
+        attempt = 0
+        while True:
+            self._adjust("queue_depth", 1)
+            wait = self._reserve(tokens)
+            try:
+                if wait > 0:
+                    time.sleep(wait)
+            finally:
+                self._adjust("queue_depth", -1)
+            self._record_wait(wait)
+
+            self._adjust("in_flight", 1)
+            try:
+                return fn()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    self._adjust("failed", 1)
+                    raise
+                error = e
+                delay = self._backoff(e, attempt)
+            finally:
+                self._adjust("in_flight", -1)
+
+            print(f"  ⏳ LLM 재시도 {attempt + 1}/{self.max_retries} ({delay:.1f}s 후): {error}")
+            self._adjust("queue_depth", 1)
+            try:
+                time.sleep(delay)
+            finally:
+                self._adjust("queue_depth", -1)
+            self._record_wait(delay)
+            attempt += 1
+
+    async def acall(self, coro_fn, tokens=0):
+        """call의 비동기 버전. coro_fn()은 매 시도마다 새 코루틴을 반환해야 합니다."""
+        self._adjust("calls", 1)
+        attempt = 0
+        while True:
+            self._adjust("queue_depth", 1)
+            wait = self._reserve(tokens)
+            try:
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            finally:
+                self._adjust("queue_depth", -1)
+            self._record_wait(wait)
+
+            self._adjust("in_flight", 1)
+            try:
+                return await coro_fn()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    self._adjust("failed", 1)
+                    raise
+                error = e
+                delay = self._backoff(e, attempt)
+            finally:
+                self._adjust("in_flight", -1)
+
+            print(f"  ⏳ LLM 재시도 {attempt + 1}/{self.max_retries} ({delay:.1f}s 후): {error}")
+            self._adjust("queue_depth", 1)
+            try:
+                await asyncio.sleep(delay)
+            finally:
+                self._adjust("queue_depth", -1)
+            self._record_wait(delay)
+            attempt += 1
+
+    def stats(self):
+        """대기열 깊이, 진행 중 호출 수, 재시도/429 수, 누적·최대 대기 시간을 반환합니다."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["wait_seconds_avg"] = stats["wait_seconds_total"] / stats["calls"] if stats["calls"] else 0.0
+        stats["rpm_budget"] = self.requests_bucket.capacity if self.requests_bucket else None
+        stats["tpm_budget"] = self.tokens_bucket.capacity if self.tokens_bucket else None
+        return stats
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """프로세스 전역 스케줄러를 반환합니다."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler()
+    return _scheduler
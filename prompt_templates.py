@@ -0,0 +1,166 @@
+"""LLM 프롬프트 템플릿.
+
+provider의 프롬프트 prefix 캐싱(OpenAI 자동 캐싱, Gemini implicit caching)은 요청 앞부분이
+이전 요청과 글자 단위로 같을 때만 적용됩니다. 그래서 모든 과정에 공통인 지시문/스킬 카탈로그/
+출력 포맷을 고정 prefix로 앞에 두고, 파일명/개요/커리큘럼처럼 과정마다 바뀌는 내용은 맨 뒤
+suffix에 둡니다.
+"""
+import re
+from functools import lru_cache
+
+ROLE = "당신은 B2B 교육 제안서에서 커리큘럼을 추출하여 RAG 검색에 최적화된 Markdown으로 변환하는 전문가입니다."
+
+CATALOG_SECTION = """[스킬 카탈로그 - SKILL_ID 매칭 참조용]
+{skill_catalog}"""
+
+INSTRUCTIONS = """[SKILL_ID 매칭 지침]
+- [스킬 카탈로그]에서 이 과정의 핵심 스킬 1~3개를 선택하십시오.
+- skill_id 필드에 하이픈을 제거한 형식으로 기입하십시오 (예: G-T001 → GT001, DA-A003 → DAA003).
+- 복수 스킬은 공백 없이 쉼표로 구분하십시오 (예: GT001,GM002).
+- skill_category는 선택한 skill_id의 카테고리 접두사입니다 (예: GT, GM, DA, DAA 등). 하이픈 제거.
+- domain은 G(GenAI), D(MLDL), DA(Data Analytics & BI) 코드로 기입하십시오.
+
+[Task]
+맨 아래 [Input]의 Raw Text를 분석하여 아래 포맷에 정확히 맞는 Markdown을 출력하십시오.
+
+[Critical Rules]
+1. 절대로 ```markdown 코드 블록으로 감싸지 마십시오. 순수 Markdown 텍스트만 출력하십시오.
+2. 없는 정보를 지어내지 마십시오. 추출할 수 없는 필드는 "정보 없음"으로 적으십시오.
+3. 강사 약력, 회사 홍보, 레퍼런스(유사 사례) 등 커리큘럼과 무관한 내용은 제거하십시오.
+4. 유효한 커리큘럼 정보가 없으면 오직 NO_DATA 라고만 출력하십시오.
+5. **가장 중요: 커리큘럼 테이블 구조를 원본 그대로 보존하십시오. 모듈별 개조식 bullet list로 변환하지 마십시오.**
+6. 원본에 Markdown 테이블(| | |)이 있으면 그대로 유지하고, 원본이 표 형태가 아니더라도 시수/모듈/내용이 구조화되어 있으면 Markdown 테이블로 정리하십시오.
+
+[Output Format - 반드시 이 구조를 따르십시오]
+
+# [COURSE] {과정명}
+domain: {G / D / DA 중 택 1 — G=GenAI, D=MLDL, DA=Data Analytics & BI}
+skill_category: {하이픈 제거 형식. GT, GM, GR, GA, GC, DT, DM, DA, DC, DAT, DAM, DAA, DAC 중 택 1}
+skill_id: {스킬 카탈로그에서 핵심 스킬 1~3개, 하이픈 제거, 쉼표 구분. 예: GT001,GM002}
+level: {basic / intermediate / advanced 중 택 1}
+industry: {제조 / 금융 / IT / 유통 / 의료 / 교육 / 공공 / 에너지 / 건설 / 미디어 / 기타 중 택 1}
+target_role: {임원 / 중간관리자 / 실무자 / 신입사원 / 개발자 / 데이터분석가 / 전사 중 택 1}
+duration: {총 교육 시수 - 숫자만. 예: 8, 16, 24}
+education_format: {강의형 / 실습형 / 프로젝트형 / 혼합형 / 워크숍형 중 택 1}
+tools_used: {주요 도구 3개 이내, 공백 없이 쉼표 구분. 예: ChatGPT,Python,LangChain}
+
+## 교육 개요
+{교육의 배경, 목적, 학습 목표를 2~4문장으로 요약}
+
+## 커리큘럼
+
+{커리큘럼 테이블을 원본 구조 그대로 보존하여 출력. 아래는 예시 형태:}
+
+| 회차 | 모듈 | 시수 | 주요 내용 |
+|------|------|------|-----------|
+| 1일차 | 모듈명 | 2H | 핵심 학습 내용 요약 |
+
+{회차가 여러 개이면 회차별로 테이블을 분리하거나, 하나의 테이블에 회차 컬럼으로 구분}
+
+## DAY_FLOW
+{각 회차별 학습 흐름을 1줄로 요약. 예:}
+- 1일차: 기초 개념 이해 → 도구 실습
+- 2일차: 심화 응용 → 팀 프로젝트
+- 3일차: 실전 프로젝트 → 발표 및 피드백
+
+## PROGRESSION
+{과정 전체의 난이도 흐름을 1~2문장으로 설명. 예: "기초 개념에서 시작하여 점진적으로 실전 프로젝트까지 진행하는 상향식 구조"}
+
+## DESIGN_RATIONALE
+{이 커리큘럼이 왜 이렇게 설계되었는지, 교육 설계 의도를 2~3문장으로 설명. 예: "LLM 기초를 먼저 다루어 전사 공통 역량을 확보한 뒤, 부서별 맞춤 실습으로 즉시 업무 적용이 가능하도록 설계"}"""
+
+KNOWN_FIELDS = """[Known Fields]
+아래 필드는 원문 표에서 이미 확정한 값입니다. [Output Format] 헤더에서 이 필드의 줄은 출력하지 마십시오.
+(값은 다른 필드와 섹션을 작성할 때 참고만 하십시오.)
+{fields}"""
+
+COURSE_INPUT = """[Input]
+- File: {filename}
+- Course Index: {course_idx}
+- Overview: {overview_text}
+- Curriculum: {curriculum_text}"""
+
+
+_PLACEHOLDER_RE = re.compile(r"\{(\w+)\}")
+
+
+def _fill(template, **values):
+    """template의 {name} 자리표시자를 한 번에 채웁니다.
+
+    .replace를 이어 쓰면 앞에서 넣은 값(슬라이드 원문 등)에 들어 있는 "{curriculum_text}" 같은
+    문자열까지 다시 치환되므로 원본 template에서만 찾아 바꿉니다. values에 없는 이름
+    ([Output Format]의 {과정명} 등)과 JSON 중괄호는 그대로 둡니다.
+    """
+    return _PLACEHOLDER_RE.sub(
+        lambda m: str(values[m.group(1)]) if m.group(1) in values else m.group(0), template
+    )
+
+
+@lru_cache(maxsize=8)
+def curriculum_store_prefix(skill_catalog=None):
+    """모든 과정에 공통인 prefix (역할, [스킬 카탈로그], 매칭 지침, 규칙, 출력 포맷)."""
+    parts = [ROLE]
+    if skill_catalog is not None:
+        parts.append(_fill(CATALOG_SECTION, skill_catalog=skill_catalog))
+    parts.append(INSTRUCTIONS)
+    return "\n\n".join(parts)
+
+
+def curriculum_store_suffix(filename, course_idx, overview_text, curriculum_text, skill_catalog=None,
+                            known_fields=None):
+    """과정마다 달라지는 suffix. skill_catalog를 주면 과정별 후보 카탈로그를 함께 넣습니다.
+
+    known_fields({필드: 값})는 규칙으로 확정한 필드로, [Input] 안에 넣고 LLM 출력에서는 빼도록 요청합니다.
+    (결과 헤더에는 curriculum_rules.apply_fields가 규칙 값을 채웁니다)
+    """
+    parts = []
+    if skill_catalog is not None:
+        parts.append(_fill(CATALOG_SECTION, skill_catalog=skill_catalog))
+    parts.append(_fill(COURSE_INPUT, filename=filename, course_idx=course_idx,
+                       overview_text=overview_text, curriculum_text=curriculum_text))
+    if known_fields:
+        parts[-1] += "\n" + _fill(
+            KNOWN_FIELDS, fields="\n".join(f"{key}: {value}" for key, value in known_fields.items())
+        )
+    return "\n\n".join(parts)
+
+
+def build_curriculum_store_prompt(filename, course_idx, overview_text, curriculum_text,
+                                  skill_catalog, catalog_in_prefix=True, known_fields=None):
+    """커리큘럼 스토어 프롬프트 = 고정 prefix + 과정별 suffix.
+
+    catalog_in_prefix=False이면(과정별 top-K 후보 카탈로그) 카탈로그를 suffix에 넣어
+    prefix는 여전히 모든 과정이 공유하도록 합니다.
+    """
+    if catalog_in_prefix:
+        prefix = curriculum_store_prefix(skill_catalog)
+        suffix = curriculum_store_suffix(filename, course_idx, overview_text, curriculum_text,
+                                         known_fields=known_fields)
+    else:
+        prefix = curriculum_store_prefix()
+        suffix = curriculum_store_suffix(filename, course_idx, overview_text, curriculum_text, skill_catalog,
+                                         known_fields)
+    return f"{prefix}\n\n{suffix}\n"
+
+
+BATCH_OUTPUT = """[Batch Output]
+아래에는 같은 제안서의 과정 {course_count}개가 각각 [Input]으로 주어집니다.
+각 [Input]마다 위 [Output Format]에 맞는 Markdown을 따로 만들고(유효한 커리큘럼이 없으면 NO_DATA),
+결과는 다른 텍스트 없이 아래 JSON 객체로만 출력하십시오. 모든 [Input]을 빠짐없이 포함하십시오.
+{"courses": [{"course_index": <Course Index 숫자>, "markdown": "<Markdown 문자열 또는 NO_DATA>"}]}"""
+
+
+def build_curriculum_store_batch_prompt(filename, course_inputs, skill_catalog):
+    """한 제안서의 여러 과정을 한 번에 처리하는 JSON 모드 프롬프트.
+
+    course_inputs: [(course_idx, overview_text, curriculum_text, known_fields), ...]
+    prefix는 과정별 프롬프트와 같으므로 provider prefix 캐시를 함께 씁니다.
+    """
+    parts = [
+        curriculum_store_prefix(skill_catalog),
+        _fill(BATCH_OUTPUT, course_count=len(course_inputs)),
+    ]
+    for course_idx, overview_text, curriculum_text, known_fields in course_inputs:
+        parts.append(curriculum_store_suffix(filename, course_idx, overview_text, curriculum_text,
+                                             known_fields=known_fields))
+    return "\n\n".join(parts) + "\n"
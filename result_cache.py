@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import threading
+
+from dotenv import load_dotenv
+
+from llm_cache import ResponseCache
+
+load_dotenv()
+
+# 같은 PPTX를 다시 올리면 파싱/LLM 없이 이전 /extract 응답을 돌려줍니다.
+# 키는 업로드 내용의 SHA-256 + 파일명 + 요청 옵션 + 파이프라인 버전(프롬프트/카탈로그/모델)입니다.
+RESULT_CACHE_ENABLED = os.environ.get("RESULT_CACHE_ENABLED", "1") != "0"
+RESULT_CACHE_PATH = os.environ.get(
+    "RESULT_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "result_cache.sqlite3")
+)
+RESULT_CACHE_TTL = float(os.environ.get("RESULT_CACHE_TTL", str(7 * 24 * 3600)))
+RESULT_CACHE_MAX_MB = float(os.environ.get("RESULT_CACHE_MAX_MB", "128"))
+
+_HASH_CHUNK = 1024 * 1024
+
+
+def hash_upload(fileobj):
+    """파일 객체 전체의 SHA-256(hex)을 구하고 처음 위치로 되돌립니다."""
+    fileobj.seek(0)
+    digest = hashlib.sha256()
+    while chunk := fileobj.read(_HASH_CHUNK):
+        digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+def make_result_key(upload_sha256, filename, options, version):
+    """업로드 해시/파일명/요청 옵션/파이프라인 버전으로 결과 캐시 키(ETag 값)를 만듭니다.
+
+    파일명은 doc_id와 프롬프트에 들어가므로 같은 내용이라도 파일명이 다르면 다른 키입니다.
+    """
+    raw = json.dumps([upload_sha256.lower(), filename, options, version], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def etag_for(key):
+    return f'"{key}"'
+
+
+def etag_matches(if_none_match, key):
+    """If-None-Match 헤더 값(쉼표 구분 목록, 약한 ETag, *)이 key와 맞는지 확인합니다."""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag_for(key):
+            return True
+    return False
+
+
+def etag_key(if_none_match):
+    """If-None-Match 헤더에서 첫 번째 ETag의 키를 꺼냅니다. 없으면 None."""
+    if not if_none_match:
+        return None
+    for tag in if_none_match.split(","):
+        tag = tag.strip().removeprefix("W/")
+        if len(tag) > 2 and tag.startswith('"') and tag.endswith('"'):
+            return tag[1:-1]
+    return None
+
+
+class ResultCache:
+    """/extract 응답 본문 캐시. 저장소는 LLM 응답 캐시와 같은 SQLite(TTL + 용량 LRU)를 씁니다.
+
+    항목에는 파이프라인 버전과 요청 옵션을 함께 저장해, ETag만으로 조회할 때도 현재 버전/옵션과
+    맞는 항목만 돌려줍니다.
+    """
+
+    def __init__(self, path=RESULT_CACHE_PATH, ttl=RESULT_CACHE_TTL,
+                 max_bytes=int(RESULT_CACHE_MAX_MB * 1024 * 1024)):
+        self._store = ResponseCache(path, ttl=ttl, max_bytes=max_bytes)
+
+    def get(self, key, options, version):
+        """캐시된 응답 본문(dict)을 반환합니다. 없거나 버전/옵션이 다르면 None.
+
+        버전/옵션이 다른 항목은 돌려주지 않으므로 hit이 아니라 miss로 셉니다.
+        """
+        cached = self._store.get(key, count=False)
+        entry = json.loads(cached) if cached is not None else None
+        hit = entry is not None and entry["version"] == version and entry["options"] == options
+        self._store.record_lookup(hit)
+        return entry["body"] if hit else None
+
+    def put(self, key, options, version, body):
+        entry = {"version": version, "options": options, "body": body}
+        self._store.put(key, json.dumps(entry, ensure_ascii=False))
+
+    def stats(self):
+        return self._store.stats()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """프로세스 전역 결과 캐시를 반환합니다. 비활성화되어 있으면 None."""
+    global _cache
+    if not RESULT_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache()
+    return _cache
+
+
+def result_cache_stats():
+    """결과 캐시 통계를 반환합니다. 캐시가 꺼져 있으면 {"enabled": False}."""
+    cache = get_result_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
@@ -0,0 +1,28 @@
+"""API 테스트 공통 설정.
+
+app을 import하기 전에 디스크 캐시와 작업 큐 워커를 꺼 두어 테스트가 .cache/를 건드리지 않고
+요청마다 파이프라인을 실제로 거치게 합니다.
+"""
+import os
+
+os.environ.setdefault("RESULT_CACHE_ENABLED", "0")
+os.environ.setdefault("LLM_CACHE_ENABLED", "0")
+os.environ.setdefault("JOB_WORKERS", "0")
+
+import pytest  # noqa: E402
+
+from test_pptx_engines import build_deck  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def deck_bytes():
+    return build_deck()
+
+
+@pytest.fixture
+def client():
+    """lifespan(작업 워커, 파싱 풀) 없이 요청만 처리하는 TestClient."""
+    from fastapi.testclient import TestClient
+
+    from app import app
+    return TestClient(app)
@@ -0,0 +1,74 @@
+from io import BytesIO
+
+from test_pptx_engines import build_deck
+from utils import curriculum_rules
+from utils.pptx_parser import parse_courses
+
+DAY_TABLE = """| 회차 | 모듈 | 시수 |
+|---|---|---|
+| {day}일차 | 오리엔테이션 | 1H |
+| {day}일차 | 실습 | 3H |"""
+
+
+def test_identical_rows_in_different_day_tables_are_counted():
+    day1 = "| 모듈 | 시수 |\n|---|---|\n| 오리엔테이션 | 1H |\n| 실습 | 3H |\n| 정리 | 1H |"
+    day2 = "| 모듈 | 시수 |\n|---|---|\n| 오리엔테이션 | 1H |\n| 실습 | 3H |\n| 발표 | 2H |"
+    text = f"{day1}\n\n{day2}"
+    assert curriculum_rules.extract_duration("", text) == ("11", curriculum_rules.CONFIDENCE_TABLE_COLUMN)
+
+
+def test_repeated_table_on_multiple_slides_is_counted_once():
+    table = DAY_TABLE.format(day=1)
+    text = f"{table}\n\n### 다음 슬라이드\n{table}"
+    assert curriculum_rules.extract_duration("", text)[0] == "4"
+
+
+def test_apply_fields_inserts_omitted_header_lines_in_order():
+    markdown = (
+        "# [COURSE] 생성형 AI 실무\n"
+        "domain: G\n"
+        "target_role: 실무자\n"
+        "education_format: 실습형\n"
+        "\n## 교육 개요\n내용"
+    )
+    fields = {"tools_used": "ChatGPT,Python", "duration": "8"}
+    markdown, metadata = curriculum_rules.apply_fields(markdown, {"domain": "G"}, fields)
+    header = markdown.split("\n\n")[0].split("\n")
+    assert header[2:] == ["target_role: 실무자", "duration: 8", "education_format: 실습형",
+                          "tools_used: ChatGPT,Python"]
+    assert metadata == {"domain": "G", "duration": "8", "tools_used": "ChatGPT,Python"}
+
+
+def test_apply_fields_overwrites_llm_value():
+    markdown, _ = curriculum_rules.apply_fields("# [COURSE] A\nduration: 16\n", {}, {"duration": "8"})
+    assert markdown == "# [COURSE] A\nduration: 8\n"
+
+
+def test_clock_range_time_column_is_not_an_hours_column():
+    text = (
+        "| 시간 | 모듈 |\n|---|---|\n| 09:00-12:00 | 이론 |\n| 13:00-17:00 | 실습 |\n\n"
+        "| 교육내용 | 시간 |\n|---|---|\n| 데이터 분석 실습 | 3H |"
+    )
+    value, confidence = curriculum_rules.extract_duration("", text)
+    assert value == "3"
+    assert confidence == curriculum_rules.CONFIDENCE_PARTIAL_TABLES < 0.8
+    assert curriculum_rules.extract_duration("", text.split("\n\n")[0]) == (None, 0.0)
+
+
+def test_column_sum_mixed_with_unit_cells_is_not_confirmed():
+    text = (
+        "| 모듈 | 시수 |\n|---|---|\n| 오리엔테이션 | 1 |\n| 실습 | 3 |\n\n"
+        "| 2일차 | 발표 | 2H |"
+    )
+    assert curriculum_rules.extract_duration("", text) == ("6", curriculum_rules.CONFIDENCE_PARTIAL_TABLES)
+    assert curriculum_rules.extract_duration("", text.split("\n\n")[0]) == (
+        "4", curriculum_rules.CONFIDENCE_TABLE_COLUMN
+    )
+
+
+def test_fixture_deck_clock_schedule_is_not_a_confirmed_duration():
+    course = parse_courses(BytesIO(build_deck()))[0]
+    fields, confidence = curriculum_rules.extract_rule_metadata(
+        "\n\n".join(course["overview"]), "\n\n".join(course["curriculum"])
+    )
+    assert curriculum_rules.confident_fields(fields, confidence, 0.8) == {}
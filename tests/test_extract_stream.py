@@ -0,0 +1,124 @@
+"""/extract/stream: NDJSON/SSE 형식, 이벤트 순서, 파싱 실패 error 이벤트, 연결 끊김 시 생성 취소."""
+import asyncio
+import json
+
+import httpx
+
+import app as app_module
+
+MARKDOWN = "# [COURSE] 과정\\ndomain: G\\nduration: 8\\n\\n## 커리큘럼\\n| 1일차 | 실습 | 8H |"
+
+
+def _ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def _stub_generator(monkeypatch, block_course=None):
+    """과정마다 token 두 개를 보내고 Markdown을 돌려주는 생성기. block_course는 취소될 때까지 멈춥니다."""
+    state = {"cancelled": [], "blocked": asyncio.Event()}
+
+    async def fake_agenerate(filename, course_idx, overview, curriculum, use_cache=True, on_token=None,
+                             timings=None):
+        if course_idx == block_course:
+            state["blocked"].set()
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                state["cancelled"].append(course_idx)
+                raise
+        for delta in ("# [COURSE] ", "과정"):
+            if on_token is not None:
+                on_token(delta)
+            await asyncio.sleep(0)
+        return MARKDOWN, {"domain": "G", "duration": "8"}
+
+    monkeypatch.setattr(app_module, "agenerate_curriculum_store_markdown", fake_agenerate)
+    return state
+
+
+def test_ndjson_events_in_order(client, deck_bytes, monkeypatch):
+    _stub_generator(monkeypatch)
+    response = client.post("/extract/stream?tokens=true", files={"file": ("deck.pptx", deck_bytes)})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = _ndjson(response)
+    assert events[-1]["event"] == "done"
+    assert events[-1]["source_file"] == "deck.pptx" and events[-1]["courses"] == 2
+    for doc_id in ("CURR::deck_c1", "CURR::deck_c2"):
+        kinds = [e["event"] for e in events if e.get("doc_id") == doc_id]
+        assert kinds == ["token", "token", "course"]
+    course = next(e for e in events if e["event"] == "course")
+    assert course["curriculum_store"] == {"content": MARKDOWN, "metadata": {"domain": "G", "duration": "8"}}
+    assert set(course["timing"]) == {"parsed_ms", "generate_ms", "completed_ms"}
+
+
+def test_sse_framing(client, deck_bytes, monkeypatch):
+    _stub_generator(monkeypatch)
+    response = client.post("/extract/stream", files={"file": ("deck.pptx", deck_bytes)},
+                           headers={"Accept": "text/event-stream"})
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.endswith("\n\n")
+    blocks = [block.split("\n") for block in response.text.strip("\n").split("\n\n")]
+    assert all(len(lines) == 2 and lines[0].startswith("event: ") and lines[1].startswith("data: ")
+               for lines in blocks)
+    kinds = [lines[0].removeprefix("event: ") for lines in blocks]
+    assert kinds == ["course", "course", "done"]
+    done = json.loads(blocks[-1][1].removeprefix("data: "))
+    assert "event" not in done and done["courses"] == 2
+
+
+def test_parse_failure_emits_error_then_done(client, monkeypatch):
+    _stub_generator(monkeypatch)
+    response = client.post("/extract/stream", files={"file": ("bad.pptx", b"not a zip")})
+
+    assert response.status_code == 200
+    events = _ndjson(response)
+    assert [e["event"] for e in events] == ["error", "done"]
+    assert events[0]["detail"].startswith("Failed to parse PPTX")
+    assert events[1]["courses"] == 0
+
+
+def test_client_disconnect_cancels_in_flight_generation(deck_bytes, monkeypatch):
+    state = _stub_generator(monkeypatch, block_course=2)
+    request = httpx.Request("POST", "http://test/extract/stream", files={"file": ("deck.pptx", deck_bytes)})
+    body = request.read()
+
+    async def scenario():
+        first_course = asyncio.Event()
+        sent = []
+        requested = False
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # 첫 과정 이벤트를 받고 2번 과정이 생성 중일 때 클라이언트가 연결을 끊습니다.
+            await first_course.wait()
+            await state["blocked"].wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+            if message["type"] == "http.response.body" and b'"event": "course"' in message.get("body", b""):
+                first_course.set()
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0", "spec_version": "2.3"}, "http_version": "1.1",
+            "method": "POST", "scheme": "http", "path": "/extract/stream", "raw_path": b"/extract/stream",
+            "query_string": b"", "root_path": "", "server": ("test", 80), "client": ("test", 1234),
+            "headers": [(k.lower().encode(), v.encode()) for k, v in request.headers.items()],
+        }
+        await asyncio.wait_for(app_module.app(scope, receive, send), 10)
+        # 취소된 생성 태스크가 CancelledError 처리를 마칠 틈을 줍니다.
+        for _ in range(10):
+            await asyncio.sleep(0)
+        # asyncio.run이 끝나며 남은 태스크를 취소하기 전에 확인합니다.
+        return sent, list(state["cancelled"])
+
+    sent, cancelled = asyncio.run(scenario())
+    bodies = b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body")
+    assert b'"event": "course"' in bodies and b'"event": "done"' not in bodies
+    assert cancelled == [2]
@@ -0,0 +1,49 @@
+import io
+import os
+import time
+
+from job_queue import JobStore
+
+
+def _store(tmp_path, **kwargs):
+    return JobStore(path=str(tmp_path / "jobs.sqlite3"), files_dir=str(tmp_path / "files"), **kwargs)
+
+
+def _expire_lease():
+    # lease_seconds=0이면 임대는 claim 시각에 끝나므로 시간이 조금만 지나도 만료됩니다.
+    time.sleep(0.01)
+
+
+def test_stale_worker_cannot_overwrite_result(tmp_path):
+    store = _store(tmp_path, lease_seconds=0)
+    job_id = store.submit("a.pptx", io.BytesIO(b"pptx"), {})
+    stale = store.claim()
+    _expire_lease()
+    current = store.claim()
+    assert (stale["id"], stale["attempt"], current["attempt"]) == (job_id, 1, 2)
+
+    assert store.renew(job_id, stale["attempt"]) is False
+    assert store.finish(job_id, stale["attempt"], error="stale") is False
+    assert store.get(job_id)["status"] == "running"
+    assert os.path.exists(current["upload_path"])
+
+    assert store.finish(job_id, current["attempt"], {"courses": []}) is True
+    job = store.get(job_id)
+    assert (job["status"], job["result"], job["error"]) == ("done", {"courses": []}, None)
+    assert not os.path.exists(current["upload_path"])
+    assert store.finish(job_id, current["attempt"], error="again") is False
+
+
+def test_exhausted_leases_fail_job_and_remove_upload(tmp_path):
+    store = _store(tmp_path, lease_seconds=0, max_attempts=2)
+    job_id = store.submit("a.pptx", io.BytesIO(b"pptx"), {})
+    upload_path = store.claim()["upload_path"]
+    _expire_lease()
+    assert store.claim()["attempt"] == 2
+    _expire_lease()
+
+    assert store.claim() is None
+    job = store.get(job_id)
+    assert (job["status"], job["error"]) == ("failed", "worker lease expired too many times")
+    assert not os.path.exists(upload_path)
+    assert os.listdir(tmp_path / "files") == []
@@ -0,0 +1,54 @@
+"""작업 큐 워커: 작업 큐(SQLite) 호출이 실패해도 워커 태스크가 멈추지 않아야 합니다."""
+import asyncio
+import sqlite3
+
+import app as app_module
+
+
+class FlakyStore:
+    """첫 claim은 database is locked를 던지고, 그다음 작업 하나를 내준 뒤 비어 있는 큐."""
+
+    lease_seconds = 3600
+
+    def __init__(self):
+        self.claims = 0
+        self.finished = []
+        self.done = asyncio.Event()
+        self.loop = asyncio.get_running_loop()
+
+    def claim(self):
+        self.claims += 1
+        if self.claims == 1:
+            raise sqlite3.OperationalError("database is locked")
+        if self.claims == 2:
+            return {"id": "job1", "filename": "a.pptx", "params": {}, "upload_path": "/nonexistent", "attempt": 1}
+        return None
+
+    def finish(self, job_id, attempt, result=None, error=None):
+        self.finished.append((job_id, attempt, result, error))
+        self.loop.call_soon_threadsafe(self.done.set)
+        return True
+
+
+def test_worker_survives_claim_error(monkeypatch):
+    async def fake_run_extraction(filename, source, **params):
+        return [{"doc_id": "CURR::a_c1"}], None
+
+    monkeypatch.setattr(app_module, "run_extraction", fake_run_extraction)
+    monkeypatch.setattr(app_module, "JOB_POLL_INTERVAL", 0.01)
+
+    async def scenario():
+        store = FlakyStore()
+        worker = asyncio.create_task(app_module._job_worker(store, asyncio.Event()))
+        try:
+            await asyncio.wait_for(store.done.wait(), 5)
+        finally:
+            worker.cancel()
+            await asyncio.gather(worker, return_exceptions=True)
+        return store
+
+    store = asyncio.run(scenario())
+    assert store.claims >= 2
+    assert store.finished == [
+        ("job1", 1, {"source_file": "a.pptx", "courses": [{"doc_id": "CURR::a_c1"}]}, None)
+    ]
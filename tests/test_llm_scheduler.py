@@ -0,0 +1,151 @@
+"""LLMScheduler 재시도: 429 + Retry-After를 돌려주는 가짜 OpenAI provider(httpx.MockTransport)로 확인합니다."""
+import asyncio
+import types
+
+import httpx
+import openai
+import pytest
+
+import llm_scheduler
+from llm_scheduler import LLMScheduler
+
+COMPLETION = {
+    "id": "chatcmpl-test", "object": "chat.completion", "created": 0, "model": "gpt-4o",
+    "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "ok"}}],
+}
+
+
+class FakeClock:
+    """llm_scheduler의 time/asyncio.sleep 대신 쓰는 시계. sleep은 기다리지 않고 시각만 옮깁니다."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    async def async_sleep(self, seconds):
+        self.sleep(seconds)
+
+
+class FakeProvider:
+    """앞의 rate_limited번은 429(Retry-After)를, 그 뒤로는 정상 응답을 돌려줍니다."""
+
+    def __init__(self, rate_limited, retry_after="2", status=429):
+        self.rate_limited = rate_limited
+        self.retry_after = retry_after
+        self.status = status
+        self.requests = 0
+
+    def __call__(self, request):
+        self.requests += 1
+        if self.requests <= self.rate_limited:
+            return httpx.Response(self.status, headers={"retry-after": self.retry_after},
+                                  json={"error": {"message": "Rate limit reached", "type": "requests"}})
+        return httpx.Response(200, json=COMPLETION)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(llm_scheduler, "time", clock)
+    monkeypatch.setattr(llm_scheduler, "asyncio", types.SimpleNamespace(sleep=clock.async_sleep))
+    return clock
+
+
+def _scheduler(max_retries=3):
+    # backoff_base=0이면 Retry-After에 지터를 더하지 않으므로 대기 시간을 정확히 비교할 수 있습니다.
+    return LLMScheduler(rpm=0, tpm=0, max_retries=max_retries, backoff_base=0)
+
+
+def _complete(provider):
+    client = openai.OpenAI(api_key="test", max_retries=0,
+                           http_client=httpx.Client(transport=httpx.MockTransport(provider)))
+    return lambda: client.chat.completions.create(model="gpt-4o", messages=[{"role": "user", "content": "hi"}])
+
+
+def _acomplete(provider):
+    client = openai.AsyncOpenAI(api_key="test", max_retries=0,
+                                http_client=httpx.AsyncClient(transport=httpx.MockTransport(provider)))
+    return lambda: client.chat.completions.create(model="gpt-4o", messages=[{"role": "user", "content": "hi"}])
+
+
+def test_retries_429_honouring_retry_after(clock):
+    provider = FakeProvider(rate_limited=2, retry_after="2")
+    scheduler = _scheduler()
+
+    response = scheduler.call(_complete(provider))
+
+    assert response.choices[0].message.content == "ok"
+    assert provider.requests == 3
+    assert clock.sleeps == [2.0, 2.0]
+    stats = scheduler.stats()
+    assert (stats["retries"], stats["rate_limited"], stats["failed"]) == (2, 2, 0)
+
+
+def test_error_surfaces_after_retries_exhausted(clock):
+    provider = FakeProvider(rate_limited=10, retry_after="1")
+    scheduler = _scheduler(max_retries=2)
+
+    with pytest.raises(openai.RateLimitError):
+        scheduler.call(_complete(provider))
+
+    assert provider.requests == 3
+    assert clock.sleeps == [1.0, 1.0]
+    assert scheduler.stats()["failed"] == 1
+
+
+def test_non_retryable_error_is_not_retried(clock):
+    provider = FakeProvider(rate_limited=1, status=400)
+    scheduler = _scheduler()
+
+    with pytest.raises(openai.BadRequestError):
+        scheduler.call(_complete(provider))
+
+    assert provider.requests == 1
+    assert clock.sleeps == []
+
+
+def test_async_retries_then_surfaces_error(clock):
+    provider = FakeProvider(rate_limited=1, retry_after="3")
+    scheduler = _scheduler()
+    assert asyncio.run(scheduler.acall(_acomplete(provider))).choices[0].message.content == "ok"
+    assert provider.requests == 2
+    assert clock.sleeps == [3.0]
+
+    provider = FakeProvider(rate_limited=10, retry_after="1")
+    with pytest.raises(openai.RateLimitError):
+        asyncio.run(_scheduler(max_retries=1).acall(_acomplete(provider)))
+    assert provider.requests == 2
+
+
+def test_course_that_still_fails_is_counted(monkeypatch):
+    import extract_curriculum_store_v2 as v2
+    from utils import metrics
+    from utils.stage_timing import StageTimings
+
+    def exhausted(prompt, **kwargs):
+        raise openai.RateLimitError("Rate limit reached", response=httpx.Response(
+            429, request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions")), body=None)
+
+    monkeypatch.setattr(v2, "llm_generate", exhausted)
+    errors = metrics.PIPELINE_ERRORS._values.get(("generate",), 0)
+    timings = StageTimings(detail=True)
+
+    result = v2.generate_curriculum_store_markdown(
+        "deck.pptx", 1, ["### 교육 개요\n대상: 실무자"],
+        ["### 커리큘럼\n| 09:00-12:00 | 생성형 AI 개요와 프롬프트 기초 |\n| 13:00-17:00 | 업무 자동화 실습 |"],
+        use_cache=False, timings=timings,
+    )
+
+    assert result == (None, None)
+    assert metrics.PIPELINE_ERRORS._values[("generate",)] == errors + 1
+    assert timings.records["courses"][0]["outcome"] == "error"
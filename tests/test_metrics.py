@@ -0,0 +1,60 @@
+"""/metrics: Prometheus 텍스트 형식과 히스토그램 bucket/sum/count 일관성."""
+import math
+import re
+
+from utils import metrics
+
+SAMPLE_RE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})? (\S+)$')
+LABEL_RE = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def _scrape(client):
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == metrics.CONTENT_TYPE
+    types, samples = {}, []
+    for line in response.text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ")
+            types[name] = kind
+        elif line and not line.startswith("#"):
+            name, labels, value = SAMPLE_RE.match(line).groups()
+            samples.append((name, dict(LABEL_RE.findall(labels or "")), float(value)))
+    return types, samples
+
+
+def _stage_histogram(samples, stage):
+    name = "pptx_stage_duration_seconds"
+    buckets = [(s[1]["le"], s[2]) for s in samples if s[0] == f"{name}_bucket" and s[1].get("stage") == stage]
+    total = next(s[2] for s in samples if s[0] == f"{name}_sum" and s[1] == {"stage": stage})
+    count = next(s[2] for s in samples if s[0] == f"{name}_count" and s[1] == {"stage": stage})
+    return buckets, total, count
+
+
+def test_parser_stage_histogram_after_extraction(client, deck_bytes):
+    response = client.post("/extract?draft=1", files={"file": ("deck.pptx", deck_bytes)})
+    assert response.status_code == 200
+    _, before = _scrape(client)
+    _, _, count_before = _stage_histogram(before, "parse")
+
+    client.post("/extract?draft=1&no_cache=1", files={"file": ("deck2.pptx", deck_bytes)})
+    types, samples = _scrape(client)
+
+    assert types["pptx_stage_duration_seconds"] == "histogram"
+    assert types["pipeline_errors_total"] == "counter"
+    # 샘플은 모두 # TYPE으로 선언된 메트릭(히스토그램은 _bucket/_sum/_count 접미사)에 속합니다.
+    for name, _, _ in samples:
+        assert name in types or re.sub(r"_(bucket|sum|count)$", "", name) in types
+
+    for stage in metrics.DECK_STAGES:
+        if not any(s[1].get("stage") == stage for s in samples):
+            continue
+        buckets, total, count = _stage_histogram(samples, stage)
+        bounds = [float(le) for le, _ in buckets]
+        values = [value for _, value in buckets]
+        assert bounds == sorted(bounds) and buckets[-1][0] == "+Inf"
+        assert values == sorted(values), f"{stage} buckets are not cumulative"
+        assert values[-1] == count and total >= 0 and not math.isnan(total)
+
+    _, _, count_after = _stage_histogram(samples, "parse")
+    assert count_after == count_before + 1
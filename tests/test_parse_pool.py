@@ -0,0 +1,31 @@
+import asyncio
+import os
+import tempfile
+
+from utils import parse_pool
+from utils.pptx_parser import parse_courses
+
+
+def test_spooled_upload_is_passed_to_worker_as_temp_path(deck_bytes, monkeypatch, tmp_path):
+    monkeypatch.setattr(parse_pool, "PARSE_POOL_WORKERS", 1)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    spooled = tempfile.SpooledTemporaryFile(max_size=1024)
+    spooled.write(deck_bytes)
+    assert spooled._rolled
+
+    copied = []
+    copy = parse_pool._copy_to_temp_path
+
+    def recording_copy(source):
+        copied.append(copy(source))
+        return copied[-1]
+
+    monkeypatch.setattr(parse_pool, "_copy_to_temp_path", recording_copy)
+    try:
+        courses = asyncio.run(parse_pool.parse_courses_in_pool(spooled))
+    finally:
+        parse_pool.shutdown_parse_pool()
+
+    assert courses == parse_courses(spooled)
+    assert len(copied) == 1 and not os.path.exists(copied[0])
+    assert os.listdir(tmp_path) == []
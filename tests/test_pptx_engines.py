@@ -0,0 +1,105 @@
+"""python-pptx 엔진과 XML 직접 파싱 엔진(engine=xml)이 같은 결과를 내는지 확인합니다."""
+from io import BytesIO
+
+import pytest
+from pptx import Presentation
+from pptx.util import Emu, Inches
+
+from utils.pptx_parser import extract_slide_features, iter_slide_features, parse_courses
+from utils.pptx_xml_parser import iter_slide_features_xml
+
+TITLE_AND_CONTENT, TITLE_ONLY, BLANK = 1, 5, 6
+
+
+def _add_table(slide, rows, top=Inches(1.5)):
+    shape = slide.shapes.add_table(len(rows), len(rows[0]), Inches(0.5), top, Inches(9), Inches(3))
+    for r, row in enumerate(rows):
+        for c, text in enumerate(row):
+            shape.table.cell(r, c).text = text
+
+
+def _titled(prs, layout, title):
+    slide = prs.slides.add_slide(prs.slide_layouts[layout])
+    slide.shapes.title.text = title
+    return slide
+
+
+def _textbox(slide, text, top):
+    slide.shapes.add_textbox(Inches(0.5), Emu(top), Inches(9), Inches(1)).text_frame.text = text
+
+
+def build_deck():
+    prs = Presentation()
+
+    # 표지: 제외 대상
+    _titled(prs, TITLE_AND_CONTENT, "목차").placeholders[1].text = "1. 개요\n2. 커리큘럼"
+
+    # 과정 1 개요: 본문 placeholder는 위치를 레이아웃에서 상속
+    _titled(prs, TITLE_AND_CONTENT, "교육 개요").placeholders[1].text = "대상: 실무자\n목표: 생성형 AI 활용"
+
+    # 제목 placeholder가 비어 있으면 가장 위의 텍스트가 제목이 됩니다.
+    # 본문 placeholder(상속 위치 1600200)가 텍스트 상자(1800000)보다 위에 있어야 OVERVIEW로 분류됩니다.
+    slide = prs.slides.add_slide(prs.slide_layouts[TITLE_AND_CONTENT])
+    slide.placeholders[1].text = "과정 소개와 기대 효과"
+    _textbox(slide, "세부 커리큘럼 안내", 1800000)
+
+    # 과정 1 커리큘럼: 제목 + 표 (셀 안 줄바꿈, 빈 셀 포함)
+    slide = _titled(prs, TITLE_ONLY, "세부 커리큘럼")
+    _add_table(slide, [
+        ["시간", "모듈", "내용"],
+        ["09:00-12:00", "1H 이론", "생성형 AI 개요\n프롬프트 기초"],
+        ["13:00-17:00", "", "업무 자동화 실습"],
+    ])
+
+    # 숨김 슬라이드
+    hidden = _titled(prs, TITLE_ONLY, "세부 커리큘럼 (비공개)")
+    hidden._element.set("show", "0")
+
+    # 제목 없는 슬라이드: 표 헤더로 CURRICULUM 판정
+    slide = prs.slides.add_slide(prs.slide_layouts[BLANK])
+    _add_table(slide, [["교육내용", "시간"], ["데이터 분석 실습", "3H"]], top=Inches(0.5))
+
+    # 과정 2: 텍스트 상자만 있는 개요 + 본문 지표로 판정되는 커리큘럼
+    slide = prs.slides.add_slide(prs.slide_layouts[BLANK])
+    _textbox(slide, "과정 개요", 300000)
+    _textbox(slide, "리더 대상 AI 전략 과정", 2500000)
+    slide = _titled(prs, TITLE_AND_CONTENT, "2차 과정")
+    slide.placeholders[1].text = "학습목표: 전략 수립\n주요내용: 사례 분석, 로드맵 작성"
+
+    # 부록: 제외 대상
+    _titled(prs, TITLE_ONLY, "회사 소개")
+
+    buf = BytesIO()
+    prs.save(buf)
+    return buf.getvalue()
+
+
+@pytest.fixture(scope="module")
+def deck():
+    return build_deck()
+
+
+def _features(features):
+    return [(f.hidden, f.title, f.blocks, f.table_headers, f.norm_body) for f in features]
+
+
+def test_slide_features_match(deck):
+    prs = Presentation(BytesIO(deck))
+
+    assert _features(iter_slide_features_xml(BytesIO(deck))) == _features(iter_slide_features(prs))
+
+
+def test_parse_courses_match(deck):
+    python_pptx = parse_courses(BytesIO(deck), "python-pptx", text_only=False)
+
+    assert parse_courses(BytesIO(deck), "xml") == python_pptx
+    assert parse_courses(BytesIO(deck), "python-pptx", text_only=True) == python_pptx
+    assert len(python_pptx) == 2
+
+
+def test_inherited_placeholder_position_picks_title(deck):
+    prs = Presentation(BytesIO(deck))
+    expected = extract_slide_features(prs.slides[2]).title
+
+    assert expected == "과정 소개와 기대 효과"
+    assert list(iter_slide_features_xml(BytesIO(deck)))[2].title == expected
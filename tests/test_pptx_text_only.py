@@ -0,0 +1,27 @@
+"""텍스트 전용 로딩: 미디어를 뺀 사본은 스풀 임시 파일에 쓰고, 결과는 전체 로드와 같아야 합니다."""
+import zipfile
+from io import BytesIO
+
+from utils import pptx_parser
+from utils.pptx_parser import parse_courses, strip_media_parts
+
+
+def _with_media(deck_bytes, size):
+    buffer = BytesIO(deck_bytes)
+    with zipfile.ZipFile(buffer, "a") as zf:
+        zf.writestr("ppt/media/image99.png", b"\x89PNG" + b"\0" * size)
+    return buffer.getvalue()
+
+
+def test_stripped_copy_spools_to_disk_and_drops_media(deck_bytes, monkeypatch):
+    monkeypatch.setattr(pptx_parser, "_STRIPPED_SPOOL_MAX_BYTES", 16 * 1024)
+    deck = _with_media(deck_bytes, 256 * 1024)
+
+    with strip_media_parts(BytesIO(deck)) as stripped:
+        assert stripped._rolled
+        with zipfile.ZipFile(stripped) as zf, zipfile.ZipFile(BytesIO(deck)) as original:
+            assert zf.namelist() == original.namelist()
+            assert zf.getinfo("ppt/media/image99.png").file_size == 0
+            assert zf.read("ppt/presentation.xml") == original.read("ppt/presentation.xml")
+
+    assert parse_courses(BytesIO(deck), text_only=True) == parse_courses(BytesIO(deck), text_only=False)
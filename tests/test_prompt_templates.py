@@ -0,0 +1,24 @@
+import prompt_templates
+
+
+def test_suffix_does_not_substitute_inside_course_text():
+    suffix = prompt_templates.curriculum_store_suffix(
+        "a.pptx", 1, "개요에 {curriculum_text} 문자열", "커리큘럼 {filename}",
+        skill_catalog="카탈로그 {overview_text}", known_fields={"duration": "{fields}"},
+    )
+    assert "카탈로그 {overview_text}" in suffix
+    assert "- Overview: 개요에 {curriculum_text} 문자열" in suffix
+    assert "- Curriculum: 커리큘럼 {filename}" in suffix
+    assert "duration: {fields}" in suffix
+
+
+def test_prefix_keeps_output_format_braces():
+    prefix = prompt_templates.curriculum_store_prefix("카탈로그 {skill_catalog}")
+    assert "카탈로그 {skill_catalog}" in prefix
+    assert "# [COURSE] {과정명}" in prefix
+
+
+def test_batch_prompt_keeps_json_example():
+    prompt = prompt_templates.build_curriculum_store_batch_prompt("a.pptx", [(1, "o", "c", None)], "cat")
+    assert "과정 1개가" in prompt
+    assert '{"courses": [{"course_index"' in prompt
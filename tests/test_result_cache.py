@@ -0,0 +1,19 @@
+from result_cache import ResultCache
+
+
+def _stats(cache):
+    stats = cache.stats()
+    return stats["hits"], stats["misses"]
+
+
+def test_version_or_options_mismatch_counts_as_miss(tmp_path):
+    cache = ResultCache(path=str(tmp_path / "results.sqlite3"))
+    cache.put("k", {"engine": "xml"}, "v1", {"courses": []})
+
+    assert cache.get("k", {"engine": "xml"}, "v2") is None
+    assert cache.get("k", {"engine": "python-pptx"}, "v1") is None
+    assert cache.get("missing", {"engine": "xml"}, "v1") is None
+    assert _stats(cache) == (0, 3)
+
+    assert cache.get("k", {"engine": "xml"}, "v1") == {"courses": []}
+    assert _stats(cache) == (1, 3)
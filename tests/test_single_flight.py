@@ -0,0 +1,44 @@
+"""진행 중인 동일 /extract 요청 합치기: 대표 요청이 끊겨도 합류한 요청은 결과를 받아야 합니다."""
+import asyncio
+
+import httpx
+
+import app as app_module
+
+
+def test_follower_gets_result_after_leader_disconnects(deck_bytes, monkeypatch):
+    gate = asyncio.Event()
+    started = asyncio.Event()
+    run_extraction = app_module.run_extraction
+
+    async def gated_run_extraction(filename, source, *args, **kwargs):
+        started.set()
+        await gate.wait()
+        # 대표 요청의 UploadFile은 이미 닫혔으므로, 여기서 읽는 것은 공유 작업이 소유한 파일이어야 합니다.
+        return await run_extraction(filename, source, *args, **kwargs)
+
+    monkeypatch.setattr(app_module, "run_extraction", gated_run_extraction)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            def extract():
+                return client.post("/extract?draft=1", files={"file": ("deck.pptx", deck_bytes)})
+
+            coalesced_before = app_module._extractions.stats()["coalesced"]
+            leader = asyncio.create_task(extract())
+            await asyncio.wait_for(started.wait(), 5)
+            follower = asyncio.create_task(extract())
+            while app_module._extractions.stats()["coalesced"] == coalesced_before:
+                await asyncio.sleep(0.01)
+
+            # 대표 요청의 연결이 끊기면 엔드포인트가 취소되고 그 요청의 UploadFile이 닫힙니다.
+            leader.cancel()
+            await asyncio.gather(leader, return_exceptions=True)
+            gate.set()
+            return await asyncio.wait_for(follower, 30)
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 200
+    assert response.headers["X-Result-Cache"] == "coalesced"
+    assert [c["doc_id"] for c in response.json()["courses"]] == ["CURR::deck_c1", "CURR::deck_c2"]
@@ -0,0 +1,27 @@
+from utils import slide_dedup
+
+DAY1 = "### 1일차\n| 시간 | 내용 |\n| --- | --- |\n| 09:00 | 생성형 AI 개요와 프롬프트 기초 |\n\n실습 중심"
+DAY2 = "### 2일차\n| 시간 | 내용 |\n| --- | --- |\n| 09:00 | 업무 자동화 시나리오 설계와 적용 |\n\n실습 중심"
+
+
+def test_slides_sharing_trailing_paragraph_are_kept_whole():
+    kept, chars_saved, _ = slide_dedup.dedupe_course_slides([DAY1, DAY2])
+
+    assert kept == [DAY1, DAY2]
+    assert chars_saved == 0
+
+
+def test_repeated_slide_is_dropped():
+    kept, chars_saved, _ = slide_dedup.dedupe_course_slides([DAY1, DAY2, DAY1])
+
+    assert kept == [DAY1, DAY2]
+    assert chars_saved == len("\n\n" + DAY1)
+
+
+def test_prepared_input_keeps_every_day_slide():
+    from extract_curriculum_store_v2 import _prepare_course_input
+
+    budget, _ = _prepare_course_input(1, ["과정 개요"], [DAY1, DAY2])
+
+    assert budget.curriculum_text == f"{DAY1}\n\n{DAY2}"
+    assert budget.curriculum_text.count("실습 중심") == 2
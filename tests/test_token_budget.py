@@ -0,0 +1,41 @@
+from utils import token_budget
+
+
+def _slides(prefix, count, lines=20):
+    return ["\n".join(f"| {prefix}{i}-{j} | 생성형 AI 실습 내용 설명 |" for j in range(lines)) for i in range(count)]
+
+
+def test_within_budget_is_unchanged():
+    result = token_budget.allocate(["개요"], ["커리큘럼"], budget=1000)
+
+    assert not result.truncated
+    assert result.overview_text == "개요"
+    assert result.curriculum_text == "커리큘럼"
+
+
+def test_overview_budget_larger_than_budget_leaves_curriculum_its_share():
+    overview = _slides("o", 10)
+    curriculum = _slides("c", 10)
+
+    result = token_budget.allocate(overview, curriculum, budget=1000, overview_budget=5000)
+
+    assert result.input_tokens <= 1000
+    assert result.curriculum_tokens >= 1000 * token_budget.LLM_CURRICULUM_MIN_SHARE - 20
+    assert result.curriculum_text
+
+
+def test_short_curriculum_gives_rest_to_overview():
+    curriculum = ["| 1H | 실습 |"]
+
+    result = token_budget.allocate(_slides("o", 10), curriculum, budget=1000, overview_budget=100)
+
+    assert result.curriculum_text == curriculum[0]
+    assert result.overview_tokens > 100
+    assert result.input_tokens <= 1000
+
+
+def test_string_input_is_one_slide():
+    text = "### 1일차\n| 09:00 | 개요 |\n\n실습 중심"
+
+    assert token_budget._as_slides(text) == [text]
+    assert token_budget._as_slides(["a", " ", "b"]) == ["a", "b"]
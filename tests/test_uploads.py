@@ -0,0 +1,83 @@
+import json
+
+from utils import uploads
+
+
+def _events(response):
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def _pptx(deck_bytes, name="a.pptx"):
+    return ("files", (name, deck_bytes, "application/vnd.openxmlformats-officedocument.presentationml.presentation"))
+
+
+def test_batch_larger_than_one_deck_limit_is_accepted(client, deck_bytes, monkeypatch):
+    monkeypatch.setattr(uploads, "MAX_UPLOAD_BYTES", len(deck_bytes) + 4096)
+    monkeypatch.setattr(uploads, "MAX_BATCH_UPLOAD_BYTES", 10 * len(deck_bytes))
+
+    response = client.post("/extract/batch?draft=1", files=[_pptx(deck_bytes, "a.pptx"), _pptx(deck_bytes, "b.pptx")])
+    assert response.status_code == 200
+    events = _events(response)
+    assert sorted(e["source_file"] for e in events if e["event"] == "file") == ["a.pptx", "b.pptx"]
+    assert events[-1]["event"] == "done"
+
+
+def test_batch_checks_each_deck_against_single_deck_limit(client, deck_bytes, monkeypatch):
+    monkeypatch.setattr(uploads, "MAX_UPLOAD_BYTES", len(deck_bytes) - 1)
+    monkeypatch.setattr(uploads, "MAX_BATCH_UPLOAD_BYTES", 10 * len(deck_bytes))
+
+    response = client.post("/extract/batch?draft=1", files=[_pptx(deck_bytes)])
+    assert response.status_code == 200
+    errors = [e for e in _events(response) if e["event"] == "error"]
+    assert len(errors) == 1 and "exceeds maximum size" in errors[0]["detail"]
+
+
+def test_batch_total_limit_still_applies(client, deck_bytes, monkeypatch):
+    monkeypatch.setattr(uploads, "MAX_BATCH_UPLOAD_BYTES", len(deck_bytes))
+    response = client.post("/extract/batch?draft=1", files=[_pptx(deck_bytes, "a.pptx"), _pptx(deck_bytes, "b.pptx")])
+    assert response.status_code == 413
+
+
+def _limited_app(max_bytes):
+    from fastapi import FastAPI, Request
+
+    app = FastAPI()
+    app.add_middleware(uploads.UploadSizeLimitMiddleware, max_bytes=max_bytes, route_limits={})
+    app.state.calls = 0
+
+    @app.post("/echo")
+    async def echo(request: Request):
+        app.state.calls += 1
+        return {"size": len(await request.body())}
+
+    return app
+
+
+def test_content_length_over_limit_is_rejected_before_the_endpoint():
+    from fastapi.testclient import TestClient
+
+    app = _limited_app(1000)
+    client = TestClient(app)
+    rejected = uploads.upload_stats()["rejected"]
+
+    assert client.post("/echo", content=b"x" * 1000).json() == {"size": 1000}
+    response = client.post("/echo", content=b"x" * 1001)
+    assert response.status_code == 413
+    assert "exceeds maximum size" in response.json()["detail"]
+    assert app.state.calls == 1
+    assert uploads.upload_stats()["rejected"] == rejected + 1
+
+
+def test_chunked_body_is_cut_off_once_over_limit():
+    from fastapi.testclient import TestClient
+
+    client = TestClient(_limited_app(1000))
+
+    def body(chunks):
+        for _ in range(chunks):
+            yield b"x" * 400
+
+    assert client.post("/echo", content=body(2)).json() == {"size": 800}
+    response = client.post("/echo", content=body(10))
+    assert response.status_code == 413
+    assert "content-length" not in response.request.headers
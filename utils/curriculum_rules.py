@@ -0,0 +1,293 @@
+"""규칙 기반 커리큘럼 메타데이터 추출 (LLM 없이).
+
+`extract_text_from_slide`가 만든 Markdown 표 행(`| 1일차 | 모듈 | 2H | ... |`)과 본문에서
+duration(총 시수), 교육 일수, tools_used를 결정적으로 읽어내고 필드별 신뢰도를 함께 돌려줍니다.
+신뢰도가 높은 필드는 LLM에 확정값으로 넘기고, LLM 없는 초안(draft) 문서를 만들 때도 씁니다.
+"""
+import re
+from collections import Counter
+
+# 알려진 도구 이름 → 표기 (긴 이름부터 매칭)
+KNOWN_TOOLS = {
+    "chatgpt": "ChatGPT", "gpt-4o": "ChatGPT", "gpts": "ChatGPT", "claude": "Claude",
+    "gemini": "Gemini", "copilot studio": "CopilotStudio", "m365 copilot": "Copilot",
+    "copilot": "Copilot", "perplexity": "Perplexity", "midjourney": "Midjourney",
+    "stable diffusion": "StableDiffusion", "dall-e": "DALL-E", "notebooklm": "NotebookLM",
+    "python": "Python", "langchain": "LangChain", "langgraph": "LangGraph",
+    "llamaindex": "LlamaIndex", "hugging face": "HuggingFace", "huggingface": "HuggingFace",
+    "pandas": "Pandas", "numpy": "NumPy", "scikit-learn": "scikit-learn", "sklearn": "scikit-learn",
+    "tensorflow": "TensorFlow", "pytorch": "PyTorch", "keras": "Keras", "jupyter": "Jupyter",
+    "colab": "Colab", "streamlit": "Streamlit", "gradio": "Gradio", "fastapi": "FastAPI",
+    "excel": "Excel", "엑셀": "Excel", "power bi": "PowerBI", "powerbi": "PowerBI",
+    "tableau": "Tableau", "sql": "SQL", "google sheets": "GoogleSheets", "구글 시트": "GoogleSheets",
+    "power automate": "PowerAutomate", "zapier": "Zapier", "n8n": "n8n", "dify": "Dify",
+    "notion": "Notion", "docker": "Docker", "aws": "AWS", "azure": "Azure", "gcp": "GCP",
+}
+_TOOL_RE = re.compile(
+    r"(?<![a-z0-9])(" + "|".join(re.escape(k) for k in sorted(KNOWN_TOOLS, key=len, reverse=True))
+    + r")(?![a-z0-9])",
+    re.IGNORECASE,
+)
+
+_HOURS_CELL_RE = re.compile(r"^(\d+(?:\.\d+)?)\s*(?:h|hr|hrs|hour|hours|시간|시수)?$", re.IGNORECASE)
+_HOURS_UNIT_CELL_RE = re.compile(r"^(\d+(?:\.\d+)?)\s*(?:h|hr|hrs|hour|hours|시간)$", re.IGNORECASE)
+_HOURS_HEADER_RE = re.compile(r"시수|시간|hours?|^h$", re.IGNORECASE)
+_TOTAL_RE = re.compile(
+    r"(?:총|전체|total)\s*:?\s*(\d+(?:\.\d+)?)\s*(?:h|hr|hrs|hours?|시간)(?![a-z])", re.IGNORECASE
+)
+_DAY_RE = re.compile(r"(\d+)\s*일\s*차|day\s*(\d+)", re.IGNORECASE)
+_DAYS_TOTAL_RE = re.compile(r"(\d+)\s*일\s*(?:과정|교육|간)")
+
+# 필드별 신뢰도
+CONFIDENCE_TOTAL_AND_TABLE = 0.95   # 본문 총 시수와 표 합계가 일치
+CONFIDENCE_TABLE_COLUMN = 0.85      # 시수 열 합계 (모든 행이 숫자인 시수 열만, 다른 셀 합산 없음)
+CONFIDENCE_TOTAL_ONLY = 0.75        # 본문 "총 N시간"만 있음
+CONFIDENCE_CONFLICT = 0.6           # 본문 총 시수와 표 합계가 다름 (본문 값 사용)
+CONFIDENCE_PARTIAL_TABLES = 0.55    # 시수 열 합계에 "2H" 셀 합계가 섞였거나, 시수로 읽지 못한 시간 열이 있음
+CONFIDENCE_UNIT_CELLS = 0.5         # 헤더 없이 "2H" 형태 셀 합계
+CONFIDENCE_DAY_LABELS = 0.9
+CONFIDENCE_DAYS_TEXT = 0.7
+CONFIDENCE_TOOLS = 0.6
+
+_RULE_FIELDS = ("duration", "tools_used")
+# 커리큘럼 스토어 문서의 헤더 필드 순서 (prompt_templates [Output Format]과 같음)
+HEADER_FIELDS = (
+    "domain", "skill_category", "skill_id", "level", "industry", "target_role",
+    "duration", "education_format", "tools_used",
+)
+
+
+def _split_row(line):
+    return [cell.strip() for cell in line.strip().strip("|").split("|")]
+
+
+def iter_tables(text):
+    """텍스트에서 연속된 Markdown 표 행 묶음을 [[셀 목록], ...] 단위로 생성합니다."""
+    table = []
+    for line in text.split("\n"):
+        if line.startswith("|") and line.rstrip().endswith("|"):
+            cells = _split_row(line)
+            if not all(set(c) <= set("-: ") for c in cells):
+                table.append(cells)
+        elif table:
+            yield table
+            table = []
+    if table:
+        yield table
+
+
+def _format_number(value):
+    return str(int(value)) if float(value).is_integer() else f"{value:g}"
+
+
+def _hours_column(table):
+    """표의 시수 열 합계를 구합니다.
+
+    "시간" 헤더 열에는 시수 대신 시각 범위(09:00-12:00)가 들어 있는 경우가 많으므로
+    모든 데이터 행이 숫자로 읽히는 열만 시수 열로 봅니다.
+    Returns:
+        (합계 | None, 시수 헤더가 있었는지)
+    """
+    header, rows = table[0], table[1:]
+    columns = [
+        i for i, cell in enumerate(header)
+        if _HOURS_HEADER_RE.search(cell) and not _HOURS_CELL_RE.match(cell)
+    ]
+    if not columns or not rows or any(len(cells) != len(header) for cells in rows):
+        return None, bool(columns)
+    for i in columns:
+        matches = [_HOURS_CELL_RE.match(cells[i]) for cells in rows]
+        if all(matches):
+            return sum(float(m.group(1)) for m in matches), True
+    return None, True
+
+
+def _table_hours(text):
+    """표에서 시수 합계를 구합니다.
+
+    Returns:
+        (합계 | None, 출처): 출처는 "column"(모든 표가 깨끗한 시수 열), "units"(헤더 없는 "2H" 셀만),
+        "partial"(시수 열에 다른 셀 합계가 섞였거나 시수로 읽지 못한 시간 열이 있음) 또는 None
+    """
+    column_total = None
+    unit_total = None
+    unparsed_column = False
+    seen_tables = set()
+    for table in iter_tables(text):
+        # 같은 표가 여러 슬라이드에 반복되면 표 전체를 한 번만 셉니다.
+        # (다른 회차 표에 같은 행이 있는 것은 실제 시수이므로 행 단위로 거르지 않습니다)
+        key = tuple(tuple(c.lower() for c in cells) for cells in table)
+        if key in seen_tables:
+            continue
+        seen_tables.add(key)
+        total, has_header = _hours_column(table)
+        if total is not None:
+            column_total = (column_total or 0) + total
+            continue
+        unparsed_column = unparsed_column or has_header
+        for cells in table:
+            for cell in cells:
+                match = _HOURS_UNIT_CELL_RE.match(cell)
+                if match:
+                    unit_total = (unit_total or 0) + float(match.group(1))
+                    break
+    total = (column_total or 0) + (unit_total or 0)
+    if not total:
+        return None, None
+    if column_total and not unit_total and not unparsed_column:
+        return total, "column"
+    return total, "partial" if column_total or unparsed_column else "units"
+
+
+def extract_duration(overview_text, curriculum_text):
+    """총 교육 시수와 신뢰도를 반환합니다. 찾지 못하면 (None, 0.0)."""
+    totals = [float(m) for m in _TOTAL_RE.findall(f"{overview_text}\n{curriculum_text}")]
+    stated = max(totals) if totals else None
+    table_total, source = _table_hours(curriculum_text)
+
+    if stated and table_total:
+        if abs(stated - table_total) < 0.01:
+            return _format_number(stated), CONFIDENCE_TOTAL_AND_TABLE
+        return _format_number(stated), CONFIDENCE_CONFLICT
+    if table_total:
+        confidence = {
+            "column": CONFIDENCE_TABLE_COLUMN, "partial": CONFIDENCE_PARTIAL_TABLES, "units": CONFIDENCE_UNIT_CELLS,
+        }[source]
+        return _format_number(table_total), confidence
+    if stated:
+        return _format_number(stated), CONFIDENCE_TOTAL_ONLY
+    return None, 0.0
+
+
+def extract_day_count(overview_text, curriculum_text):
+    """교육 일수(N일차/Day N 최댓값, 없으면 "N일 과정")와 신뢰도를 반환합니다."""
+    days = [int(next(g for g in m if g)) for m in _DAY_RE.findall(curriculum_text)]
+    if days:
+        return max(days), CONFIDENCE_DAY_LABELS
+    stated = _DAYS_TOTAL_RE.findall(f"{overview_text}\n{curriculum_text}")
+    if stated:
+        return max(int(d) for d in stated), CONFIDENCE_DAYS_TEXT
+    return None, 0.0
+
+
+def extract_tools(overview_text, curriculum_text, limit=3):
+    """알려진 도구 이름을 언급 횟수 순으로 최대 limit개 반환합니다 (쉼표 구분 문자열)."""
+    counts = Counter(
+        KNOWN_TOOLS[m.lower()] for m in _TOOL_RE.findall(f"{overview_text}\n{curriculum_text}")
+    )
+    if not counts:
+        return None, 0.0
+    return ",".join(name for name, _ in counts.most_common(limit)), CONFIDENCE_TOOLS
+
+
+def extract_rule_metadata(overview_text, curriculum_text):
+    """규칙으로 읽을 수 있는 필드와 필드별 신뢰도를 반환합니다.
+
+    Returns:
+        (fields, confidence): fields는 {"duration", "day_count", "tools_used"} 중 찾은 값,
+        confidence는 같은 키의 0~1 신뢰도.
+    """
+    fields = {}
+    confidence = {}
+    for key, (value, score) in (
+        ("duration", extract_duration(overview_text, curriculum_text)),
+        ("day_count", extract_day_count(overview_text, curriculum_text)),
+        ("tools_used", extract_tools(overview_text, curriculum_text)),
+    ):
+        if value is not None:
+            fields[key] = value
+            confidence[key] = score
+    return fields, confidence
+
+
+def confident_fields(fields, confidence, min_confidence):
+    """신뢰도가 min_confidence 이상인 출력 필드(duration, tools_used)만 반환합니다."""
+    return {
+        key: str(fields[key]) for key in _RULE_FIELDS
+        if key in fields and confidence.get(key, 0.0) >= min_confidence
+    }
+
+
+def _header_anchor(markdown, key):
+    """key 헤더 줄을 끼워 넣을 위치(앞 필드 줄 또는 "# [COURSE]" 줄의 끝)를 반환합니다."""
+    for prev in reversed(HEADER_FIELDS[:HEADER_FIELDS.index(key)]):
+        match = re.search(rf"^{prev}:.*$", markdown, re.MULTILINE)
+        if match:
+            return match.end()
+    match = re.search(r"^# \[COURSE\].*$", markdown, re.MULTILINE)
+    return match.end() if match else None
+
+
+def apply_fields(markdown, metadata, fields):
+    """LLM 결과의 헤더 필드와 metadata를 규칙 값으로 채웁니다.
+
+    확정 필드는 LLM에 출력하지 말라고 요청하므로 헤더에 줄이 없으면 제자리에 끼워 넣고,
+    LLM이 그래도 썼으면 규칙 값으로 덮어씁니다.
+    """
+    for key in (k for k in HEADER_FIELDS if k in fields):
+        value = fields[key]
+        pattern = re.compile(rf"^{key}:[ \t]*.*$", re.MULTILINE)
+        if pattern.search(markdown):
+            markdown = pattern.sub(lambda _: f"{key}: {value}", markdown, count=1)
+        else:
+            anchor = _header_anchor(markdown, key)
+            line = f"{key}: {value}"
+            if anchor is None:
+                markdown = f"{line}\n{markdown}"
+            else:
+                markdown = f"{markdown[:anchor]}\n{line}{markdown[anchor:]}"
+        metadata[key] = value
+    return markdown, metadata
+
+
+# =========================================================
+# LLM 없는 초안 문서
+# =========================================================
+def _course_title(overview_text, curriculum_text):
+    for text in (curriculum_text, overview_text):
+        for line in text.split("\n"):
+            if line.startswith("### ") and line[4:].strip():
+                return line[4:].strip()
+    return "정보 없음"
+
+
+def build_draft_document(overview_text, curriculum_text):
+    """규칙 추출만으로 커리큘럼 스토어 형식의 초안 Markdown과 metadata를 만듭니다.
+
+    LLM이 채우는 분류 필드(domain, level 등)와 요약 섹션은 "정보 없음"으로 두고, 표는
+    원본 행을 그대로 옮깁니다. 빠른 분류/검토용이며 최종 문서를 대신하지 않습니다.
+    """
+    fields, confidence = extract_rule_metadata(overview_text, curriculum_text)
+    metadata = {key: "정보 없음" for key in HEADER_FIELDS}
+    metadata["duration"] = str(fields.get("duration", "정보 없음"))
+    metadata["tools_used"] = fields.get("tools_used", "정보 없음")
+
+    overview_lines = [
+        line for line in overview_text.split("\n")
+        if line.strip() and not line.startswith(("###", "|"))
+    ]
+    tables = []
+    seen = set()
+    for rows in iter_tables(curriculum_text):
+        # 슬라이드마다 반복된 같은 표는 한 번만 옮깁니다 (_table_hours와 같은 기준).
+        key = tuple(tuple(c.lower() for c in r) for r in rows)
+        if key in seen:
+            continue
+        seen.add(key)
+        lines = [f"| {' | '.join(rows[0])} |", "|" + "---|" * len(rows[0])]
+        lines += [f"| {' | '.join(r)} |" for r in rows[1:]]
+        tables.append("\n".join(lines))
+    day_count = fields.get("day_count")
+
+    lines = [f"# [COURSE] {_course_title(overview_text, curriculum_text)}"]
+    lines += [f"{key}: {value}" for key, value in metadata.items()]
+    lines += ["", "## 교육 개요", " ".join(overview_lines)[:500] or "정보 없음", "", "## 커리큘럼", ""]
+    lines += ["\n\n".join(tables) if tables else curriculum_text.strip()]
+    lines += ["", "## DAY_FLOW", f"- 총 {day_count}일" if day_count else "정보 없음"]
+    lines += ["", "## PROGRESSION", "정보 없음", "", "## DESIGN_RATIONALE", "정보 없음"]
+
+    metadata["draft"] = True
+    metadata["rule_confidence"] = confidence
+    if day_count:
+        metadata["day_count"] = day_count
+    return "\n".join(lines), metadata
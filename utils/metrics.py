@@ -0,0 +1,165 @@
+"""Prometheus 텍스트 형식 메트릭 (외부 라이브러리/서비스 없이 프로세스 메모리에 집계).
+
+GET /metrics가 render()의 결과를 그대로 내보내고, 같은 호스트의 Prometheus가 긁어 갑니다.
+값은 프로세스(uvicorn 워커)마다 따로 쌓이므로 워커가 여럿이면 워커별로 긁거나 합산합니다.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 단계별 소요 시간(초) 버킷: 수 ms 파싱부터 수십 초 LLM 호출까지
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 30, 50, 75, 100, 150, 200, 300)
+SIZE_BUCKETS = (500, 1000, 2000, 4000, 8000, 16000, 32000, 64000, 128000)
+
+_registry = []
+_registry_lock = threading.Lock()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)] + list(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        with _registry_lock:
+            _registry.append(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: labels must be {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _header(self, name=None):
+        name = name or self.name
+        return [f"# HELP {name} {self.documentation}", f"# TYPE {name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        # 텍스트 형식 0.0.4에서는 HELP/TYPE 이름이 샘플 이름(<name>_total)과 같아야 counter로 인식됩니다.
+        lines = self._header(f"{self.name}_total")
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}_total{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=SECONDS_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][bisect.bisect_left(self.buckets, value)] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self):
+        lines = self._header()
+        with self._lock:
+            items = sorted((key, (list(s[0]), s[1], s[2])) for key, s in self._values.items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, (le,))} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+def render():
+    """등록된 모든 메트릭을 Prometheus 텍스트 형식으로 반환합니다."""
+    with _registry_lock:
+        metrics = list(_registry)
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# =========================================================
+# 파이프라인 메트릭
+# =========================================================
+STAGE_SECONDS = Histogram(
+    "pptx_stage_duration_seconds",
+    "Time per pipeline stage: upload and parse stages per deck, generate per course.",
+    ("stage",),
+)
+DECK_SLIDES = Histogram("pptx_deck_slides", "Slides per uploaded deck.", buckets=COUNT_BUCKETS)
+DECK_COURSES = Histogram("pptx_deck_courses", "Courses found per uploaded deck.", buckets=COUNT_BUCKETS)
+PROMPT_CHARS = Histogram("llm_prompt_chars", "Prompt size in characters.", buckets=SIZE_BUCKETS)
+PROMPT_TOKENS = Histogram(
+    "llm_prompt_tokens", "Prompt size in input tokens as reported by the provider.",
+    ("provider", "model"), buckets=SIZE_BUCKETS,
+)
+LLM_SECONDS = Histogram(
+    "llm_request_duration_seconds", "LLM provider call latency, including scheduler retries.",
+    ("provider", "model"),
+)
+LLM_REQUESTS = Counter(
+    "llm_requests", "LLM provider calls by outcome (ok, error, cancelled, cache_hit).", ("provider", "model", "outcome"),
+)
+COURSE_RESULTS = Counter(
+    "curriculum_results", "Per-course generation outcomes (ok, no_data, short, skipped, draft).", ("outcome",),
+)
+PIPELINE_ERRORS = Counter(
+    "pipeline_errors", "Failures by pipeline stage (parse, generate, batch).", ("stage",),
+)
+DECK_STAGES = ("open", "slide_features", "classify", "extract_text", "parse")
+
+
+def observe_deck(timings):
+    """제안서 하나의 파싱 단계별 시간(StageTimings)과 슬라이드/과정 수를 기록합니다."""
+    for stage in DECK_STAGES:
+        if stage in timings.seconds:
+            STAGE_SECONDS.observe(timings.seconds[stage], stage=stage)
+    DECK_SLIDES.observe(timings.counts.get("slides", 0))
+    DECK_COURSES.observe(timings.counts.get("courses", 0))
@@ -0,0 +1,139 @@
+"""PPTX 파싱 전용 프로세스 풀.
+
+파싱(zip 해제, XML 파싱, 슬라이드 분류)은 CPU 작업이라 이벤트 루프 스레드와 GIL을
+두고 다투면 동시에 들어온 요청과 LLM 응답 처리까지 느려집니다. PARSE_POOL_WORKERS가 0보다
+크면 프로세스 풀을 한 번 만들어 계속 재사용하고, 파싱을 그 안에서 실행합니다.
+
+풀 모드에서는 과정 목록 전체가 파싱된 뒤 한 번에 돌아오므로, 과정 단위로 LLM 생성을
+일찍 시작하는 스레드 모드(iter_courses_background)와는 지연/처리량 특성이 다릅니다.
+"""
+import asyncio
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+# 0이면 풀을 쓰지 않고 기존처럼 백그라운드 스레드에서 파싱합니다.
+PARSE_POOL_WORKERS = int(os.environ.get("PARSE_POOL_WORKERS", "0"))
+
+_pool_lock = threading.Lock()
+_pool = None
+_started_at = None
+
+_stats_lock = threading.Lock()
+_stats = {"submitted": 0, "completed": 0, "failed": 0, "in_flight": 0, "busy_seconds": 0.0}
+
+
+def _parse_in_worker(source, engine, text_only, detail=False):
+    from utils.pptx_parser import parse_courses
+    from utils.stage_timing import StageTimings
+
+    if isinstance(source, (bytes, bytearray)):
+        source = BytesIO(source)
+    timings = StageTimings(detail)
+    started = time.perf_counter()
+    courses = parse_courses(source, engine, text_only, timings)
+    return courses, time.perf_counter() - started, timings
+
+
+def _warm_up():
+    # 워커마다 파서 모듈(python-pptx, lxml)을 미리 import해 첫 요청의 지연을 줄입니다.
+    import pptx  # noqa: F401
+    import utils.pptx_parser  # noqa: F401
+    import utils.pptx_xml_parser  # noqa: F401
+
+
+def pool_enabled():
+    return PARSE_POOL_WORKERS > 0
+
+
+def get_parse_pool():
+    """프로세스 전역 파싱 풀을 반환합니다. 비활성화되어 있으면 None."""
+    global _pool, _started_at
+    if not pool_enabled():
+        return None
+    with _pool_lock:
+        if _pool is None:
+            # 부모 프로세스의 스레드/연결 상태를 물려받지 않도록 spawn으로 워커를 만듭니다.
+            _pool = ProcessPoolExecutor(
+                max_workers=PARSE_POOL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_up,
+            )
+            _started_at = time.monotonic()
+    return _pool
+
+
+def shutdown_parse_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _adjust(key, delta):
+    with _stats_lock:
+        _stats[key] += delta
+
+
+def _copy_to_temp_path(source):
+    """파일 객체를 워커가 열 수 있는 이름 있는 임시 파일로 복사하고 경로를 반환합니다."""
+    source.seek(0)
+    with tempfile.NamedTemporaryFile(suffix=".pptx", delete=False) as f:
+        shutil.copyfileobj(source, f, 1024 * 1024)
+    source.seek(0)
+    return f.name
+
+
+async def parse_courses_in_pool(source, engine=None, text_only=None, timings=None):
+    """파싱 풀에서 parse_courses를 실행하고 과정 목록을 반환합니다.
+
+    source는 경로, bytes 또는 파일 객체입니다. 업로드 스풀 파일 같은 파일 객체는 메모리로 읽지 않고
+    스레드에서 임시 파일로 복사해 그 경로를 워커에 넘깁니다 (워커의 zipfile이 필요한 멤버만 읽음).
+    timings를 넘기면 워커에서 잰 단계별 시간(timings.detail이면 슬라이드별 기록까지)을 합쳐 줍니다.
+    """
+    temp_path = None
+    if isinstance(source, BytesIO):
+        source = source.getvalue()
+    elif hasattr(source, "read"):
+        source = temp_path = await asyncio.to_thread(_copy_to_temp_path, source)
+    loop = asyncio.get_running_loop()
+    _adjust("submitted", 1)
+    _adjust("in_flight", 1)
+    try:
+        courses, busy, worker_timings = await loop.run_in_executor(
+            get_parse_pool(), _parse_in_worker, source, engine, text_only, timings is not None and timings.detail
+        )
+    except BaseException:
+        _adjust("failed", 1)
+        raise
+    finally:
+        _adjust("in_flight", -1)
+        if temp_path is not None:
+            os.remove(temp_path)
+    with _stats_lock:
+        _stats["completed"] += 1
+        _stats["busy_seconds"] += busy
+    if timings is not None:
+        timings.merge(worker_timings)
+    return courses
+
+
+def pool_stats():
+    """풀 크기, 진행/대기 중 작업 수, 누적 파싱 시간과 가동률(busy / (workers × 가동 시간))."""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["workers"] = PARSE_POOL_WORKERS
+    stats["enabled"] = pool_enabled()
+    stats["queued"] = max(0, stats["in_flight"] - PARSE_POOL_WORKERS)
+    uptime = time.monotonic() - _started_at if _started_at is not None else 0.0
+    stats["utilization"] = (
+        min(1.0, stats["busy_seconds"] / (PARSE_POOL_WORKERS * uptime))
+        if uptime > 0 and PARSE_POOL_WORKERS > 0 else 0.0
+    )
+    return stats
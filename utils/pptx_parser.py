@@ -1,6 +1,16 @@
+import json
 import os
+import queue
 import re
+import shutil
+import tempfile
+import threading
+import time
 import unicodedata
+import zipfile
+from io import BytesIO
+
+from utils.stage_timing import StageTimings
 
 # =========================================================
 # 텍스트 정규화
@@ -37,50 +47,230 @@ CURRICULUM_BODY_INDICATORS = [
     "curriculum", "syllabus"
 ]
 
+# =========================================================
+# 키워드 매처 (import 시 1회 컴파일)
+# =========================================================
+# 제목 분류 우선순위: EXCLUDE > CURRICULUM > OVERVIEW
+TITLE_PRIORITY = ("EXCLUDE", "CURRICULUM", "OVERVIEW")
+BODY_CATEGORY = "CURRICULUM_BODY"
+
+
+class KeywordMatcher:
+    """정규화된 키워드 전체를 하나의 정규식으로 컴파일하여 한 번의 스캔으로
+    매칭된 카테고리 집합을 돌려줍니다.
+
+    lookahead 교대식 `(?=(kw1|kw2|...))`는 시작 위치마다 가장 긴 키워드 하나만
+    잡으므로, 같은 위치에서 시작하는 더 짧은 키워드(=접두사)의 카테고리는
+    미리 합쳐 둡니다.
+    """
+
+    def __init__(self, keyword_sets):
+        self._keyword_sets = {}
+        self._pattern = None
+        self._categories = {}
+        self.update(keyword_sets)
+
+    def update(self, keyword_sets):
+        """카테고리별 키워드를 추가하고 정규식을 다시 컴파일합니다."""
+        for category, keywords in keyword_sets.items():
+            self._keyword_sets.setdefault(category, []).extend(keywords)
+        self._compile()
+
+    def _compile(self):
+        direct = {}
+        for category, keywords in self._keyword_sets.items():
+            for key in keywords:
+                norm_key = normalize(key)
+                if norm_key:
+                    direct.setdefault(norm_key, set()).add(category)
+
+        self._categories = {}
+        for norm_key in direct:
+            cats = set()
+            for other, other_cats in direct.items():
+                if norm_key.startswith(other):
+                    cats |= other_cats
+            self._categories[norm_key] = frozenset(cats)
+
+        if not direct:
+            self._pattern = None
+            return
+        alternation = "|".join(
+            re.escape(k) for k in sorted(direct, key=lambda k: (-len(k), k))
+        )
+        self._pattern = re.compile(f"(?=({alternation}))")
+
+    def scan(self, norm_text):
+        """정규화된 텍스트에서 매칭된 카테고리 집합을 반환합니다."""
+        if self._pattern is None or not norm_text:
+            return frozenset()
+        found = set()
+        for key in self._pattern.findall(norm_text):
+            found |= self._categories[key]
+        return frozenset(found)
+
+    def first(self, norm_text, priority):
+        """priority 순서에서 가장 먼저 매칭되는 카테고리를 반환합니다. 없으면 None."""
+        found = self.scan(norm_text)
+        for category in priority:
+            if category in found:
+                return category
+        return None
+
+
+def load_keyword_config(path):
+    """추가 키워드 JSON({"EXCLUDE": [...], "CURRICULUM": [...], ...})을 읽습니다."""
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    return {category: list(keywords) for category, keywords in config.items()}
+
+
+def register_keywords(keyword_sets):
+    """설정에서 읽은 추가 키워드를 전역 매처에 반영합니다 (재컴파일 1회)."""
+    KEYWORD_MATCHER.update(keyword_sets)
+
+
+KEYWORD_MATCHER = KeywordMatcher({
+    "EXCLUDE": EXCLUDE_KEYWORDS,
+    "CURRICULUM": CURRICULUM_KEYWORDS,
+    "OVERVIEW": OVERVIEW_KEYWORDS,
+    BODY_CATEGORY: CURRICULUM_BODY_INDICATORS,
+})
+
+if os.environ.get("SLIDE_KEYWORDS_PATH"):
+    register_keywords(load_keyword_config(os.environ["SLIDE_KEYWORDS_PATH"]))
+
+# =========================================================
+# 슬라이드 특징 추출 (1회 순회)
+# =========================================================
+TITLE_TOP_LIMIT = 2000000
+
+
+class SlideFeatures:
+    """슬라이드를 한 번만 순회하여 분류와 텍스트 추출에 필요한 값을 모아 둡니다.
+
+    python-pptx의 도형 속성 접근은 비용이 크므로, 분류(classify_slide_advanced)와
+    텍스트 추출(extract_text_from_slide)이 모두 이 객체만 읽도록 합니다.
+    """
+
+    __slots__ = ('hidden', 'title', 'blocks', 'table_headers', 'norm_title', 'norm_body')
+
+    def __init__(self, hidden=False, title="", blocks=None, table_headers=None, body_text=""):
+        self.hidden = hidden
+        self.title = title
+        # [("text", 도형 텍스트) | ("row", 표 한 행의 Markdown)] — 도형 순서 유지
+        self.blocks = blocks or []
+        # 표마다 첫 행 텍스트를 정규화한 값
+        self.table_headers = table_headers or []
+        self.norm_title = normalize(title)
+        self.norm_body = normalize(body_text)
+
+
+def format_table_row(cell_texts):
+    """표 한 행의 셀 텍스트를 Markdown 행으로 변환합니다. 빈 셀만 있으면 None."""
+    row_cells = [t.replace('\n', ' ').strip() for t in cell_texts if t.strip()]
+    if not row_cells:
+        return None
+    return f"| {' | '.join(row_cells)} |"
+
+
+class SlideFeatureBuilder:
+    """도형 단위로 값을 받아 SlideFeatures를 조립합니다.
+
+    python-pptx 엔진과 XML 직접 파싱 엔진(utils.pptx_xml_parser)이 같은 규칙으로
+    제목/본문/표를 모으도록 공유합니다.
+    """
+
+    def __init__(self):
+        self.placeholder_title = None
+        self.candidates = []
+        self.blocks = []
+        self.table_headers = []
+        self.body_parts = []
+
+    def add_text(self, raw, is_title_placeholder, position):
+        """텍스트 도형 하나를 추가합니다. position()은 (top, left)를 반환합니다."""
+        self.body_parts.append(raw)
+        text = raw.strip()
+        if self.placeholder_title is None and is_title_placeholder:
+            self.placeholder_title = text
+        if text:
+            self.blocks.append(("text", text))
+            top, left = position()
+            if top is not None and top < TITLE_TOP_LIMIT:
+                self.candidates.append((top, left, text))
+
+    def add_table(self, rows):
+        """표 하나를 셀 텍스트 행 목록([[str, ...], ...])으로 추가합니다."""
+        if rows:
+            self.table_headers.append(normalize(" ".join(rows[0]) + " "))
+        for cells in rows:
+            line = format_table_row(cells)
+            if line:
+                self.blocks.append(("row", line))
+
+    def build(self, hidden=False):
+        if self.placeholder_title:
+            title = self.placeholder_title
+        elif self.candidates:
+            self.candidates.sort(key=lambda x: (x[0], x[1]))
+            title = self.candidates[0][2]
+        else:
+            title = ""
+        return SlideFeatures(hidden, title, self.blocks, self.table_headers, " ".join(self.body_parts))
+
+
+def extract_slide_features(slide):
+    """슬라이드 도형을 한 번 순회하여 SlideFeatures를 생성합니다."""
+    builder = SlideFeatureBuilder()
+
+    for shape in slide.shapes:
+        if hasattr(shape, "text"):
+            builder.add_text(
+                shape.text,
+                shape.is_placeholder and shape.placeholder_format.idx == 0,
+                lambda shape=shape: (shape.top, shape.left),
+            )
+
+        if shape.has_table:
+            builder.add_table([[cell.text for cell in row.cells] for row in shape.table.rows])
+
+    return builder.build(hidden=slide._element.get('show') == '0')
+
+
+def _as_features(slide):
+    """slide 또는 SlideFeatures를 받아 SlideFeatures로 맞춥니다."""
+    if isinstance(slide, SlideFeatures):
+        return slide
+    return extract_slide_features(slide)
+
+
 # =========================================================
 # 슬라이드 유틸리티
 # =========================================================
 def is_slide_hidden(slide):
     """슬라이드가 '숨기기' 처리되어 있는지 확인합니다. (XML 속성 검사)"""
+    if isinstance(slide, SlideFeatures):
+        return slide.hidden
     return slide._element.get('show') == '0'
 
 def get_visual_title(slide):
     """슬라이드의 시각적 제목(가장 상단에 위치한 텍스트)을 추출합니다."""
-    if slide.shapes.title and slide.shapes.title.text.strip():
-        return slide.shapes.title.text.strip()
-
-    candidates = []
-    for shape in slide.shapes:
-        if not hasattr(shape, "text") or not shape.text.strip():
-            continue
-        if shape.top < 2000000:
-            candidates.append((shape.top, shape.left, shape.text.strip()))
-
-    if candidates:
-        candidates.sort(key=lambda x: (x[0], x[1]))
-        return candidates[0][2]
-
-    return ""
+    return _as_features(slide).title
 
 def extract_text_from_slide(slide):
     """슬라이드 내의 모든 텍스트(도형, 표 포함)를 추출합니다."""
+    features = _as_features(slide)
     lines = []
-    visual_title = get_visual_title(slide)
+    visual_title = features.title
 
     if visual_title:
         lines.append(f"### {visual_title}")
 
-    for shape in slide.shapes:
-        if hasattr(shape, "text") and shape.text.strip():
-            if shape.text.strip() == visual_title:
-                continue
-            lines.append(shape.text.strip())
-
-        if shape.has_table:
-            for row in shape.table.rows:
-                row_cells = [c.text.replace('\n', ' ').strip() for c in row.cells if c.text.strip()]
-                if row_cells:
-                    lines.append(f"| {' | '.join(row_cells)} |")
+    for kind, value in features.blocks:
+        if kind == "text" and value == visual_title:
+            continue
+        lines.append(value)
 
     return "\n".join(lines)
 
@@ -89,48 +279,24 @@ def extract_text_from_slide(slide):
 # =========================================================
 def check_table_headers(slide):
     """테이블 헤더에 커리큘럼 키워드가 있는지 확인합니다."""
-    for shape in slide.shapes:
-        if shape.has_table:
-            header_text = ""
-            try:
-                for cell in shape.table.rows[0].cells:
-                    header_text += cell.text + " "
-            except:
-                continue
-            norm_header = normalize(header_text)
-            for key in CURRICULUM_KEYWORDS:
-                if normalize(key) in norm_header:
-                    return True
+    for norm_header in _as_features(slide).table_headers:
+        if "CURRICULUM" in KEYWORD_MATCHER.scan(norm_header):
+            return True
     return False
 
 def check_body_indicators(slide):
     """본문 텍스트에서 커리큘럼 강한 지표 키워드를 확인합니다."""
-    body_text = ""
-    for shape in slide.shapes:
-        if hasattr(shape, "text"):
-            body_text += shape.text + " "
-    norm_body = normalize(body_text)
-    for key in CURRICULUM_BODY_INDICATORS:
-        if normalize(key) in norm_body:
-            return True
-    return False
+    return BODY_CATEGORY in KEYWORD_MATCHER.scan(_as_features(slide).norm_body)
 
 def classify_slide_advanced(slide):
     """슬라이드를 OVERVIEW/CURRICULUM/EXCLUDE/OTHER로 분류합니다."""
-    title = get_visual_title(slide)
-    norm_title = normalize(title)
-    for key in EXCLUDE_KEYWORDS:
-        if normalize(key) in norm_title:
-            return "EXCLUDE"
-    for key in CURRICULUM_KEYWORDS:
-        if normalize(key) in norm_title:
-            return "CURRICULUM"
-    for key in OVERVIEW_KEYWORDS:
-        if normalize(key) in norm_title:
-            return "OVERVIEW"
-    if check_table_headers(slide):
+    features = _as_features(slide)
+    title_type = KEYWORD_MATCHER.first(features.norm_title, TITLE_PRIORITY)
+    if title_type:
+        return title_type
+    if check_table_headers(features):
         return "CURRICULUM"
-    if check_body_indicators(slide):
+    if check_body_indicators(features):
         return "CURRICULUM"
     return "OTHER"
 
@@ -160,35 +326,224 @@ def strip_code_fences(text):
 # =========================================================
 # 슬라이드 그루핑: 과정 단위로 묶기
 # =========================================================
-def group_slides_into_courses(prs):
-    """PPTX의 슬라이드를 순회하며 과정 단위로 그루핑합니다.
+def iter_slide_features(prs):
+    """python-pptx Presentation의 슬라이드별 SlideFeatures를 순서대로 생성합니다.
 
-    Returns:
-        list[dict]: [{"overview": [str], "curriculum": [str]}, ...]
+    숨김 슬라이드는 도형을 읽지 않고 hidden=True인 빈 SlideFeatures로 넘깁니다.
     """
-    courses = []
-    current_course = {'overview': [], 'curriculum': []}
-
     for slide in prs.slides:
         if is_slide_hidden(slide):
+            yield SlideFeatures(hidden=True)
             continue
+        yield extract_slide_features(slide)
+
+
+def iter_courses_from_features(slide_features, timings=None):
+    """SlideFeatures 시퀀스를 읽으며 과정이 완성될 때마다 yield합니다.
 
-        slide_type = classify_slide_advanced(slide)
+    다음 OVERVIEW 슬라이드가 나오면 직전 과정이 닫힌 것으로 보고 바로 내보내므로,
+    호출 측은 나머지 슬라이드 파싱을 기다리지 않고 LLM 생성을 시작할 수 있습니다.
+    timings(StageTimings)를 넘기면 분류/텍스트 조립 시간과 슬라이드/과정 수를 기록하고,
+    timings.detail이면 슬라이드별 기록(slides: 번호, 분류, 과정 번호, 분류/텍스트 조립 ms)도 남깁니다.
+
+    Yields:
+        dict: {"overview": [str], "curriculum": [str]}
+    """
+    if timings is None:
+        timings = StageTimings()
+    current_course = {'overview': [], 'curriculum': []}
+    course_count = 0
+
+    for slide_no, features in enumerate(slide_features, 1):
+        timings.incr("slides")
+        if features.hidden:
+            timings.incr("hidden_slides")
+            timings.record("slides", slide=slide_no, type="HIDDEN")
+            continue
+
+        with timings.stage("classify") as classify:
+            slide_type = classify_slide_advanced(features)
         if slide_type == "EXCLUDE":
+            timings.record("slides", slide=slide_no, type=slide_type, classify_ms=classify.ms)
             continue
 
-        text = extract_text_from_slide(slide)
+        with timings.stage("extract_text") as extract:
+            text = extract_text_from_slide(features)
 
         if slide_type == "OVERVIEW":
             if current_course['curriculum']:
-                courses.append(current_course)
+                course_count += 1
+                timings.incr("courses")
+                yield current_course
                 current_course = {'overview': [], 'curriculum': []}
             current_course['overview'].append(text)
 
         elif slide_type == "CURRICULUM":
             current_course['curriculum'].append(text)
 
+        timings.record("slides", slide=slide_no, type=slide_type, course=course_count + 1,
+                       classify_ms=classify.ms, extract_text_ms=extract.ms, chars=len(text))
+
     if current_course['curriculum']:
-        courses.append(current_course)
+        timings.incr("courses")
+        yield current_course
+
+
+def group_features_into_courses(slide_features):
+    """SlideFeatures 시퀀스를 과정 단위로 그루핑합니다.
+
+    Returns:
+        list[dict]: [{"overview": [str], "curriculum": [str]}, ...]
+    """
+    return list(iter_courses_from_features(slide_features))
+
+
+def group_slides_into_courses(prs):
+    """PPTX의 슬라이드를 순회하며 과정 단위로 그루핑합니다.
+
+    Returns:
+        list[dict]: [{"overview": [str], "curriculum": [str]}, ...]
+    """
+    return group_features_into_courses(iter_slide_features(prs))
+
+
+# =========================================================
+# 텍스트 전용 로딩 (미디어 파트 미해제)
+# =========================================================
+# 과정 추출에 필요 없는 대용량 바이너리 파트 (사진/동영상/OLE 개체/폰트/썸네일)
+MEDIA_PART_PREFIXES = ("ppt/media/", "ppt/embeddings/", "ppt/fonts/", "docProps/thumbnail")
+DEFAULT_TEXT_ONLY = os.environ.get("PPTX_TEXT_ONLY", "1") != "0"
+# 미디어를 뺀 사본을 메모리에 두는 최대 크기. 넘으면 임시 파일(디스크)에 씁니다 (업로드 스풀과 같은 설정).
+_STRIPPED_SPOOL_MAX_BYTES = int(float(os.environ.get("UPLOAD_SPOOL_MAX_MB", "1")) * 1024 * 1024)
+
+
+def strip_media_parts(source):
+    """미디어 파트를 빈 파트로 바꾼 PPTX 사본을 스풀 임시 파일로 만들어 반환합니다 (호출 측이 닫음).
+
+    미디어 멤버는 압축 해제하지 않으며, content type과 관계(.rels)는 그대로 두어
+    python-pptx가 정상적으로 열 수 있습니다. 나머지 파트는 재압축 없이 멤버 단위로 흘려 쓰므로,
+    사본이 업로드보다 커지더라도 UPLOAD_SPOOL_MAX_MB를 넘는 부분은 메모리가 아니라 디스크에 둡니다.
+    """
+    stripped = tempfile.SpooledTemporaryFile(max_size=_STRIPPED_SPOOL_MAX_BYTES)
+    try:
+        with zipfile.ZipFile(source) as src, zipfile.ZipFile(stripped, 'w', zipfile.ZIP_STORED) as dst:
+            for info in src.infolist():
+                if info.filename.startswith(MEDIA_PART_PREFIXES):
+                    dst.writestr(info.filename, b"")
+                    continue
+                zip64 = info.file_size >= zipfile.ZIP64_LIMIT
+                with src.open(info) as member, dst.open(info.filename, 'w', force_zip64=zip64) as out:
+                    shutil.copyfileobj(member, out, 1024 * 1024)
+    except BaseException:
+        stripped.close()
+        raise
+    stripped.seek(0)
+    return stripped
+
+
+def open_presentation(source, text_only=None):
+    """python-pptx Presentation을 엽니다. text_only이면 미디어 파트를 읽지 않습니다."""
+    from pptx import Presentation
+
+    if text_only is None:
+        text_only = DEFAULT_TEXT_ONLY
+    if text_only:
+        # python-pptx는 열 때 모든 파트를 읽어 두므로 사본은 바로 닫아도 됩니다.
+        with strip_media_parts(source) as stripped:
+            return Presentation(stripped)
+    return Presentation(source)
+
+
+# =========================================================
+# 파싱 엔진 선택
+# =========================================================
+# python-pptx: 전체 객체 모델 로드 (기본값)
+# xml: presentation.xml + slideN.xml만 lxml iterparse로 직접 파싱
+ENGINES = ("python-pptx", "xml")
+DEFAULT_ENGINE = os.environ.get("PPTX_ENGINE", "python-pptx")
+
+
+def _resolve_engine(engine):
+    engine = engine or DEFAULT_ENGINE
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown PPTX engine: {engine} (choose from {', '.join(ENGINES)})")
+    return engine
+
+
+def iter_courses(source, engine=None, text_only=None, timings=None):
+    """PPTX(경로 또는 파일 객체)를 읽으며 과정이 완성되는 즉시 하나씩 yield합니다.
+
+    인자는 parse_courses와 같습니다.
+
+    Yields:
+        dict: {"overview": [str], "curriculum": [str]}
+    """
+    engine = _resolve_engine(engine)
+    if timings is None:
+        timings = StageTimings()
+    with timings.stage("parse"):
+        if engine == "xml":
+            from utils.pptx_xml_parser import iter_slide_features_xml
+            # xml 엔진은 zip 열기와 슬라이드 XML 파싱이 한 제너레이터 안에서 진행됩니다.
+            slide_features = timings.timed_iter(iter_slide_features_xml(source), "slide_features")
+        else:
+            with timings.stage("open"):
+                prs = open_presentation(source, text_only)
+            slide_features = timings.timed_iter(iter_slide_features(prs), "slide_features")
+        # parse 단계에는 호출 측이 과정을 소비하는 시간(LLM 호출 대기 등)을 넣지 않습니다.
+        courses = iter_courses_from_features(slide_features, timings)
+    while True:
+        started = time.perf_counter()
+        course = next(courses, None)
+        timings.add("parse", time.perf_counter() - started, calls=0)
+        if course is None:
+            return
+        yield course
+
+
+def parse_courses(source, engine=None, text_only=None, timings=None):
+    """PPTX(경로 또는 파일 객체)에서 과정 목록을 추출합니다.
+
+    Args:
+        source: PPTX 파일 경로 또는 바이너리 파일 객체
+        engine: "python-pptx" 또는 "xml". None이면 PPTX_ENGINE 환경변수 값
+        text_only: python-pptx 엔진에서 미디어 파트를 읽지 않을지 여부.
+            None이면 PPTX_TEXT_ONLY 환경변수 값. xml 엔진은 항상 텍스트 전용입니다.
+        timings: 단계별 시간(open, slide_features, classify, extract_text, parse)과
+            슬라이드/과정 수를 기록할 StageTimings (선택). detail=True이면 슬라이드별 기록도 남깁니다.
+
+    Returns:
+        list[dict]: [{"overview": [str], "curriculum": [str]}, ...]
+    """
+    _resolve_engine(engine)
+    return list(iter_courses(source, engine, text_only, timings))
+
+
+_PARSE_DONE = object()
+
+
+def iter_courses_background(source, engine=None, text_only=None, timings=None):
+    """별도 스레드에서 파싱을 진행하면서 완성된 과정을 순서대로 yield합니다.
+
+    소비 측(LLM 호출)이 과정 하나를 처리하는 동안 다음 슬라이드 파싱이 계속됩니다.
+    파싱 중 발생한 예외는 소비 측에서 다시 발생합니다.
+    """
+    results = queue.Queue()
+
+    def produce():
+        try:
+            for course in iter_courses(source, engine, text_only, timings):
+                results.put(course)
+        except BaseException as e:
+            results.put(e)
+        finally:
+            results.put(_PARSE_DONE)
 
-    return courses
+    threading.Thread(target=produce, name="pptx-parse", daemon=True).start()
+    while True:
+        item = results.get()
+        if item is _PARSE_DONE:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield item
@@ -0,0 +1,313 @@
+"""python-pptx 객체 모델을 거치지 않고 PPTX zip에서 슬라이드 XML만 직접 파싱합니다.
+
+`Presentation()`은 미디어/레이아웃을 포함한 모든 파트를 로드하지만, 과정 추출에는
+슬라이드 순서(presentation.xml), 각 slideN.xml의 텍스트/표/`show` 속성/도형 위치만
+필요합니다. 이 모듈은 해당 파트만 lxml iterparse로 스트리밍 파싱하여
+utils.pptx_parser.SlideFeatures를 생성하므로, 이후 분류/그루핑 로직은 그대로 공유합니다.
+"""
+import posixpath
+import zipfile
+from io import BytesIO
+
+from lxml import etree
+
+from utils.pptx_parser import SlideFeatureBuilder, SlideFeatures
+
+# =========================================================
+# OOXML 네임스페이스 / 관계 타입
+# =========================================================
+NS_P = "http://schemas.openxmlformats.org/presentationml/2006/main"
+NS_A = "http://schemas.openxmlformats.org/drawingml/2006/main"
+NS_R = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+RT_OFFICE_DOCUMENT = "/officeDocument"
+RT_SLIDE_LAYOUT = "/slideLayout"
+RT_SLIDE_MASTER = "/slideMaster"
+
+URI_TABLE = "http://schemas.openxmlformats.org/drawingml/2006/table"
+
+
+def _p(tag):
+    return f"{{{NS_P}}}{tag}"
+
+
+def _a(tag):
+    return f"{{{NS_A}}}{tag}"
+
+
+P_SLD = _p("sld")
+P_CSLD = _p("cSld")
+P_SPTREE = _p("spTree")
+P_SP = _p("sp")
+P_GRAPHIC_FRAME = _p("graphicFrame")
+P_PH = _p("ph")
+P_NVPR = _p("nvPr")
+A_P = _a("p")
+A_R = _a("r")
+A_BR = _a("br")
+A_FLD = _a("fld")
+A_T = _a("t")
+
+# python-pptx와 동일하게 도형으로 취급하는 spTree 자식 태그
+SHAPE_TAGS = {_p(t) for t in ("sp", "grpSp", "graphicFrame", "cxnSp", "pic", "contentPart")}
+
+# 레이아웃 placeholder → 마스터 placeholder 타입 매핑 (python-pptx LayoutPlaceholder와 동일)
+BASE_PH_TYPE = {
+    "body": "body", "chart": "body", "clipArt": "body", "ctrTitle": "title",
+    "dgm": "body", "dt": "dt", "ftr": "ftr", "media": "body", "obj": "body",
+    "pic": "body", "sldNum": "sldNum", "subTitle": "body", "tbl": "body",
+    "title": "title",
+}
+
+_PARSER = etree.XMLParser(resolve_entities=False, no_network=True, huge_tree=True)
+
+
+# =========================================================
+# zip 파트 / 관계 해석
+# =========================================================
+def _resolve_target(source_part, target):
+    """관계 Target을 zip 내부 파트 경로로 변환합니다."""
+    if target.startswith("/"):
+        return target.lstrip("/")
+    return posixpath.normpath(posixpath.join(posixpath.dirname(source_part), target))
+
+
+def _rels_path(part):
+    return posixpath.join(posixpath.dirname(part), "_rels", posixpath.basename(part) + ".rels")
+
+
+def _read_rels(zf, part):
+    """파트의 .rels를 읽어 {rId: (type, 파트경로)}를 반환합니다."""
+    try:
+        data = zf.read(_rels_path(part))
+    except KeyError:
+        return {}
+    root = etree.fromstring(data, _PARSER)
+    rels = {}
+    for rel in root.iter(f"{{{NS_PKG_REL}}}Relationship"):
+        if rel.get("TargetMode") == "External":
+            continue
+        rels[rel.get("Id")] = (rel.get("Type", ""), _resolve_target(part, rel.get("Target", "")))
+    return rels
+
+
+def _related_part(rels, rel_type_suffix):
+    for rel_type, target in rels.values():
+        if rel_type.endswith(rel_type_suffix):
+            return target
+    return None
+
+
+def _presentation_part(zf):
+    root_rels = {}
+    try:
+        root = etree.fromstring(zf.read("_rels/.rels"), _PARSER)
+        for rel in root.iter(f"{{{NS_PKG_REL}}}Relationship"):
+            root_rels[rel.get("Id")] = (rel.get("Type", ""), rel.get("Target", "").lstrip("/"))
+    except KeyError:
+        pass
+    return _related_part(root_rels, RT_OFFICE_DOCUMENT) or "ppt/presentation.xml"
+
+
+def slide_parts(zf):
+    """presentation.xml의 sldIdLst 순서대로 슬라이드 파트 경로를 반환합니다."""
+    pres_part = _presentation_part(zf)
+    rels = _read_rels(zf, pres_part)
+    parts = []
+    with zf.open(pres_part) as f:
+        for _, elem in etree.iterparse(f, events=("end",), tag=_p("sldId"),
+                                       resolve_entities=False, no_network=True):
+            rel = rels.get(elem.get(f"{{{NS_R}}}id"))
+            if rel:
+                parts.append(rel[1])
+            elem.clear()
+    return parts
+
+
+# =========================================================
+# 텍스트 / 위치 추출
+# =========================================================
+def _paragraph_text(p):
+    chunks = []
+    for child in p:
+        if child.tag == A_R or child.tag == A_FLD:
+            t = child.find(A_T)
+            if t is not None and t.text:
+                chunks.append(t.text)
+        elif child.tag == A_BR:
+            chunks.append("\v")
+    return "".join(chunks)
+
+
+def _txbody_text(tx_body):
+    """python-pptx TextFrame.text와 같은 규칙(문단은 \\n, 줄바꿈은 \\v)으로 텍스트를 만듭니다."""
+    if tx_body is None:
+        return ""
+    return "\n".join(_paragraph_text(p) for p in tx_body.iterchildren(A_P))
+
+
+def _ph(sp):
+    """도형의 p:ph 요소를 반환합니다. placeholder가 아니면 None."""
+    nv = sp[0] if len(sp) else None
+    if nv is None:
+        return None
+    nv_pr = nv.find(P_NVPR)
+    if nv_pr is None:
+        return None
+    return nv_pr.find(P_PH)
+
+
+def _offset(sp):
+    """spPr/a:xfrm/a:off의 (y, x)를 반환합니다. 없으면 None."""
+    off = sp.find(f"{_p('spPr')}/{_a('xfrm')}/{_a('off')}")
+    if off is None:
+        return None
+    return int(off.get("y", 0)), int(off.get("x", 0))
+
+
+def _table_rows(graphic_frame):
+    tbl = graphic_frame.find(f"{_a('graphic')}/{_a('graphicData')}")
+    if tbl is None or tbl.get("uri") != URI_TABLE:
+        return None
+    tbl = tbl.find(_a("tbl"))
+    if tbl is None:
+        return []
+    return [
+        [_txbody_text(tc.find(_a("txBody"))) for tc in tr.iterchildren(_a("tc"))]
+        for tr in tbl.iterchildren(_a("tr"))
+    ]
+
+
+class _PlaceholderPositions:
+    """placeholder 도형에 직접 위치가 없을 때 레이아웃 → 마스터 순으로 상속 위치를 찾습니다.
+
+    대부분의 슬라이드에서는 필요하지 않으므로 레이아웃/마스터 XML은 처음 필요할 때만 읽습니다.
+    """
+
+    def __init__(self, zf):
+        self._zf = zf
+        self._layouts = {}
+        self._masters = {}
+
+    def _placeholders(self, part):
+        """파트의 최상위 placeholder 목록 [(idx, type, (y, x) | None)]을 반환합니다."""
+        root = etree.fromstring(self._zf.read(part), _PARSER)
+        sp_tree = root.find(f"{P_CSLD}/{P_SPTREE}")
+        result = []
+        if sp_tree is None:
+            return result
+        for shape in sp_tree:
+            if shape.tag not in SHAPE_TAGS:
+                continue
+            ph = _ph(shape)
+            if ph is None:
+                continue
+            result.append((int(ph.get("idx", 0)), ph.get("type", "obj"), _offset(shape)))
+        return result
+
+    def _layout(self, layout_part):
+        if layout_part not in self._layouts:
+            master_part = _related_part(_read_rels(self._zf, layout_part), RT_SLIDE_MASTER)
+            self._layouts[layout_part] = (self._placeholders(layout_part), master_part)
+        return self._layouts[layout_part]
+
+    def _master(self, master_part):
+        if master_part not in self._masters:
+            self._masters[master_part] = self._placeholders(master_part)
+        return self._masters[master_part]
+
+    def resolve(self, layout_part, idx):
+        if not layout_part:
+            return None
+        layout_phs, master_part = self._layout(layout_part)
+        for ph_idx, ph_type, offset in layout_phs:
+            if ph_idx != idx:
+                continue
+            if offset is not None or not master_part:
+                return offset
+            base_type = BASE_PH_TYPE.get(ph_type, ph_type)
+            for _, master_type, master_offset in self._master(master_part):
+                if master_type == base_type:
+                    return master_offset
+            return None
+        return None
+
+
+# =========================================================
+# 슬라이드 파싱
+# =========================================================
+def _parse_slide(zf, slide_part, positions):
+    """slideN.xml 하나를 iterparse로 읽어 SlideFeatures를 생성합니다."""
+    builder = SlideFeatureBuilder()
+    layout_part = None
+    layout_loaded = False
+
+    with zf.open(slide_part) as f:
+        context = etree.iterparse(f, events=("start", "end"),
+                                  resolve_entities=False, no_network=True, huge_tree=True)
+        for event, elem in context:
+            if event == "start":
+                if elem.tag == P_SLD and elem.get("show") == "0":
+                    return SlideFeatures(hidden=True)
+                continue
+
+            parent = elem.getparent()
+            if parent is None or parent.tag != P_SPTREE or elem.tag not in SHAPE_TAGS:
+                continue
+            if parent.getparent() is None or parent.getparent().tag != P_CSLD:
+                continue
+
+            if elem.tag == P_SP:
+                ph = _ph(elem)
+                offset = _offset(elem)
+                if offset is None and ph is not None:
+                    if not layout_loaded:
+                        layout_part = _related_part(_read_rels(zf, slide_part), RT_SLIDE_LAYOUT)
+                        layout_loaded = True
+                    offset = positions.resolve(layout_part, int(ph.get("idx", 0)))
+                builder.add_text(
+                    _txbody_text(elem.find(_p("txBody"))),
+                    ph is not None and int(ph.get("idx", 0)) == 0,
+                    lambda offset=offset: offset or (None, None),
+                )
+            elif elem.tag == P_GRAPHIC_FRAME:
+                rows = _table_rows(elem)
+                if rows is not None:
+                    builder.add_table(rows)
+
+            elem.clear()
+            while elem.getprevious() is not None:
+                del parent[0]
+
+    return builder.build(hidden=False)
+
+
+def iter_slide_features_xml(source):
+    """PPTX(경로, bytes 또는 파일 객체)의 슬라이드별 SlideFeatures를 순서대로 생성합니다."""
+    if isinstance(source, (bytes, bytearray)):
+        source = BytesIO(source)
+    with zipfile.ZipFile(source) as zf:
+        positions = _PlaceholderPositions(zf)
+        for slide_part in slide_parts(zf):
+            yield _parse_slide(zf, slide_part, positions)
+
+
+# =========================================================
+# 엔진 간 결과 비교 (python -m utils.pptx_xml_parser deck.pptx ...)
+# =========================================================
+def compare_engines(path):
+    """같은 파일을 두 엔진으로 파싱하여 과정 목록이 일치하는지 반환합니다."""
+    from utils.pptx_parser import parse_courses
+    return parse_courses(path, "python-pptx") == parse_courses(path, "xml")
+
+
+if __name__ == "__main__":
+    import sys
+
+    mismatched = 0
+    for path in sys.argv[1:]:
+        same = compare_engines(path)
+        mismatched += not same
+        print(f"{'✅ 일치' if same else '❌ 불일치'}: {path}")
+    sys.exit(1 if mismatched else 0)
@@ -0,0 +1,50 @@
+"""같은 키로 동시에 들어온 작업을 하나로 합치는 single-flight.
+
+같은 제안서가 거의 동시에 두 번 올라오면 결과 캐시가 아직 비어 있어 두 요청 모두 파싱과 LLM
+생성을 처음부터 합니다. SingleFlight는 키별로 진행 중인 작업을 하나만 두고, 나중에 온 요청은
+그 작업의 결과(또는 예외)를 함께 기다립니다. 프로세스(uvicorn 워커) 안에서만 합쳐집니다.
+"""
+import asyncio
+import threading
+
+
+class SingleFlight:
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._stats = {"leaders": 0, "coalesced": 0}
+
+    async def run(self, key, func):
+        """key로 진행 중인 작업이 있으면 그 결과를 기다리고, 없으면 func()를 실행합니다.
+
+        작업은 별도 태스크로 실행하므로 기다리던 요청 하나가 취소되어도 다른 요청의 작업은 계속됩니다.
+        func는 작업을 시작하는 요청에서만 (이 호출 안에서 바로) 불리므로, 작업이 요청보다 오래 쓸
+        자원(업로드 파일 등)은 func 안에서 넘겨받으면 됩니다.
+        Returns:
+            (결과, 다른 요청의 작업에 합류했는지)
+        """
+        with self._lock:
+            task = self._flights.get(key)
+            shared = task is not None
+            if shared:
+                self._stats["coalesced"] += 1
+            else:
+                task = asyncio.ensure_future(func())
+                self._flights[key] = task
+                self._stats["leaders"] += 1
+                task.add_done_callback(lambda done, key=key: self._forget(key, done))
+        return await asyncio.shield(task), shared
+
+    def _forget(self, key, task):
+        with self._lock:
+            self._flights.pop(key, None)
+        # 기다리던 요청이 모두 취소된 뒤 실패해도 "exception was never retrieved" 경고를 남기지 않습니다.
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self):
+        """작업을 시작한 요청 수(leaders), 진행 중인 작업에 합류한 요청 수(coalesced), 진행 중인 키 수."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._flights)
+        return stats
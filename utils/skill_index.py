@@ -0,0 +1,169 @@
+"""스킬 카탈로그 로컬 검색 인덱스 (BM25).
+
+커리큘럼 프롬프트에 카탈로그 전체(약 125개 스킬)를 넣는 대신, 과정 텍스트와 가장 관련 있는
+상위 K개 후보만 넣기 위해 사용합니다. 형태소 분석기 없이 한국어를 다루기 위해 한글은 음절
+bigram으로, 영문/숫자는 단어 단위로 토큰화합니다.
+"""
+import math
+import re
+from collections import Counter
+
+_WORD_RE = re.compile(r"[a-z0-9]+|[가-힣]+")
+
+
+def tokenize(text):
+    """텍스트를 검색용 토큰 목록으로 변환합니다 (영문/숫자 단어 + 한글 음절 bigram)."""
+    tokens = []
+    for word in _WORD_RE.findall(str(text).lower()):
+        if '가' <= word[0] <= '힣':
+            if len(word) == 1:
+                tokens.append(word)
+            else:
+                tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        elif len(word) > 1:
+            tokens.append(word)
+    return tokens
+
+
+def skill_document(entry):
+    """스킬 항목에서 색인할 텍스트(이름, 패밀리, 도메인, 비고)를 만듭니다."""
+    return " ".join(
+        str(entry.get(field, "")) for field in ("name", "family_name", "domain_name", "notes")
+    )
+
+
+class SkillIndex:
+    """스킬 카탈로그 항목에 대한 BM25 인덱스."""
+
+    def __init__(self, entries, k1=1.5, b=0.75):
+        self.entries = list(entries)
+        self.k1 = k1
+        self.b = b
+        self._doc_tfs = [Counter(tokenize(skill_document(e))) for e in self.entries]
+        self._doc_lens = [sum(tf.values()) for tf in self._doc_tfs]
+        self._avg_len = (sum(self._doc_lens) / len(self._doc_lens)) if self._doc_lens else 0.0
+        df = Counter()
+        for tf in self._doc_tfs:
+            df.update(tf.keys())
+        n = len(self.entries)
+        self._idf = {t: math.log(1 + (n - d + 0.5) / (d + 0.5)) for t, d in df.items()}
+
+    def scores(self, query):
+        """질의 텍스트에 대한 항목별 BM25 점수 목록을 반환합니다."""
+        terms = [t for t in set(tokenize(query)) if t in self._idf]
+        scores = []
+        for tf, doc_len in zip(self._doc_tfs, self._doc_lens):
+            norm = self.k1 * (1 - self.b + self.b * doc_len / self._avg_len) if self._avg_len else self.k1
+            score = 0.0
+            for t in terms:
+                f = tf.get(t)
+                if f:
+                    score += self._idf[t] * f * (self.k1 + 1) / (f + norm)
+            scores.append(score)
+        return scores
+
+    def search(self, query, k):
+        """점수 상위 k개 항목을 반환합니다. 점수가 0인 항목은 제외합니다."""
+        ranked = sorted(
+            ((score, i) for i, score in enumerate(self.scores(query)) if score > 0),
+            key=lambda x: (-x[0], x[1]),
+        )
+        return [self.entries[i] for _, i in ranked[:k]]
+
+
+# =========================================================
+# recall 벤치마크 (python -m utils.skill_index --k 20 [output/curriculum_store])
+# =========================================================
+def _normalize_skill_id(skill_id):
+    return skill_id.replace("-", "").strip().upper()
+
+
+def benchmark_recall(index, cases, k):
+    """(질의 텍스트, 정답 skill_id 목록) 케이스들에서 top-k recall을 계산합니다."""
+    hit = total = 0
+    misses = []
+    for query, gold_ids in cases:
+        found = {_normalize_skill_id(e["id"]) for e in index.search(query, k)}
+        for gold in gold_ids:
+            total += 1
+            if _normalize_skill_id(gold) in found:
+                hit += 1
+            else:
+                misses.append((gold, query[:60].replace("\n", " ")))
+    return (hit / total if total else 1.0), total, misses
+
+
+def load_store_cases(store_dir, source_dir, engine=None):
+    """원본 PPTX와 커리큘럼 스토어 출력(metadata.json)으로 벤치마크 케이스를 만듭니다.
+
+    질의는 생성 때 select_skill_catalog에 넘기는 것과 같은 파싱된 과정 텍스트(개요 + 커리큘럼)이고,
+    정답은 그 과정에 대해 LLM이 고른 skill_id입니다. LLM이 쓴 curriculum.md 본문을 질의로 쓰면
+    검색기가 실제로 받는 입력이 아니라 LLM 출력끼리의 일관성을 재게 됩니다.
+    """
+    import json
+    import os
+
+    from extract_curriculum_store_v2 import skill_query, store_dir_name
+    from utils.pptx_parser import parse_courses
+
+    cases = []
+    if not (os.path.isdir(store_dir) and os.path.isdir(source_dir)):
+        return cases
+    for filename in sorted(os.listdir(source_dir)):
+        if not filename.endswith(".pptx"):
+            continue
+        try:
+            courses = parse_courses(os.path.join(source_dir, filename), engine)
+        except Exception as e:
+            print(f"  ⚠️ 파싱 실패, 건너뜀: {filename} ({e})")
+            continue
+        for course_idx, course in enumerate(courses, 1):
+            meta_path = os.path.join(store_dir, store_dir_name(filename, course_idx), "metadata.json")
+            if not os.path.exists(meta_path):
+                continue
+            with open(meta_path, encoding="utf-8") as f:
+                metadata = json.load(f)
+            # 규칙 기반 초안(draft)은 LLM이 skill_id를 고르지 않았으므로 정답이 없습니다.
+            if metadata.get("draft"):
+                continue
+            skill_ids = [s for s in metadata.get("skill_id", "").split(",") if s.strip()]
+            if skill_ids:
+                cases.append((skill_query(course["overview"], course["curriculum"]), skill_ids))
+    return cases
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import sys
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from extract_curriculum_store_v2 import OUTPUT_DIR, SOURCE_DIR, load_skill_entries
+    from utils.pptx_parser import ENGINES
+
+    parser = argparse.ArgumentParser(description="스킬 후보 검색 recall 벤치마크")
+    parser.add_argument("store_dir", nargs="?", default=OUTPUT_DIR,
+                        help="커리큘럼 스토어 출력 폴더 (정답 skill_id)")
+    parser.add_argument("--source", default=SOURCE_DIR, help="원본 PPTX 폴더 (질의로 쓸 과정 텍스트)")
+    parser.add_argument("--engine", choices=ENGINES, default=None, help="PPTX 파싱 엔진")
+    parser.add_argument("--k", type=int, nargs="+", default=[10, 20, 30, 40])
+    args = parser.parse_args()
+
+    entries = load_skill_entries()
+    index = SkillIndex(entries)
+    suites = {
+        # 각 스킬의 이름/비고로 검색했을 때 자기 자신이 후보에 드는지 (인덱스 sanity check)
+        "catalog self-recall": [(f"{e['name']} {e.get('notes', '')}", [e["id"]]) for e in entries],
+        f"store recall ({args.source} → {args.store_dir})": load_store_cases(
+            args.store_dir, args.source, args.engine
+        ),
+    }
+    for suite, cases in suites.items():
+        if not cases:
+            print(f"[{suite}] 케이스 없음")
+            continue
+        for k in args.k:
+            recall, total, misses = benchmark_recall(index, cases, k)
+            print(f"[{suite}] top-{k}: recall={recall:.3f} ({total - len(misses)}/{total})")
+        for gold, snippet in misses[:10]:
+            print(f"    miss {gold}: {snippet}")
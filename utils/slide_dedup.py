@@ -0,0 +1,114 @@
+"""과정 내 중복 슬라이드 제거.
+
+제안서는 같은 커리큘럼 표를 목차, 일차별 슬라이드, 부록에 반복해서 싣는 경우가 많아
+과정 텍스트를 그대로 LLM에 보내면 같은 내용을 여러 번 보내게 됩니다. 정규화한 텍스트가 같은
+슬라이드는 바로 버리고, 문자 shingle 집합의 Jaccard 유사도가 임계값 이상인 슬라이드는
+거의 같은 슬라이드로 보고 더 긴 쪽 하나만 남깁니다.
+
+과정 하나의 슬라이드 수는 많아야 수십 개이므로 MinHash 서명 대신 shingle 해시 집합을 직접
+비교합니다 (정확한 Jaccard, C로 구현된 set 연산이라 충분히 빠릅니다).
+"""
+import os
+import re
+import threading
+import zlib
+
+SLIDE_DEDUP = os.environ.get("SLIDE_DEDUP", "1") != "0"
+SLIDE_DEDUP_THRESHOLD = float(os.environ.get("SLIDE_DEDUP_THRESHOLD", "0.85"))
+SHINGLE_SIZE = 5
+
+_WS_RE = re.compile(r"\s+")
+
+_stats_lock = threading.Lock()
+_stats = {"slides": 0, "dropped": 0, "chars_saved": 0, "tokens_saved": 0}
+
+
+def _normalize(text):
+    return _WS_RE.sub(" ", text).strip().lower()
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """정규화한 텍스트의 문자 size-gram 해시 집합을 반환합니다."""
+    norm = _normalize(text)
+    if len(norm) <= size:
+        return {zlib.crc32(norm.encode("utf-8"))}
+    return {zlib.crc32(norm[i:i + size].encode("utf-8")) for i in range(len(norm) - size + 1)}
+
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def dedupe_slides(slides, threshold=None):
+    """슬라이드 텍스트 목록에서 완전/유사 중복을 제거합니다.
+
+    유사 중복이면 먼저 나온 슬라이드 자리에 더 긴 쪽 텍스트를 남깁니다.
+    Returns:
+        (남은 슬라이드 목록, 버린 슬라이드 목록)
+    """
+    threshold = SLIDE_DEDUP_THRESHOLD if threshold is None else threshold
+    kept = []        # [텍스트]
+    signatures = []  # [(정규화 텍스트, shingle 집합)]
+    dropped = []
+    for slide in slides:
+        norm = _normalize(slide)
+        if not norm:
+            continue
+        if any(norm == kept_norm for kept_norm, _ in signatures):
+            dropped.append(slide)
+            continue
+        sig = shingles(slide)
+        for i, (_, kept_sig) in enumerate(signatures):
+            # Jaccard ≥ t이려면 집합 크기 비율도 t 이상이어야 하므로 먼저 걸러냅니다.
+            small, large = sorted((len(sig), len(kept_sig)))
+            if small < threshold * large:
+                continue
+            if jaccard(sig, kept_sig) >= threshold:
+                if len(slide) > len(kept[i]):
+                    dropped.append(kept[i])
+                    kept[i] = slide
+                    signatures[i] = (norm, sig)
+                else:
+                    dropped.append(slide)
+                break
+        else:
+            kept.append(slide)
+            signatures.append((norm, sig))
+    return kept, dropped
+
+
+def dedupe_course_slides(slides, separator="\n\n", threshold=None):
+    """과정의 슬라이드 텍스트 목록에서 중복 슬라이드를 제거하고 절감량을 기록합니다.
+
+    이어 붙인 텍스트를 다시 나누면 슬라이드 안의 빈 줄에서 슬라이드가 쪼개지므로, 파서가 만든
+    슬라이드 목록을 이어 붙이기 전에 넘깁니다. 절감량은 separator로 이어 붙인 텍스트 기준입니다.
+    SLIDE_DEDUP=0이면 그대로 반환합니다.
+    Returns:
+        (슬라이드 목록, 절감 글자 수, 절감 토큰 수)
+    """
+    slides = list(slides)
+    if not SLIDE_DEDUP or not slides:
+        return slides, 0, 0
+    from utils.token_budget import count_tokens
+
+    kept, dropped = dedupe_slides(slides, threshold)
+    original, deduped = separator.join(slides), separator.join(kept)
+    chars_saved = len(original) - len(deduped)
+    tokens_saved = count_tokens(original) - count_tokens(deduped) if dropped else 0
+    with _stats_lock:
+        _stats["slides"] += len(slides)
+        _stats["dropped"] += len(dropped)
+        _stats["chars_saved"] += chars_saved
+        _stats["tokens_saved"] += tokens_saved
+    return kept, chars_saved, tokens_saved
+
+
+def dedup_stats():
+    """검사한 슬라이드 수, 버린 중복 슬라이드 수, 절감한 글자/토큰 수를 반환합니다."""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["enabled"] = SLIDE_DEDUP
+    stats["threshold"] = SLIDE_DEDUP_THRESHOLD
+    return stats
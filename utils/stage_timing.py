@@ -0,0 +1,122 @@
+"""파이프라인 단계별 소요 시간 집계.
+
+파서와 생성 함수는 timings 인자로 StageTimings를 받아 단계별 시간과 개수(슬라이드/과정 수)를
+더합니다. 호출 측은 이를 메트릭(utils.metrics)으로 내보내거나 JSON으로 저장합니다.
+detail=True이면 슬라이드별/과정별 기록(records)도 남겨 느린 제안서를 항목 단위로 볼 수 있습니다.
+객체는 pickle 가능하므로 파싱 프로세스 풀 워커에서 채운 값을 그대로 돌려받을 수 있습니다.
+"""
+import cProfile
+import io
+import pstats
+import time
+from contextlib import contextmanager
+
+# profile_call 요약에 남길 함수 수
+PROFILE_TOP_N = 30
+
+
+def _ms(seconds, digits=1):
+    return round(seconds * 1000, digits)
+
+
+class Span:
+    """stage()가 with 블록에 넘기는 구간. 블록이 끝나면 seconds가 채워집니다."""
+
+    def __init__(self):
+        self.seconds = 0.0
+
+    @property
+    def ms(self):
+        # 항목별 기록(슬라이드 분류 등)은 수 µs 단위라 소수점 셋째 자리까지 남깁니다.
+        return _ms(self.seconds, 3)
+
+
+class StageTimings:
+    def __init__(self, detail=False):
+        self.seconds = {}  # 단계 → 누적 초
+        self.calls = {}    # 단계 → 측정 횟수
+        self.counts = {}   # 이름 → 개수 (slides, courses 등)
+        self.detail = detail
+        self.records = {}  # detail=True일 때 종류(slides, courses, llm_calls) → 항목별 기록
+        self.cpu_profile = None  # profile_call로 잰 CPU 프로파일 요약 (선택)
+
+    def add(self, stage, seconds, calls=1):
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+        self.calls[stage] = self.calls.get(stage, 0) + calls
+
+    def incr(self, name, amount=1):
+        self.counts[name] = self.counts.get(name, 0) + amount
+
+    def record(self, kind, **fields):
+        """detail=True일 때만 kind 목록에 항목 하나의 기록을 남깁니다."""
+        if self.detail:
+            self.records.setdefault(kind, []).append(fields)
+
+    @contextmanager
+    def stage(self, stage):
+        """블록의 소요 시간을 stage에 더합니다. 블록에는 그 구간(Span)을 넘깁니다."""
+        span = Span()
+        started = time.perf_counter()
+        try:
+            yield span
+        finally:
+            span.seconds = time.perf_counter() - started
+            self.add(stage, span.seconds)
+
+    def timed_iter(self, iterable, stage):
+        """iterable의 각 항목을 만드는 데 걸린 시간(next 호출)을 stage에 더하며 항목을 생성합니다."""
+        iterator = iter(iterable)
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                # 끝을 확인하는 마지막 next()는 시간만 더하고 횟수에는 넣지 않습니다.
+                self.add(stage, time.perf_counter() - started, calls=0)
+                return
+            self.add(stage, time.perf_counter() - started)
+            yield item
+
+    def merge(self, other):
+        for stage, seconds in other.seconds.items():
+            self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+            self.calls[stage] = self.calls.get(stage, 0) + other.calls.get(stage, 0)
+        for name, amount in other.counts.items():
+            self.incr(name, amount)
+        for kind, items in other.records.items():
+            self.records.setdefault(kind, []).extend(items)
+        if other.cpu_profile is not None:
+            self.cpu_profile = other.cpu_profile
+
+    def to_dict(self):
+        """{"stages": {단계: {"ms", "calls"}}, "counts": {...}} 형태로 반환합니다.
+
+        항목별 기록(slides, courses 등)과 CPU 프로파일 요약은 있을 때만 같은 수준의 키로 붙습니다.
+        """
+        data = {
+            "stages": {
+                stage: {"ms": _ms(seconds), "calls": self.calls[stage]}
+                for stage, seconds in self.seconds.items()
+            },
+            "counts": dict(self.counts),
+        }
+        data.update(self.records)
+        if self.cpu_profile is not None:
+            data["cpu_profile"] = self.cpu_profile
+        return data
+
+
+def profile_call(func, *args, top_n=PROFILE_TOP_N, **kwargs):
+    """func를 cProfile로 실행하고 (결과, 누적 시간 상위 top_n 함수 요약 텍스트)를 반환합니다.
+
+    cProfile은 호출한 스레드만 측정하므로 func는 다른 스레드/프로세스에 작업을 넘기지 않아야 합니다.
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        profiler.disable()
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).strip_dirs().sort_stats("cumulative").print_stats(top_n)
+    return result, out.getvalue().strip()
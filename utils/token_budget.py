@@ -0,0 +1,210 @@
+"""LLM 입력 토큰 예산.
+
+과정 개요/커리큘럼을 글자 수(`[:5000]`, `[:25000]`)로 자르면 한국어에서는 토큰 수를 가늠하기
+어렵고 표 중간이 잘립니다. 이 모듈은 로컬 토크나이저로 토큰을 세고, 전체 예산을 개요와
+커리큘럼에 나눈 뒤 슬라이드 → 줄(표 행) 경계에서만 잘라냅니다.
+
+토크나이저는 tiktoken(LLM_TOKENIZER 인코딩)을 쓰고, 설치되어 있지 않거나 인코딩 파일을
+받을 수 없는 환경(오프라인, TIKTOKEN_CACHE_DIR 없음)에서는 문자 종류 기반 추정치로 대신합니다.
+tiktoken은 캐시에 인코딩 파일이 없으면 타임아웃 없이 내려받으므로, 불러오기는 백그라운드 스레드에서
+하고 준비되기 전에는 추정치를 씁니다 (Docker 이미지는 빌드 시 TIKTOKEN_CACHE_DIR에 미리 받아 둡니다).
+"""
+import math
+import os
+import re
+import threading
+
+# 과정 하나의 프롬프트 입력(개요 + 커리큘럼)에 쓸 토큰 예산
+LLM_INPUT_TOKEN_BUDGET = int(os.environ.get("LLM_INPUT_TOKEN_BUDGET", "12000"))
+# 예산이 부족할 때 개요에 보장하는 토큰 수 (개요가 짧으면 남는 만큼 커리큘럼에 돌립니다)
+LLM_OVERVIEW_TOKEN_BUDGET = int(os.environ.get("LLM_OVERVIEW_TOKEN_BUDGET", "2500"))
+# 예산이 부족할 때 커리큘럼(주 입력)에 보장하는 예산 비율 (커리큘럼이 짧으면 남는 만큼 개요에 돌립니다)
+LLM_CURRICULUM_MIN_SHARE = float(os.environ.get("LLM_CURRICULUM_MIN_SHARE", "0.5"))
+LLM_TOKENIZER = os.environ.get("LLM_TOKENIZER", "o200k_base")
+# 서버 시작/CLI 실행 시 토크나이저 준비를 기다리는 최대 시간(초). 넘으면 추정치로 시작합니다.
+LLM_TOKENIZER_LOAD_TIMEOUT = float(os.environ.get("LLM_TOKENIZER_LOAD_TIMEOUT", "10"))
+
+# 호출 측에서 슬라이드 텍스트를 이어 붙일 때 쓰는 구분자
+SLIDE_SEPARATOR = "\n\n"
+
+_encoder_lock = threading.Lock()
+_encoder = None
+_encoder_ready = threading.Event()
+_encoder_loader = None
+
+_stats_lock = threading.Lock()
+_stats = {"calls": 0, "input_tokens": 0, "truncated": 0, "dropped_tokens": 0}
+
+_ESTIMATE_RE = re.compile(r"[가-힣ㄱ-ㅎㅏ-ㅣ一-鿿]|[A-Za-z]+|[0-9]+|\s+|.")
+
+
+def _load_encoder():
+    global _encoder
+    try:
+        import tiktoken
+        _encoder = tiktoken.get_encoding(LLM_TOKENIZER)
+    except Exception as e:
+        print(f"  ⚠️ 토크나이저({LLM_TOKENIZER})를 불러오지 못해 추정치를 사용합니다 ({type(e).__name__})")
+    finally:
+        _encoder_ready.set()
+
+
+def preload_encoder(timeout=None):
+    """토크나이저를 백그라운드 스레드에서 불러오기 시작하고 최대 timeout초 기다립니다.
+
+    timeout이 None이면 LLM_TOKENIZER_LOAD_TIMEOUT. 그 안에 준비되었으면 True를 반환합니다.
+    기다리는 동안 락을 잡지 않으므로 내려받기가 멈춰도 다른 호출은 추정치로 계속 진행합니다.
+    """
+    global _encoder_loader
+    with _encoder_lock:
+        if _encoder_loader is None:
+            _encoder_loader = threading.Thread(target=_load_encoder, name="tiktoken-load", daemon=True)
+            _encoder_loader.start()
+    return _encoder_ready.wait(LLM_TOKENIZER_LOAD_TIMEOUT if timeout is None else timeout)
+
+
+def _get_encoder():
+    """준비된 토크나이저를 반환합니다. 아직 불러오는 중이거나 실패했으면 None (추정치 사용)."""
+    if not _encoder_ready.is_set():
+        preload_encoder(timeout=0)
+    return _encoder
+
+
+def estimate_tokens(text):
+    """토크나이저 없이 토큰 수를 추정합니다 (한글/한자 1자 = 1토큰, 영문 4자, 숫자 3자 = 1토큰)."""
+    count = 0
+    for piece in _ESTIMATE_RE.findall(text):
+        if piece[0].isspace():
+            count += piece.count("\n")
+        elif piece[0].isascii() and piece[0].isalpha():
+            count += math.ceil(len(piece) / 4)
+        elif piece[0].isdigit():
+            count += math.ceil(len(piece) / 3)
+        else:
+            count += 1
+    return count
+
+
+def count_tokens(text):
+    """텍스트의 토큰 수를 로컬에서 셉니다."""
+    if not text:
+        return 0
+    encoder = _get_encoder()
+    if encoder is None:
+        return estimate_tokens(text)
+    return len(encoder.encode(text, disallowed_special=()))
+
+
+def _fit_lines(text, budget):
+    """슬라이드 하나가 남은 예산보다 길면 앞에서부터 줄(표 행) 단위로 담습니다."""
+    kept = []
+    used = 0
+    for line in text.split("\n"):
+        tokens = count_tokens(line) + 1
+        if used + tokens > budget:
+            break
+        kept.append(line)
+        used += tokens
+    # 내용 없이 끝나는 제목 줄은 버립니다.
+    while kept and kept[-1].startswith("### "):
+        used -= count_tokens(kept.pop()) + 1
+    return "\n".join(kept), used
+
+
+def fit_slides(slides, budget):
+    """슬라이드 텍스트 목록을 예산 안에 들어가도록 앞에서부터 담습니다.
+
+    예산을 넘는 슬라이드는 줄 경계까지만 담고 그 뒤 슬라이드는 버립니다.
+    Returns:
+        (text, tokens)
+    """
+    kept = []
+    used = 0
+    for slide in slides:
+        tokens = count_tokens(slide) + (1 if kept else 0)
+        if used + tokens <= budget:
+            kept.append(slide)
+            used += tokens
+            continue
+        partial, partial_tokens = _fit_lines(slide, budget - used - (1 if kept else 0))
+        if partial:
+            kept.append(partial)
+            used += partial_tokens
+        break
+    return SLIDE_SEPARATOR.join(kept), used
+
+
+def _as_slides(text_or_slides):
+    # 문자열은 슬라이드 하나로 봅니다. 이어 붙인 텍스트를 빈 줄로 다시 나누면 슬라이드 안의 빈 줄에서
+    # 슬라이드가 쪼개지므로, 슬라이드 경계를 살리려면 호출 측에서 슬라이드 목록을 넘깁니다.
+    if isinstance(text_or_slides, str):
+        return [text_or_slides] if text_or_slides.strip() else []
+    return [s for s in text_or_slides if s.strip()]
+
+
+class InputBudget:
+    """예산을 적용한 과정 입력과 토큰 수."""
+
+    __slots__ = ("overview_text", "curriculum_text", "overview_tokens", "curriculum_tokens",
+                 "original_tokens")
+
+    def __init__(self, overview_text, curriculum_text, overview_tokens, curriculum_tokens,
+                 original_tokens):
+        self.overview_text = overview_text
+        self.curriculum_text = curriculum_text
+        self.overview_tokens = overview_tokens
+        self.curriculum_tokens = curriculum_tokens
+        self.original_tokens = original_tokens
+
+    @property
+    def input_tokens(self):
+        return self.overview_tokens + self.curriculum_tokens
+
+    @property
+    def truncated(self):
+        return self.input_tokens < self.original_tokens
+
+
+def allocate(overview, curriculum, budget=None, overview_budget=None):
+    """개요/커리큘럼(슬라이드 텍스트 목록, 문자열이면 슬라이드 하나)에 토큰 예산을 나눠 적용합니다.
+
+    둘을 합쳐 예산 안이면 그대로 두고, 넘으면 개요에 overview_budget까지(커리큘럼이 짧으면
+    그 이상) 주고 나머지를 커리큘럼에 줍니다. 개요는 overview_budget이 크더라도 커리큘럼 몫
+    (budget × LLM_CURRICULUM_MIN_SHARE, 커리큘럼이 그보다 짧으면 커리큘럼 전체)을 넘보지 않습니다.
+    """
+    budget = LLM_INPUT_TOKEN_BUDGET if budget is None else budget
+    overview_budget = LLM_OVERVIEW_TOKEN_BUDGET if overview_budget is None else overview_budget
+
+    overview_slides = _as_slides(overview)
+    curriculum_slides = _as_slides(curriculum)
+    overview_text = SLIDE_SEPARATOR.join(overview_slides)
+    curriculum_text = SLIDE_SEPARATOR.join(curriculum_slides)
+    overview_tokens = count_tokens(overview_text)
+    curriculum_tokens = count_tokens(curriculum_text)
+    original_tokens = overview_tokens + curriculum_tokens
+
+    if original_tokens > budget:
+        curriculum_reserve = min(curriculum_tokens, int(budget * LLM_CURRICULUM_MIN_SHARE))
+        ov_budget = min(overview_tokens, max(overview_budget, budget - curriculum_tokens),
+                        budget - curriculum_reserve)
+        overview_text, overview_tokens = fit_slides(overview_slides, ov_budget)
+        curriculum_text, curriculum_tokens = fit_slides(curriculum_slides, budget - overview_tokens)
+
+    result = InputBudget(overview_text, curriculum_text, overview_tokens, curriculum_tokens,
+                         original_tokens)
+    with _stats_lock:
+        _stats["calls"] += 1
+        _stats["input_tokens"] += result.input_tokens
+        if result.truncated:
+            _stats["truncated"] += 1
+            _stats["dropped_tokens"] += original_tokens - result.input_tokens
+    return result
+
+
+def budget_stats():
+    """예산 적용 횟수, 누적 입력 토큰, 잘린 과정 수와 버린 토큰 수를 반환합니다."""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["budget"] = LLM_INPUT_TOKEN_BUDGET
+    stats["tokenizer"] = LLM_TOKENIZER if _get_encoder() is not None else "estimate"
+    return stats
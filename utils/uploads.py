@@ -0,0 +1,191 @@
+"""업로드 크기 제한과 디스크 스풀링.
+
+multipart 업로드는 starlette가 SpooledTemporaryFile에 받아 두며, UPLOAD_SPOOL_MAX_MB를 넘는
+파일은 메모리가 아니라 임시 파일(디스크)에 씁니다. 엔드포인트는 이 파일 객체를 그대로 파서에
+넘기고(zipfile이 필요한 멤버만 읽음) 업로드 전체를 bytes로 다시 읽지 않습니다.
+
+UploadSizeLimitMiddleware는 Content-Length가 MAX_UPLOAD_MB를 넘으면 본문을 받기 전에 413을
+돌려주고, Content-Length 없이(chunked) 들어오는 본문은 받은 양을 세다가 한도를 넘는 순간 중단합니다.
+여러 제안서를 한 번에 받는 /extract/batch는 본문 전체에 MAX_BATCH_UPLOAD_MB를 쓰고, 제안서(파일,
+zip 멤버) 하나하나는 check_deck_size/open_zip_member가 MAX_UPLOAD_MB로 확인합니다.
+"""
+import os
+import tempfile
+import threading
+import time
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from starlette.formparsers import MultiPartParser
+
+from utils import metrics
+
+MB = 1024 * 1024
+# 요청 본문 최대 크기 (0이면 제한 없음). 업로드는 디스크로 스풀되므로 50~200MB 제안서도 받을 수 있게 여유를 둡니다.
+MAX_UPLOAD_MB = float(os.environ.get("MAX_UPLOAD_MB", "256"))
+# /extract/batch 요청 본문 전체의 최대 크기 (0이면 제한 없음). 제안서 하나는 MAX_UPLOAD_MB까지입니다.
+MAX_BATCH_UPLOAD_MB = float(os.environ.get("MAX_BATCH_UPLOAD_MB", "2048"))
+# 업로드 파일을 메모리에 두는 최대 크기. 넘으면 임시 파일로 옮겨 씁니다.
+UPLOAD_SPOOL_MAX_MB = float(os.environ.get("UPLOAD_SPOOL_MAX_MB", "1"))
+
+MAX_UPLOAD_BYTES = int(MAX_UPLOAD_MB * MB)
+MAX_BATCH_UPLOAD_BYTES = int(MAX_BATCH_UPLOAD_MB * MB)
+UPLOAD_SPOOL_MAX_BYTES = int(UPLOAD_SPOOL_MAX_MB * MB)
+
+_stats_lock = threading.Lock()
+_stats = {"uploads": 0, "spooled_to_disk": 0, "rejected": 0}
+
+
+def configure_spooling(max_bytes=None):
+    """starlette multipart 파서의 메모리 스풀 한도를 설정합니다 (프로세스 전역)."""
+    MultiPartParser.spool_max_size = UPLOAD_SPOOL_MAX_BYTES if max_bytes is None else max_bytes
+
+
+def _too_large_detail(max_bytes):
+    return f"Upload exceeds maximum size of {max_bytes / MB:g}MB"
+
+
+def _count_rejected():
+    with _stats_lock:
+        _stats["rejected"] += 1
+
+
+def check_deck_size(size, max_bytes=None):
+    """제안서 하나의 크기가 max_bytes(기본 MAX_UPLOAD_MB)를 넘으면 ValueError를 던집니다."""
+    max_bytes = MAX_UPLOAD_BYTES if max_bytes is None else max_bytes
+    if max_bytes > 0 and size is not None and size > max_bytes:
+        raise ValueError(_too_large_detail(max_bytes))
+
+
+class UploadSizeLimitMiddleware:
+    """요청 본문이 한도를 넘으면 413으로 거절하는 ASGI 미들웨어.
+
+    한도는 기본 max_bytes(MAX_UPLOAD_MB)이고, route_limits({경로: 바이트})에 있는 경로는 그 값을
+    씁니다 (기본: /extract/batch → MAX_BATCH_UPLOAD_MB). None인 한도는 요청마다 모듈 설정값을 읽습니다.
+    """
+
+    def __init__(self, app, max_bytes=None, route_limits=None):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.route_limits = route_limits
+
+    def _limit_for(self, path):
+        route_limits = {"/extract/batch": MAX_BATCH_UPLOAD_BYTES} if self.route_limits is None else self.route_limits
+        if path in route_limits:
+            return route_limits[path]
+        return MAX_UPLOAD_BYTES if self.max_bytes is None else self.max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        max_bytes = self._limit_for(scope["path"])
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if (max_bytes > 0 and content_length is not None and content_length.isdigit()
+                and int(content_length) > max_bytes):
+            _count_rejected()
+            response = JSONResponse({"detail": _too_large_detail(max_bytes)}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        # multipart 업로드는 본문 첫 조각부터 마지막 조각까지를 upload 단계 시간으로 기록합니다.
+        is_upload = headers.get(b"content-type", b"").startswith(b"multipart/form-data")
+        received = 0
+        started = None
+
+        async def limited_receive():
+            nonlocal received, started
+            message = await receive()
+            if message["type"] == "http.request":
+                if started is None:
+                    started = time.perf_counter()
+                received += len(message.get("body", b""))
+                if max_bytes > 0 and received > max_bytes:
+                    _count_rejected()
+                    # 본문 파싱 중에 발생하므로 FastAPI가 그대로 413 응답으로 바꿉니다.
+                    raise HTTPException(413, _too_large_detail(max_bytes))
+                if is_upload and not message.get("more_body", False):
+                    metrics.STAGE_SECONDS.observe(time.perf_counter() - started, stage="upload")
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+def upload_source(file):
+    """UploadFile의 스풀 파일 객체를 처음 위치로 되돌려 파서 입력으로 반환합니다 (복사 없음)."""
+    spooled = file.file
+    spooled.seek(0)
+    with _stats_lock:
+        _stats["uploads"] += 1
+        if getattr(spooled, "_rolled", False):
+            _stats["spooled_to_disk"] += 1
+    return spooled
+
+
+def detach_upload(file):
+    """UploadFile에서 스풀 파일 객체를 떼어 내 호출 측이 소유하게 합니다 (복사 없음).
+
+    요청이 끝나거나 연결이 끊기면 프레임워크가 UploadFile을 닫지만, 떼어 낸 파일은 닫지 않으므로
+    요청보다 오래 사는 작업(진행 중인 동일 요청 합치기)이 계속 읽을 수 있습니다. 다 쓰면 직접 닫습니다.
+    """
+    spooled = file.file
+    file.file = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MAX_BYTES)
+    spooled.seek(0)
+    return spooled
+
+
+def _member_name(info):
+    """zip 멤버의 파일명. UTF-8 플래그가 없으면 Windows 압축 프로그램의 cp949 이름으로 다시 읽습니다."""
+    name = info.filename
+    if not info.flag_bits & 0x800:
+        try:
+            name = name.encode("cp437").decode("cp949")
+        except (UnicodeEncodeError, UnicodeDecodeError):
+            pass
+    return os.path.basename(name)
+
+
+def iter_zip_decks(zf):
+    """zip 안의 .pptx 멤버를 (파일명, ZipInfo)로 생성합니다. macOS 메타데이터 파일은 건너뜁니다."""
+    for info in zf.infolist():
+        if info.is_dir() or info.filename.startswith("__MACOSX/"):
+            continue
+        name = _member_name(info)
+        if name.lower().endswith(".pptx") and not name.startswith(("._", "~$")):
+            yield name, info
+
+
+def open_zip_member(zf, info, max_bytes=None):
+    """zip 멤버 하나를 스풀 임시 파일로 풀어 처음 위치로 되돌려 반환합니다.
+
+    중첩 zip을 ZipExtFile 위에서 직접 열면 seek마다 압축을 다시 풀기 때문에 한 번 풀어 둡니다.
+    압축 해제 크기가 max_bytes(기본 MAX_UPLOAD_MB)를 넘으면 ValueError를 던집니다.
+    """
+    max_bytes = MAX_UPLOAD_BYTES if max_bytes is None else max_bytes
+    check_deck_size(info.file_size, max_bytes)
+    spooled = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MAX_BYTES)
+    try:
+        with zf.open(info) as member:
+            # 헤더의 file_size를 믿지 않고 실제로 풀린 양도 확인합니다.
+            limit = max_bytes + 1 if max_bytes > 0 else None
+            while chunk := member.read(MB):
+                spooled.write(chunk)
+                if limit is not None and spooled.tell() >= limit:
+                    raise ValueError(_too_large_detail(max_bytes))
+    except BaseException:
+        spooled.close()
+        raise
+    spooled.seek(0)
+    return spooled
+
+
+def upload_stats():
+    """처리한 업로드 수, 디스크로 넘어간 업로드 수, 크기 초과로 거절한 요청 수와 한도를 반환합니다."""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["max_upload_mb"] = MAX_UPLOAD_MB
+    stats["max_batch_upload_mb"] = MAX_BATCH_UPLOAD_MB
+    stats["spool_max_mb"] = UPLOAD_SPOOL_MAX_MB
+    return stats